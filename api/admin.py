@@ -1,7 +1,88 @@
+import operator
+from functools import reduce
+from time import monotonic
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
 from django.contrib.auth.models import Group, User
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+from django.utils.text import smart_split, unescape_string_literal
 
 from api.models import *
+from api.pagination import estimate_query
+from api.schemas import LogicEnum, logic_search
+
+# Number of seconds the filter choices are kept before they are read again
+FILTER_CHOICES_TTL = 300
+
+# (model, field) -> (time of the read, distinct values of the field)
+FILTER_CHOICES: Dict[Tuple[Any, str], Tuple[float, List[Any]]] = {}
+
+
+def table_rows(model) -> float | None:
+    """
+    The estimated rows of a model's table, partitions included (None before
+    the table is first analyzed).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(c.reltuples) FILTER (WHERE c.reltuples >= 0) "
+            "FROM pg_partition_tree(%s::regclass) t "
+            "JOIN pg_class c ON c.oid = t.relid "
+            "WHERE t.isleaf",
+            [model._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+def filter_choices(model, field: str) -> List[Any]:
+    """
+    The distinct values of a field, read again every FILTER_CHOICES_TTL
+    seconds (the tables are written continuously, so a new value may take
+    that long to appear among the choices).
+    """
+    cached = FILTER_CHOICES.get((model, field))
+    if cached is None or monotonic() - cached[0] > FILTER_CHOICES_TTL:
+        values = list(
+            model._default_manager.order_by(field)
+            .values_list(field, flat=True)
+            .distinct()
+        )
+        FILTER_CHOICES[(model, field)] = cached = (monotonic(), values)
+
+    return cached[1]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts a changelist with the table's statistics when unfiltered, and with
+    the planner's estimate when a COUNT(*) would cost more than
+    COUNT_ESTIMATE_COST (as the API's list endpoints do).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        if not queryset.query.where:
+            rows = table_rows(queryset.model)
+            if rows is not None:
+                return int(rows)
+
+        _, cost, rows = estimate_query(queryset)
+        return rows if cost > settings.COUNT_ESTIMATE_COST else queryset.count()
+
+
+class CachedValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """The values of a field from filter_choices, not a DISTINCT of the table."""
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.lookup_choices = filter_choices(model, field_path)
 
 
 class ReadOnly(admin.ModelAdmin):
@@ -15,6 +96,71 @@ class ReadOnly(admin.ModelAdmin):
         return False
 
 
+class LargeTable(ReadOnly):
+    """
+    Admin of a table too large for exact counts and ILIKEs on every search
+    field: its `search_fields` are those of the model's keyword search index
+    (see api/search.py), in the same order, and every search word is matched
+    on that index. Models with other trigram indexes list the fields of each
+    index in `search_documents`, and a word matches any of them.
+    """
+
+    paginator = EstimatedCountPaginator
+    # The unfiltered count of the "N total" link would be a COUNT(*) of the table
+    show_full_result_count = False
+    search_documents: List[List[str]] = []
+
+    def get_search_results(self, request, queryset, search_term):
+        words = []
+        for word in smart_split(search_term):
+            if word[0] in "\"'" and word[0] == word[-1]:
+                word = unescape_string_literal(word)
+            words.append(word)
+
+        documents = self.search_documents or [self.search_fields]
+        if len(documents) == 1:
+            q = logic_search(self.model, documents[0], words, LogicEnum.and_)
+            return queryset.filter(q), False
+
+        q = Q()
+        for word in words:
+            q &= reduce(
+                operator.or_,
+                [
+                    logic_search(self.model, fields, [word], LogicEnum.and_)
+                    for fields in documents
+                ],
+            )
+        return queryset.filter(q), False
+
+
+class LimitedInlineFormSet(BaseInlineFormSet):
+    max_rows = None
+
+    def get_queryset(self):
+        if not hasattr(self, "_queryset"):
+            self._queryset = super().get_queryset()[: self.max_rows]
+        return self._queryset
+
+
+class LimitedInline(admin.TabularInline):
+    """Shows the first `max_rows` related rows only."""
+
+    extra = 0
+    max_rows = 50
+    formset = LimitedInlineFormSet
+
+    def get_queryset(self, request):
+        # The titles of the rows (e.g "<skill> - <job>") show both ends of the links
+        related = [field.name for field in self.model._meta.fields if field.many_to_one]
+        return super().get_queryset(request).select_related(*related)
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.max_rows = self.max_rows
+        return formset
+
+
 admin.site.unregister([Group, User])
 
 admin.site.site_header = "Skillab Admin"
@@ -29,74 +175,62 @@ class ChildClassAdmin(ReadOnly):
     fields = ["username", "email", "is_staff", "is_active", "date_joined"]
 
 
-class ProjectOrganizationInline(admin.TabularInline):
+class ProjectOrganizationInline(LimitedInline):
     model = ProjectOrganization
-    extra = 0
 
 
-class ProjectArticlesInline(admin.TabularInline):
+class ProjectArticlesInline(LimitedInline):
     model = Article
-    extra = 0
     fields = ["title", "authors", "doi"]
 
 
-class OrganizationJobsInline(admin.TabularInline):
+class OrganizationJobsInline(LimitedInline):
     model = Job
-    extra = 0
     fields = ["title", "upload_date"]
     show_change_link = True
 
 
-class OrganizationSkillInline(admin.TabularInline):
+class OrganizationSkillInline(LimitedInline):
     model = OrganizationSkill
-    extra = 0
 
 
-class ArticleSkillInline(admin.TabularInline):
+class ArticleSkillInline(LimitedInline):
     model = ArticleSkill
-    extra = 0
 
 
-class ProjectSkillInline(admin.TabularInline):
+class ProjectSkillInline(LimitedInline):
     model = ProjectSkill
-    extra = 0
 
 
-class LawPolicySkillInline(admin.TabularInline):
+class LawPolicySkillInline(LimitedInline):
     model = LawPolicySkill
-    extra = 0
 
 
-class JobSkillInline(admin.TabularInline):
+class JobSkillInline(LimitedInline):
     model = JobSkill
-    extra = 0
 
 
-class JobOccupationInline(admin.TabularInline):
+class JobOccupationInline(LimitedInline):
     model = JobOccupation
-    extra = 0
 
 
-class ProfileSkillInline(admin.TabularInline):
+class ProfileSkillInline(LimitedInline):
     model = ProfileSkill
-    extra = 0
 
 
-class CourseSkillInline(admin.TabularInline):
+class CourseSkillInline(LimitedInline):
     model = CourseSkill
-    extra = 0
 
 
-class LawPublicationSkillInline(admin.TabularInline):
+class LawPublicationSkillInline(LimitedInline):
     model = LawPublicationSkill
-    extra = 0
 
 
 @admin.register(Project)
-class ProjectAdmin(ReadOnly):
-    search_fields = ["title"]
+class ProjectAdmin(LargeTable):
+    search_fields = ["title", "objective"]
     list_display = ["title", "start_date", "source"]
-    list_filter = ["source"]
+    list_filter = [("source", CachedValuesFieldListFilter)]
     fields = [
         "title",
         "start_date",
@@ -112,10 +246,17 @@ class ProjectAdmin(ReadOnly):
 
 
 @admin.register(Organization)
-class OrganizationAdmin(ReadOnly):
-    search_fields = ["name", "country", "city", "postcode", "street"]
+class OrganizationAdmin(LargeTable):
+    search_fields = ["name", "description", "country", "city", "postcode", "street"]
+    search_documents = [
+        ["name", "description"],
+        ["country", "city", "postcode", "street"],
+    ]
     list_display = ["name", "country", "city", "postcode", "street"]
-    list_filter = ["source", "country"]
+    list_filter = [
+        ("source", CachedValuesFieldListFilter),
+        ("country", CachedValuesFieldListFilter),
+    ]
 
     inlines = [
         ProjectOrganizationInline,
@@ -126,63 +267,63 @@ class OrganizationAdmin(ReadOnly):
 
 @admin.register(EscoSkill)
 class EscoSkillAdmin(ReadOnly):
-    search_fields = ["id", "label", "alternative_labels"]
-    list_display = ["id", "label"]
+    search_fields = ["uri", "label", "alternative_labels"]
+    list_display = ["uri", "label"]
 
 
 @admin.register(IscoOccupation)
 class IscoOccupationAdmin(ReadOnly):
-    search_fields = ["id", "label", "alternative_labels"]
-    list_display = ["id", "label"]
+    search_fields = ["uri", "label", "alternative_labels"]
+    list_display = ["uri", "label"]
 
 
 @admin.register(Article)
-class ArticleAdmin(ReadOnly):
+class ArticleAdmin(LargeTable):
     search_fields = ["title", "summary"]
     list_display = ["title", "source", "source_id"]
-    list_filter = ["source"]
+    list_filter = [("source", CachedValuesFieldListFilter)]
 
     inlines = [ArticleSkillInline]
 
 
 @admin.register(Course)
-class CourseAdmin(ReadOnly):
+class CourseAdmin(LargeTable):
     search_fields = ["title", "description"]
     list_display = ["title", "source", "source_id"]
-    list_filter = ["source"]
+    list_filter = [("source", CachedValuesFieldListFilter)]
     inlines = [CourseSkillInline]
 
 
 @admin.register(Job)
-class JobAdmin(ReadOnly):
-    search_fields = ["title", "description"]
+class JobAdmin(LargeTable):
+    search_fields = ["title", "description", "location", "type", "experience_level"]
     list_display = ["title", "source", "source_id"]
-    list_filter = ["source"]
+    list_filter = [("source", CachedValuesFieldListFilter)]
 
     inlines = [JobSkillInline, JobOccupationInline]
 
 
 @admin.register(Profile)
-class ProfileAdmin(ReadOnly):
-    search_fields = ["full_name"]
+class ProfileAdmin(LargeTable):
+    search_fields = ["full_name", "location", "content", "occupation"]
     list_display = ["full_name", "source", "source_id"]
-    list_filter = ["source"]
+    list_filter = [("source", CachedValuesFieldListFilter)]
     inlines = [ProfileSkillInline]
 
 
 @admin.register(LawPublication)
-class LawPublicationAdmin(ReadOnly):
+class LawPublicationAdmin(LargeTable):
     search_fields = ["title", "authors", "summary"]
     list_display = ["title", "source", "source_id"]
-    list_filter = ["source"]
+    list_filter = [("source", CachedValuesFieldListFilter)]
     inlines = [LawPublicationSkillInline]
 
 
 @admin.register(LawPolicy)
-class LawPolicyAdmin(ReadOnly):
-    search_fields = ["title", "authors", "summary"]
+class LawPolicyAdmin(LargeTable):
+    search_fields = ["title", "summary", "authors"]
     list_display = ["title", "source", "source_id"]
-    list_filter = ["source"]
+    list_filter = [("source", CachedValuesFieldListFilter)]
     inlines = [LawPolicySkillInline]
 
 
@@ -190,3 +331,29 @@ class LawPolicyAdmin(ReadOnly):
 class KeyValueAdmin(admin.ModelAdmin):
     search_fields = ["key", "value"]
     list_display = ["key", "value"]
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(ReadOnly):
+    list_display = ["route", "filters", "count", "average_ms", "max_ms", "last_seen"]
+    list_filter = ["route"]
+    ordering = ["-total_ms"]
+    fields = [
+        "route",
+        "filters",
+        "count",
+        "total_ms",
+        "max_ms",
+        "first_seen",
+        "last_seen",
+        "sql",
+        "plan",
+    ]
+
+    def has_delete_permission(self, request, obj=None):
+        # Rows can be removed once their combination has been dealt with
+        return True
+
+    @admin.display(description="Average ms", ordering="total_ms")
+    def average_ms(self, obj):
+        return round(obj.total_ms / obj.count, 1) if obj.count else None
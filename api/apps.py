@@ -4,3 +4,20 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from api.signals import (
+            connect_closure_sync,
+            connect_data_version_triggers,
+            connect_label_sync,
+            connect_level_sync,
+            connect_skill_ids_sync,
+            connect_uri_map_reset,
+        )
+
+        connect_skill_ids_sync()
+        connect_uri_map_reset()
+        connect_label_sync()
+        connect_level_sync()
+        connect_closure_sync()
+        connect_data_version_triggers(self)
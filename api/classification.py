@@ -0,0 +1,189 @@
+"""
+Occupation classification of job titles. The occupation labels (see
+IscoOccupationLabel) are normalized into tokens, an inverted index from tokens
+to labels gives the candidates of a title and the candidates are ranked by
+trigram similarity (as pg_trgm's similarity()), all in memory.
+"""
+
+import re
+from collections import defaultdict
+from math import log
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Tuple
+
+from api.models import *
+from api.taxonomy import ProcessCache
+
+# Words of job titles that tell nothing about the occupation
+STOPWORDS = {
+    "a",
+    "an",
+    "and",
+    "for",
+    "in",
+    "of",
+    "the",
+    "to",
+    "with",
+    "senior",
+    "junior",
+    "sr",
+    "jr",
+    # Gender markers, e.g (m/f/d) or (m/w/d)
+    "m",
+    "f",
+    "w",
+    "d",
+    "x",
+    "h",
+}
+
+# Candidates scored by trigram similarity per title, by shared token weight
+MAX_CANDIDATES = 200
+
+# Below this similarity a title is left unclassified
+MIN_SIMILARITY = 0.3
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def normalize(text: str | None) -> List[str]:
+    """Lowercase words without stopwords, plural endings removed."""
+    tokens = []
+    for token in TOKEN_RE.findall((text or "").lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+
+    return tokens
+
+
+def trigrams(tokens: List[str]) -> FrozenSet[str]:
+    """The trigrams of every word padded with two spaces before and one after."""
+    return frozenset(
+        padded[i : i + 3]
+        for token in tokens
+        for padded in [f"  {token} "]
+        for i in range(len(padded) - 2)
+    )
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class Label(NamedTuple):
+    occupation_id: int
+    label: str
+    preferred: bool
+    trigrams: FrozenSet[str]
+
+
+class Classification(NamedTuple):
+    occupation_id: int
+    label: str
+    similarity: float
+
+
+class OccupationClassifier:
+    def __init__(self, labels: Iterable[Tuple[int, str, bool]]):
+        self.labels: List[Label] = []
+        index: Dict[str, List[int]] = defaultdict(list)
+
+        for occupation_id, label, preferred in labels:
+            tokens = normalize(label)
+            if not tokens:
+                continue
+
+            for token in set(tokens):
+                index[token].append(len(self.labels))
+            self.labels.append(Label(occupation_id, label, preferred, trigrams(tokens)))
+
+        self.index = dict(index)
+        # Rare tokens say more about the occupation than common ones (e.g "manager")
+        self.weights = {
+            token: log(1 + len(self.labels) / len(positions))
+            for token, positions in self.index.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def candidates(self, tokens: List[str]) -> List[int]:
+        weights: Dict[int, float] = defaultdict(float)
+        for token in set(tokens):
+            weight = self.weights.get(token, 0.0)
+            for position in self.index.get(token, ()):
+                weights[position] += weight
+
+        return sorted(weights, key=weights.__getitem__, reverse=True)[:MAX_CANDIDATES]
+
+    def classify(
+        self, title: str | None, min_similarity: float = MIN_SIMILARITY
+    ) -> Classification | None:
+        """The occupation whose label is the most similar to the title, if any."""
+        tokens = normalize(title)
+        title_trigrams = trigrams(tokens)
+
+        best, best_key = None, None
+        for position in self.candidates(tokens):
+            label = self.labels[position]
+            score = similarity(title_trigrams, label.trigrams)
+            key = (score, label.preferred, -len(label.label))
+            if score >= min_similarity and (best_key is None or key > best_key):
+                best, best_key = label, key
+
+        if best is None:
+            return None
+
+        return Classification(best.occupation_id, best.label, best_key[0])
+
+    def classify_many(
+        self, titles: List[str | None], min_similarity: float = MIN_SIMILARITY
+    ) -> List[Classification | None]:
+        # Job titles repeat a lot, each distinct title is classified once
+        results: Dict[str | None, Classification | None] = {}
+        for title in titles:
+            if title not in results:
+                results[title] = self.classify(title, min_similarity)
+
+        return [results[title] for title in titles]
+
+
+def build_occupation_classifier() -> OccupationClassifier:
+    return OccupationClassifier(
+        IscoOccupationLabel.objects.values_list(
+            "occupation_id", "label", "preferred"
+        ).iterator(chunk_size=10000)
+    )
+
+
+occupation_classifier = ProcessCache(
+    "occupation_classifier", build_occupation_classifier, [IscoOccupationLabel]
+)
+
+# Classifier of a worker process of the classify_jobs command
+_worker_classifier: OccupationClassifier | None = None
+
+
+def init_worker(classifier: OccupationClassifier):
+    global _worker_classifier
+    _worker_classifier = classifier
+
+
+def classify_batch(
+    titles: List[Tuple[int, str]], min_similarity: float
+) -> List[Tuple[int, int]]:
+    """The (pk, occupation id) of the classified (pk, title) jobs, in a worker process."""
+    results = _worker_classifier.classify_many(
+        [title for _, title in titles], min_similarity
+    )
+    return [
+        (pk, result.occupation_id)
+        for (pk, _), result in zip(titles, results)
+        if result is not None
+    ]
@@ -0,0 +1,186 @@
+"""
+Near duplicate detection of jobs (reposts and the same vacancy on several
+sources). The title and description of a job are shingled into word 3-grams,
+a MinHash signature estimates the Jaccard similarity of two shingle sets and
+locality sensitive hashing (LSH) buckets the signatures by bands, so that only
+jobs sharing a bucket are compared. Jobs are signed once, in increasing id
+order, and `Job.duplicate_cluster` is the id of the first job of a cluster.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from django.db import transaction
+
+from api.models import Job, JobSignature
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: jobs with a Jaccard similarity above ~0.7 likely share a band
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+# Estimated Jaccard similarity of the signatures from which jobs are duplicates
+MIN_SIMILARITY = 0.8
+# Shingles hashed at once, bounds the (permutations x shingles) matrix to ~100MB
+CHUNK_SHINGLES = 100_000
+
+# Fixed, the signatures of every run must be comparable
+_random = np.random.default_rng(20240601)
+# Multiply-shift hash functions standing for the permutations, with odd multipliers
+MULTIPLIERS = _random.integers(0, 2**64, NUM_PERMUTATIONS, dtype=np.uint64) | 1
+INCREMENTS = _random.integers(0, 2**64, NUM_PERMUTATIONS, dtype=np.uint64)
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def shingles(text: str) -> np.ndarray:
+    """The (crc32) hashes of the distinct word 3-grams of a text."""
+    tokens = TOKEN_RE.findall(text.lower())
+    grams = {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 1 if tokens else 0))
+    }
+    return np.fromiter(
+        (zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams)
+    )
+
+
+def signatures(documents: List[np.ndarray]) -> np.ndarray:
+    """
+    The MinHash signatures (uint32) of shingle hash arrays, one row per
+    document. Documents are hashed by chunks of CHUNK_SHINGLES shingles and
+    the minimum of every document is taken with a single reduceat.
+    """
+    result = np.full((len(documents), NUM_PERMUTATIONS), 2**32 - 1, dtype=np.uint32)
+    indexes = [i for i, document in enumerate(documents) if len(document)]
+
+    start = 0
+    while start < len(indexes):
+        end, size = start, 0
+        while end < len(indexes) and (end == start or size < CHUNK_SHINGLES):
+            size += len(documents[indexes[end]])
+            end += 1
+
+        chunk = indexes[start:end]
+        values = np.concatenate([documents[i] for i in chunk])
+        offsets = np.cumsum([0] + [len(documents[i]) for i in chunk[:-1]])
+        hashes = (MULTIPLIERS[:, None] * values + INCREMENTS[:, None]) >> np.uint64(32)
+        result[chunk] = np.minimum.reduceat(hashes, offsets, axis=1).T
+        start = end
+
+    return result
+
+
+def band_hashes(signatures: np.ndarray) -> np.ndarray:
+    """The (int64) hashes of every band of the signatures, including the band's position."""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    hashes = np.arange(BANDS, dtype=np.uint64)[None, :] ^ np.uint64(0xCBF29CE484222325)
+    for row in range(ROWS):
+        hashes = (hashes ^ bands[:, :, row]) * np.uint64(0x100000001B3)
+
+    return hashes.view(np.int64)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / NUM_PERMUTATIONS
+
+
+def cluster_batch(jobs: List[Tuple[int, str, str | None]]) -> int:
+    """
+    Signs a batch of (id, title, description) jobs and clusters them with the
+    signed jobs they share an LSH bucket with. Returns the number of batch jobs
+    found to duplicate an earlier job.
+    """
+    documents = [
+        shingles(f"{title}\n{description or ''}") for _, title, description in jobs
+    ]
+    batch_signatures = signatures(documents)
+    batch_bands = band_hashes(batch_signatures)
+
+    # Jobs without words get a signature (they are signed) but no bucket
+    bands = {
+        pk: (row.tolist() if len(document) else [])
+        for (pk, *_), row, document in zip(jobs, batch_bands, documents)
+    }
+
+    with transaction.atomic():
+        JobSignature.objects.bulk_create(
+            JobSignature(job_id=pk, signature=signature.tobytes(), bands=bands[pk])
+            for (pk, *_), signature in zip(jobs, batch_signatures)
+        )
+
+        batch_hashes = {value for values in bands.values() for value in values}
+        rows = JobSignature.objects.filter(
+            bands__overlap=list(batch_hashes)
+        ).values_list("job_id", "signature", "bands", "job__duplicate_cluster")
+
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        signature_of: Dict[int, np.ndarray] = {}
+        cluster_of: Dict[int, int] = {}
+        for pk, signature, job_bands, cluster in rows:
+            signature_of[pk] = np.frombuffer(signature, dtype=np.uint32)
+            cluster_of[pk] = pk if cluster is None else cluster
+            for value in job_bands:
+                if value in batch_hashes:
+                    buckets[value].append(pk)
+
+        # Union-find of jobs and clusters, whose root is the smallest id. An earlier
+        # job starts under its cluster, so that all of a cluster's jobs merge together
+        parent = {pk: cluster for pk, cluster in cluster_of.items() if pk != cluster}
+
+        def find(pk: int) -> int:
+            root = pk
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while pk != root:
+                parent[pk], pk = root, parent[pk]
+            return root
+
+        for pk, job_bands in bands.items():
+            for value in job_bands:
+                for other in buckets[value]:
+                    first, second = find(pk), find(other)
+                    if first != second and (
+                        similarity(signature_of[pk], signature_of[other])
+                        >= MIN_SIMILARITY
+                    ):
+                        parent[max(first, second)] = min(first, second)
+
+        # Earlier clusters joined by the batch take the id of the smallest one
+        merged: Dict[int, List[int]] = defaultdict(list)
+        for cluster in set(cluster_of.values()) - set(bands):
+            if find(cluster) != cluster:
+                merged[find(cluster)].append(cluster)
+        for cluster, earlier in merged.items():
+            Job.objects.filter(duplicate_cluster__in=earlier).update(
+                duplicate_cluster=cluster
+            )
+
+        clusters = {pk: find(pk) for pk in bands}
+        Job.objects.bulk_update(
+            [Job(pk=pk, duplicate_cluster=clusters[pk]) for pk in bands],
+            ["duplicate_cluster"],
+            batch_size=1000,
+        )
+
+    return sum(1 for pk in bands if clusters[pk] != pk)
+
+
+def deduplicate(batch_size: int = 2000, log: Callable[[str], None] = print) -> int:
+    """Signs and clusters every job without a signature. Returns their number."""
+    last, total = 0, 0
+    while True:
+        jobs = list(
+            Job.objects.filter(pk__gt=last, signature__isnull=True)
+            .order_by("pk")
+            .values_list("pk", "title", "description")[:batch_size]
+        )
+        if not jobs:
+            return total
+
+        duplicates = cluster_batch(jobs)
+        last, total = jobs[-1][0], total + len(jobs)
+        log(f"Signed {total} jobs, {duplicates} duplicates in the last batch.")
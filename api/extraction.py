@@ -0,0 +1,140 @@
+"""
+Skill extraction from free text. Every skill label (see EscoSkillLabel) is
+compiled into a single Aho-Corasick automaton over word tokens, so that a
+document is tagged in one pass over its tokens, whatever the number of skills.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+from api.models import *
+from api.taxonomy import ProcessCache
+
+# Text fields tagged by the extract_skills command, by entity
+EXTRACTION_FIELDS = {
+    Project: ["title", "objective"],
+    Organization: ["name", "description"],
+    Article: ["title", "summary"],
+    Course: ["title", "description"],
+    Job: ["title", "description"],
+    Profile: ["occupation", "content"],
+    LawPolicy: ["title", "summary"],
+    LawPublication: ["title", "summary"],
+}
+
+# Words, keeping the symbols of names like C++, C# or Node.js. Hyphens separate
+# words, so that "machine-learning" matches the label "machine learning"
+TOKEN_RE = re.compile(r"[\w+#]+(?:[.'][\w+#]+)*")
+
+
+def tokenize(text: str | None) -> List[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class SkillAutomaton:
+    """
+    Aho-Corasick automaton whose alphabet is the label tokens. A state is a
+    sequence of tokens that starts some label, `fail` links each state to its
+    longest suffix that is also a state and `output` holds the (number of
+    tokens, skill id) of the labels ending at a state, including its suffixes.
+    """
+
+    def __init__(self, labels: Iterable[Tuple[int, str]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, int]]] = [[]]
+
+        for skill_id, label in labels:
+            tokens = tokenize(label)
+            if not tokens:
+                continue
+
+            state = 0
+            for token in tokens:
+                next_state = self.goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][token] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+
+            if (len(tokens), skill_id) not in self.output[state]:
+                self.output[state].append((len(tokens), skill_id))
+
+        # Breadth first, so that the fail state of a state is complete before it
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(token, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return len(self.goto)
+
+    def matches(self, tokens: List[str]) -> List[Tuple[int, int, int]]:
+        """The (start, end, skill id) of every label occurrence in the tokens."""
+        goto, fail, output = self.goto, self.fail, self.output
+        found = []
+        state = 0
+
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+
+            for length, skill_id in output[state]:
+                found.append((position + 1 - length, position + 1, skill_id))
+
+        return found
+
+    def extract(self, text: str | None) -> List[int]:
+        """
+        The ids of the skills mentioned in the text, in order of appearance.
+        Overlapping mentions keep the leftmost longest one, so that "machine
+        learning" doesn't also tag "learning".
+        """
+        found = self.matches(tokenize(text))
+        found.sort(key=lambda match: (match[0], match[0] - match[1]))
+
+        skill_ids: Dict[int, None] = {}
+        span, covered = None, 0
+        for start, end, skill_id in found:
+            if (start, end) == span or start >= covered:
+                span, covered = (start, end), end
+                skill_ids.setdefault(skill_id)
+
+        return list(skill_ids)
+
+
+def build_skill_automaton() -> SkillAutomaton:
+    return SkillAutomaton(
+        EscoSkillLabel.objects.values_list("skill_id", "label").iterator(
+            chunk_size=10000
+        )
+    )
+
+
+skill_automaton = ProcessCache(
+    "skill_automaton", build_skill_automaton, [EscoSkillLabel]
+)
+
+# Automaton of a worker process of the extract_skills command
+_worker_automaton: SkillAutomaton | None = None
+
+
+def init_worker(automaton: SkillAutomaton):
+    global _worker_automaton
+    _worker_automaton = automaton
+
+
+def extract_batch(documents: List[Tuple[int, str]]) -> List[Tuple[int, List[int]]]:
+    """The (pk, skill ids) of (pk, text) documents, run in a worker process."""
+    return [(pk, _worker_automaton.extract(text)) for pk, text in documents]
@@ -1,4 +1,23 @@
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Set
+
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import OuterRef, Sum
+from django.db.models.expressions import RawSQL
+
+from api.models import *
+
+# Entities that have a `skills` link table and a denormalized `skill_ids` array
+SKILL_ENTITY_MODELS = [
+    Project,
+    Organization,
+    Article,
+    Course,
+    Job,
+    Profile,
+    LawPolicy,
+    LawPublication,
+]
 
 
 def get_descendants(id: str, map: Dict[str, List[str]], visited: Set[str]):
@@ -7,3 +26,198 @@ def get_descendants(id: str, map: Dict[str, List[str]], visited: Set[str]):
             if child not in visited:
                 visited.add(child)
                 get_descendants(child, map, visited)
+
+
+def get_closure(map: Dict[str, List[str]]) -> Dict[str, Dict[str, int]]:
+    """
+    Returns every node's descendants (including the node itself) with the
+    shortest distance to them, computed with a breadth-first walk over `map`.
+    """
+    closure: Dict[str, Dict[str, int]] = {}
+
+    for root in map:
+        depths = {root: 0}
+        frontier = [root]
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for child in map.get(node, []):
+                    if child in map and child not in depths:
+                        depths[child] = depths[node] + 1
+                        next_frontier.append(child)
+            frontier = next_frontier
+        closure[root] = depths
+
+    return closure
+
+
+def rebuild_occupation_closure() -> int:
+    """
+    Replaces the contents of the occupation closure table with the closure of
+    the occupations' `children`. Returns the number of stored rows.
+    """
+    occupations = IscoOccupation.objects.all().values("id", "uri", "children")
+    occupation_map: Dict[str, List[str]] = {
+        occupation["uri"]: occupation["children"] for occupation in occupations
+    }
+    ids = {occupation["uri"]: occupation["id"] for occupation in occupations}
+
+    rows = [
+        IscoOccupationClosure(
+            ancestor_id=ids[ancestor], descendant_id=ids[descendant], depth=depth
+        )
+        for ancestor, descendants in get_closure(occupation_map).items()
+        for descendant, depth in descendants.items()
+    ]
+
+    with transaction.atomic():
+        IscoOccupationClosure.objects.all().delete()
+        IscoOccupationClosure.objects.bulk_create(rows, batch_size=5000)
+
+    return len(rows)
+
+
+def sync_skill_ids(model, pks: Iterable[int] | None = None) -> int:
+    """
+    Refreshes the denormalized `skill_ids` of the given rows of `model` (or of
+    every row when `pks` is None) from its skill link table.
+    """
+    link_field = model.skills.field
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+
+    return queryset.update(
+        skill_ids=ArraySubquery(
+            link_field.model.objects.filter(**{link_field.name: OuterRef("pk")})
+            .order_by("skill_id")
+            .values("skill_id")
+        )
+    )
+
+
+def normalize_label(label: str | None) -> str:
+    return " ".join((label or "").split())
+
+
+def sync_labels(model, pks: Iterable[int] | None = None) -> int:
+    """
+    Refreshes the flattened labels (see EscoSkillLabel) of the given rows of a
+    taxonomy `model`, or of every row when `pks` is None, from their label and
+    alternative labels. Returns the number of stored labels.
+    """
+    entity_field = model.search_labels.field
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+
+    rows = []
+    for pk, label, alternative_labels in queryset.values_list(
+        "pk", "label", "alternative_labels"
+    ).iterator(chunk_size=5000):
+        seen = set()
+        for preferred, value in [
+            (True, label),
+            *((False, a) for a in alternative_labels),
+        ]:
+            value = normalize_label(value)
+            if value and value.lower() not in seen:
+                seen.add(value.lower())
+                rows.append(
+                    entity_field.model(
+                        **{entity_field.attname: pk},
+                        label=value,
+                        preferred=preferred,
+                    )
+                )
+
+    labels = entity_field.model.objects.all()
+    if pks is not None:
+        labels = labels.filter(**{f"{entity_field.name}__in": pks})
+
+    with transaction.atomic():
+        labels.delete()
+        entity_field.model.objects.bulk_create(rows, batch_size=5000)
+
+    return len(rows)
+
+
+# Levels JSON lists of the taxonomy models, with their (min, max) level columns
+LEVEL_FIELDS = {
+    EscoSkill: {
+        f"{pillar}_levels": (f"min_{pillar}_level", f"max_{pillar}_level")
+        for pillar in ("knowledge", "language", "skill", "traversal")
+    },
+    IscoOccupation: {"levels": ("min_level", "max_level")},
+}
+
+
+def sync_levels(model, pks: Iterable[int] | None = None) -> int:
+    """
+    Refreshes the min/max level columns of the given rows of a taxonomy
+    `model`, or of every row when `pks` is None, from their levels lists. The
+    columns of an empty list are null.
+    """
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    bounds = {}
+    for field, (min_field, max_field) in LEVEL_FIELDS[model].items():
+        column = f'"{model._meta.db_table}"."{model._meta.get_field(field).column}"'
+        for name, function in [(min_field, "MIN"), (max_field, "MAX")]:
+            bounds[name] = RawSQL(
+                f"(SELECT {function}(value::int) FROM jsonb_array_elements_text({column}))",
+                [],
+            )
+
+    return queryset.update(**bounds)
+
+
+# Tables the API responses don't depend on, written while serving requests
+UNVERSIONED_TABLES = [SlowQuery._meta.db_table, DataVersion._meta.db_table]
+
+
+def install_data_version_triggers(using: str = DEFAULT_DB_ALIAS):
+    """
+    Creates the statement-level triggers that append to DataVersion on every
+    api table but the unversioned ones. Run after every migrate, so that tables
+    added later are covered too.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT to_regprocedure('api_bump_data_version()')")
+        if cursor.fetchone()[0] is None:
+            return
+
+        cursor.execute(
+            "SELECT relname FROM pg_class "
+            "WHERE relnamespace = current_schema()::regnamespace "
+            "AND relkind IN ('r', 'p') AND NOT relispartition "
+            "AND relname LIKE %s AND relname <> ALL(%s)",
+            ["api\\_%", UNVERSIONED_TABLES],
+        )
+        for (table,) in cursor.fetchall():
+            cursor.execute(
+                "CREATE OR REPLACE TRIGGER data_version AFTER INSERT OR UPDATE "
+                f'OR DELETE OR TRUNCATE ON "{table}" '
+                "FOR EACH STATEMENT EXECUTE FUNCTION api_bump_data_version()"
+            )
+
+
+def get_data_version() -> str:
+    """
+    A stamp that changes whenever a row of the api tables is written: the sum
+    of the write counts, which become visible with the commit of the write,
+    and the oid of the DataVersion table, which changes when a dump is restored.
+    """
+    table = DataVersion._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT '{table}'::regclass::oid, COALESCE(SUM(version), 0) "
+            f'FROM "{table}"'
+        )
+        oid, version = cursor.fetchone()
+        return f"{oid}.{version}"
+
+
+def table_version(*models) -> int:
+    """The sum of the versions of the tables of `models`, changed by any write to them."""
+    return int(
+        DataVersion.objects.filter(
+            table__in=[model._meta.db_table for model in models]
+        ).aggregate(version=Sum("version"))["version"]
+        or 0
+    )
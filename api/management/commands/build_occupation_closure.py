@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.helpers import rebuild_occupation_closure
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the occupation closure table used for descendant filtering"
+
+    def handle(self, *args, **options):
+        count = rebuild_occupation_closure()
+        self.stdout.write(f"Stored {count} occupation closure rows.")
@@ -0,0 +1,40 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from api.semantic import SEMANTIC_FIELDS, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Embeds the text of entities into the memory-mapped vectors of the semantic "
+        "search and swaps them in for the running API processes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="Model names to index (e.g Job Course), all of them by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Documents embedded at once",
+        )
+
+    def handle(self, *args, **options):
+        names = {name.lower() for name in options["models"]}
+
+        for model in SEMANTIC_FIELDS:
+            if names and model.__name__.lower() not in names:
+                continue
+
+            start = perf_counter()
+            count = rebuild_index(model, options["batch_size"], log=self.stdout.write)
+            seconds = perf_counter() - start
+            self.stdout.write(
+                f"Indexed {count} {model.__name__} rows "
+                f"({count / max(seconds, 1e-9) * 60:.0f} documents/min)."
+            )
@@ -0,0 +1,26 @@
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.snapshot import build_arrays, taxonomy_version, write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the memory-mapped snapshot of the taxonomies shared by the API "
+        "processes and swaps it in, to be run after the taxonomies are updated"
+    )
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        # Read first, a write while the snapshot is built leaves it stale
+        version = taxonomy_version()
+        arrays = build_arrays(log=self.stdout.write)
+        path = Path(settings.TAXONOMY_SNAPSHOT)
+        write_snapshot(path, arrays, version)
+        self.stdout.write(
+            f"Wrote {path} ({path.stat().st_size / 1024 / 1024:.1f} MB) "
+            f"in {perf_counter() - start:.1f}s."
+        )
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.classification import (
+    MIN_SIMILARITY,
+    classify_batch,
+    init_worker,
+    occupation_classifier,
+)
+from api.models import Job, JobOccupation
+
+
+class Command(BaseCommand):
+    help = (
+        "Classifies job titles into ISCO occupations over a pool of worker "
+        "processes and stores the job occupation links, replacing the previous "
+        "classified links of the jobs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes (the number of CPUs by default)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Titles sent to a worker at once",
+        )
+        parser.add_argument(
+            "--min-similarity",
+            type=float,
+            default=MIN_SIMILARITY,
+            help="Titles less similar than this to every occupation label are left out",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only classify the jobs without any occupation",
+        )
+
+    def handle(self, *args, **options):
+        classifier = occupation_classifier.get()
+        self.stdout.write(f"Indexed {len(classifier)} occupation labels.")
+
+        queryset = Job.objects.order_by("pk")
+        if options["missing"]:
+            queryset = queryset.filter(occupations__isnull=True)
+
+        batch_size = options["batch_size"]
+        rows = queryset.values_list("pk", "title").iterator(chunk_size=batch_size)
+        batches = iter(lambda: list(islice(rows, batch_size)), [])
+
+        start = perf_counter()
+        jobs = links = 0
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            initializer=init_worker,
+            initargs=(classifier,),
+            # Forked workers inherit the set up Django apps
+            mp_context=multiprocessing.get_context("fork"),
+        ) as executor:
+
+            def submit(batch):
+                future = executor.submit(
+                    classify_batch, batch, options["min_similarity"]
+                )
+                return [pk for pk, _ in batch], future
+
+            # A few batches per worker in flight, not the whole table
+            pending = [submit(b) for b in islice(batches, options["workers"] * 4)]
+
+            while pending:
+                pks, future = pending.pop(0)
+                results = future.result()
+                pending.extend(submit(b) for b in islice(batches, 1))
+
+                # Links given by the source are kept, even for another occupation
+                with transaction.atomic():
+                    JobOccupation.objects.filter(
+                        job_id__in=pks, classified=True
+                    ).delete()
+                    JobOccupation.objects.bulk_create(
+                        [
+                            JobOccupation(
+                                job_id=pk, occupation_id=occupation_id, classified=True
+                            )
+                            for pk, occupation_id in results
+                        ],
+                        batch_size=5000,
+                        ignore_conflicts=True,
+                    )
+                jobs += len(pks)
+                links += len(results)
+
+        seconds = perf_counter() - start
+        self.stdout.write(
+            f"Classified {links} of {jobs} jobs "
+            f"({jobs / max(seconds, 1e-9) * 3600:.0f} titles/hour)."
+        )
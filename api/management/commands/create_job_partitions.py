@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from api.partitions import create_partitions, default_partition_months, next_month
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the monthly job partitions ahead of the current month and those of "
+        "the jobs waiting in the default partition. Meant to run every month"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Months after the current one that get a partition",
+        )
+
+    def handle(self, *args, **options):
+        months = default_partition_months()
+        month = date.today().replace(day=1)
+        for _ in range(options["months_ahead"] + 1):
+            months.append(month)
+            month = next_month(month)
+
+        created = create_partitions(months)
+        self.stdout.write(
+            f"Created {len(created)} partitions"
+            + (f": {', '.join(created)}." if created else ".")
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from api.deduplication import deduplicate
+from api.models import Job, JobSignature
+
+
+class Command(BaseCommand):
+    help = (
+        "Clusters near duplicate jobs (MinHash LSH over title and description). "
+        "Only jobs without a signature are processed, so it can run after every ingestion"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Jobs signed and clustered per transaction",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Forget every signature and cluster first, e.g after changing the parameters",
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            JobSignature.objects.all().delete()
+            Job.objects.update(duplicate_cluster=None)
+
+        count = deduplicate(options["batch_size"], log=self.stdout.write)
+        clusters = (
+            Job.objects.exclude(duplicate_cluster=None)
+            .values("duplicate_cluster")
+            .distinct()
+            .count()
+        )
+        self.stdout.write(f"Processed {count} jobs, {clusters} distinct jobs in total.")
@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.partitions import remove_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Removes the jobs of the months before a given one by detaching their "
+        "partitions, along with the rows linked to them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "before",
+            help="First month to keep (e.g 2020-01), the previous months are removed",
+        )
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            help="Keep the removed rows in archive_* tables instead of dropping them",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            before = date.fromisoformat(f"{options['before']}-01")
+        except ValueError:
+            raise CommandError(f"Invalid month {options['before']}, expected YYYY-MM.")
+
+        removed = remove_partitions(before, options["archive"])
+        action = "Archived" if options["archive"] else "Dropped"
+        self.stdout.write(
+            f"{action} {len(removed)} partitions"
+            + (f": {', '.join(removed)}." if removed else ".")
+        )
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import plans, runner
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the query plans of the list filters and link table lookups "
+        "without and with the workload indexes (benchmark databases only)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "cases", nargs="*", help="Names of the cases to run, all of them by default"
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Results file, benchmarks/results/<date>.json by default",
+        )
+
+    def handle(self, *args, **options):
+        cases = [
+            case
+            for case in plans.build_plan_cases()
+            if not options["cases"] or case.name in options["cases"]
+        ]
+
+        report = plans.run(cases, log=self.stdout.write)
+        path = runner.save(report, options["output"])
+        self.stdout.write(f"Saved the plans to {path}.")
@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from api.extraction import (
+    EXTRACTION_FIELDS,
+    extract_batch,
+    init_worker,
+    skill_automaton,
+)
+from api.helpers import sync_skill_ids
+
+
+class Command(BaseCommand):
+    help = (
+        "Tags the text of entities with the skills their labels mention, over a "
+        "pool of worker processes, and stores the skill links"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="Model names to tag (e.g Job Course), all of them by default",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes (the number of CPUs by default)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Documents sent to a worker at once",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only tag the rows without any skill",
+        )
+
+    def handle(self, *args, **options):
+        names = {name.lower() for name in options["models"]}
+        automaton = skill_automaton.get()
+        self.stdout.write(f"Built the label automaton ({len(automaton)} states).")
+
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            initializer=init_worker,
+            initargs=(automaton,),
+            # Forked workers inherit the set up Django apps
+            mp_context=multiprocessing.get_context("fork"),
+        ) as executor:
+            for model, fields in EXTRACTION_FIELDS.items():
+                if names and model.__name__.lower() not in names:
+                    continue
+
+                queryset = model.objects.order_by("pk")
+                if options["missing"]:
+                    queryset = queryset.filter(skill_ids=[])
+
+                start = perf_counter()
+                documents, links = self.tag(
+                    executor,
+                    model,
+                    fields,
+                    queryset,
+                    options["batch_size"],
+                    # A few batches per worker in flight, not the whole table
+                    options["workers"] * 4,
+                )
+                seconds = perf_counter() - start
+                self.stdout.write(
+                    f"Tagged {documents} {model.__name__} rows with {links} skill links "
+                    f"({documents / max(seconds, 1e-9) * 60:.0f} documents/min)."
+                )
+
+    def tag(self, executor, model, fields, queryset, batch_size, window):
+        link_field = model.skills.field
+        rows = queryset.values_list("pk", *fields).iterator(chunk_size=batch_size)
+        batches = (
+            [(pk, "\n".join(text or "" for text in texts)) for pk, *texts in batch]
+            for batch in iter(lambda: list(islice(rows, batch_size)), [])
+        )
+
+        documents = links = 0
+        pending = [executor.submit(extract_batch, b) for b in islice(batches, window)]
+
+        while pending:
+            results = pending.pop(0).result()
+            pending.extend(
+                executor.submit(extract_batch, b) for b in islice(batches, 1)
+            )
+
+            link_field.model.objects.bulk_create(
+                [
+                    link_field.model(**{link_field.attname: pk}, skill_id=skill_id)
+                    for pk, skill_ids in results
+                    for skill_id in skill_ids
+                ],
+                batch_size=5000,
+                ignore_conflicts=True,
+            )
+            sync_skill_ids(model, [pk for pk, _ in results])
+
+            documents += len(results)
+            links += sum(len(skill_ids) for _, skill_ids in results)
+
+        return documents, links
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import data
+
+
+class Command(BaseCommand):
+    help = "Generates a deterministic synthetic dataset for the benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplier of the row counts (1 means 100k jobs and 50k profiles)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Remove the synthetic data of a previous run first",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            data.clear()
+            self.stdout.write("Removed the previous synthetic data.")
+        elif data.exists():
+            raise CommandError(
+                "Synthetic data already exists, use --clear to replace it."
+            )
+
+        data.Generator(
+            scale=options["scale"], seed=options["seed"], log=self.stdout.write
+        ).generate()
@@ -0,0 +1,145 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+# Scans and sizes of the indexes of the api tables, those of partitions being
+# summed up into their partitioned index
+USAGE_SQL = r"""
+SELECT table_class.relname, index_class.relname, SUM(s.idx_scan),
+       SUM(pg_relation_size(s.indexrelid)), i.indisunique
+FROM pg_stat_user_indexes s
+LEFT JOIN pg_inherits inh ON inh.inhrelid = s.indexrelid
+JOIN pg_index i ON i.indexrelid = COALESCE(inh.inhparent, s.indexrelid)
+JOIN pg_class index_class ON index_class.oid = i.indexrelid
+JOIN pg_class table_class ON table_class.oid = i.indrelid
+WHERE table_class.relname LIKE 'api\_%'
+GROUP BY 1, 2, 5
+ORDER BY 4 DESC
+"""
+
+# Plain btree indexes (no expression or predicate), by their columns
+COLUMNS_SQL = r"""
+SELECT t.relname, c.relname, i.indkey::int2[], i.indisunique
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN pg_class t ON t.oid = i.indrelid
+JOIN pg_am am ON am.oid = c.relam
+WHERE t.relname LIKE 'api\_%' AND am.amname = 'btree'
+  AND i.indexprs IS NULL AND i.indpred IS NULL
+  AND NOT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = i.indexrelid)
+"""
+
+# Leaf density of the btree indexes with pgstattuple
+PGSTATINDEX_SQL = r"""
+SELECT c.relname, pg_relation_size(c.oid), 1 - (p).avg_leaf_density / 90
+FROM (
+    SELECT c.oid, c.relname, pgstatindex(c.oid) AS p
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_am am ON am.oid = c.relam
+    WHERE t.relname LIKE 'api\_%%' AND am.amname = 'btree' AND c.relkind = 'i'
+      AND pg_relation_size(c.oid) >= %s
+) c
+"""
+
+# Without pgstattuple, the size of the btree indexes is compared to the one of
+# their tuples (8 bytes of header and 4 of line pointer, the average width of
+# the key columns aligned on 8 bytes) in 90% full 8kB pages
+ESTIMATE_SQL = r"""
+SELECT c.relname, pg_relation_size(c.oid),
+       1 - c.reltuples * (12 + CEIL(SUM(st.avg_width) / 8.0) * 8)
+           / (8168 * 0.9) / (pg_relation_size(c.oid) / 8192)
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN pg_class t ON t.oid = i.indrelid
+JOIN pg_am am ON am.oid = c.relam
+JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(i.indkey)
+JOIN pg_stats st ON st.schemaname = current_schema()
+    AND st.tablename = t.relname AND st.attname = a.attname
+WHERE t.relname LIKE 'api\_%%' AND am.amname = 'btree' AND c.relkind = 'i'
+  AND i.indexprs IS NULL AND c.reltuples > 0 AND pg_relation_size(c.oid) >= %s
+GROUP BY c.oid, c.relname
+"""
+
+
+def pretty_size(size: int) -> str:
+    for unit in ("B", "kB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the unused, redundant and bloated indexes of the api tables, to "
+        "be dropped or rebuilt"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-size",
+            type=int,
+            default=1024 * 1024,
+            help="Smallest size (bytes) of a reported unused or bloated index",
+        )
+        parser.add_argument(
+            "--bloat",
+            type=float,
+            default=0.5,
+            help="Reported share of wasted space of an index (0.5 by default)",
+        )
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT stats_reset FROM pg_stat_database "
+                "WHERE datname = current_database()"
+            )
+            reset = cursor.fetchone()[0]
+            cursor.execute(USAGE_SQL)
+            usage = cursor.fetchall()
+            cursor.execute(COLUMNS_SQL)
+            columns = cursor.fetchall()
+
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pgstattuple'")
+            exact = cursor.fetchone() is not None
+            cursor.execute(
+                PGSTATINDEX_SQL if exact else ESTIMATE_SQL, [options["min_size"]]
+            )
+            bloat = cursor.fetchall()
+
+        self.stdout.write(
+            f"Unused indexes (no scan since {reset or 'the statistics were created'}):"
+        )
+        for table, index, scans, size, unique in usage:
+            # Unique indexes enforce a constraint, even if never scanned
+            if not scans and not unique and size >= options["min_size"]:
+                self.stdout.write(f"  {index} on {table} ({pretty_size(size)})")
+
+        self.stdout.write("Redundant indexes (prefix of another index):")
+        for table, index, keys, unique in columns:
+            for other_table, other, other_keys, _ in columns:
+                if (
+                    not unique
+                    and other != index
+                    and other_table == table
+                    and len(keys) <= len(other_keys)
+                    and other_keys[: len(keys)] == keys
+                    # Of two identical indexes, only one is reported
+                    and (len(keys) < len(other_keys) or index > other)
+                ):
+                    self.stdout.write(f"  {index} on {table}, covered by {other}")
+                    break
+
+        self.stdout.write(
+            "Bloated indexes ("
+            + ("pgstattuple" if exact else "estimated, install pgstattuple to measure")
+            + "):"
+        )
+        for index, size, wasted in sorted(bloat, key=lambda row: -row[1]):
+            if wasted is not None and wasted >= options["bloat"]:
+                self.stdout.write(
+                    f"  {index} ({pretty_size(size)}, {wasted:.0%} wasted), "
+                    "REINDEX INDEX CONCURRENTLY to rebuild"
+                )
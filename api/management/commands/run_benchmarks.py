@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import runner
+from benchmarks.cases import build_cases
+
+
+class Command(BaseCommand):
+    help = "Benchmarks every endpoint and saves the results as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "cases", nargs="*", help="Names of the cases to run, all of them by default"
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Results file, benchmarks/results/<date>.json by default",
+        )
+
+    def handle(self, *args, **options):
+        cases = [
+            case
+            for case in build_cases()
+            if not options["cases"] or case.name in options["cases"]
+        ]
+
+        report = runner.run(
+            cases, options["repeat"], options["warmup"], log=self.stdout.write
+        )
+        path = runner.save(report, options["output"])
+        self.stdout.write(f"Saved the results to {path}.")
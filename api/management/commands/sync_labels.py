@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.helpers import sync_labels
+from api.models import EscoSkill, IscoOccupation
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the flattened skill and occupation labels used by the label search"
+
+    def handle(self, *args, **options):
+        for model in [EscoSkill, IscoOccupation]:
+            count = sync_labels(model)
+            self.stdout.write(f"Stored {count} {model.__name__} labels.")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from api.helpers import LEVEL_FIELDS, sync_levels
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the min/max level columns of skills and occupations from their levels lists"
+
+    def handle(self, *args, **options):
+        for model in LEVEL_FIELDS:
+            count = sync_levels(model)
+            self.stdout.write(f"Synced the levels of {count} {model.__name__} rows.")
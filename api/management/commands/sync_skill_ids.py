@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.helpers import SKILL_ENTITY_MODELS, sync_skill_ids
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the denormalized skill_ids arrays from the skill link tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="Model names to sync (e.g Job Profile), all of them by default",
+        )
+
+    def handle(self, *args, **options):
+        names = {name.lower() for name in options["models"]}
+
+        for model in SKILL_ENTITY_MODELS:
+            if names and model.__name__.lower() not in names:
+                continue
+
+            count = sync_skill_ids(model)
+            self.stdout.write(f"Synced skill_ids of {count} {model.__name__} rows.")
@@ -0,0 +1,160 @@
+"""
+Prometheus metrics of the API, served on /metrics to the scrapes that send the
+METRICS_TOKEN as a bearer token (`authorization: {credentials: ...}` in the
+Prometheus scrape config). With gunicorn, set PROMETHEUS_MULTIPROC_DIR to an
+empty directory before the workers start so that every worker writes its values
+there and /metrics aggregates them (see prometheus_client's multiprocess mode).
+"""
+
+import hmac
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_DURATION = Histogram(
+    "skillab_request_duration_seconds",
+    "Duration of API requests",
+    ["route", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_QUERIES = Histogram(
+    "skillab_request_queries",
+    "SQL queries per API request",
+    ["route"],
+    buckets=(1, 2, 3, 5, 10, 25, 50, 100, 300),
+)
+ROWS_RETURNED = Histogram(
+    "skillab_rows_returned",
+    "Rows in the response of list endpoints",
+    ["route"],
+    buckets=(0, 1, 10, 50, 100, 200, 300),
+)
+CACHE_REQUESTS = Counter(
+    "skillab_cache_requests",
+    "Lookups in the in-process caches and the ETag check, by result (hit, miss or stale)",
+    ["cache", "result"],
+)
+PROPAGATION_DURATION = Histogram(
+    "skillab_propagation_duration_seconds",
+    "Duration of the propagation utilities",
+    ["utility"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PROPAGATION_RESULTS = Histogram(
+    "skillab_propagation_results",
+    "Number of skills or occupations returned by the propagation utilities",
+    ["utility"],
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000),
+)
+
+
+# Off while the process warms up (see api/warmup.py), whose requests and cache
+# loads aren't traffic
+_recording: ContextVar[bool] = ContextVar("metrics_recording", default=True)
+
+
+def recording() -> bool:
+    return _recording.get()
+
+
+@contextmanager
+def unrecorded():
+    """Records no metrics in this context (thread or task) until it exits."""
+    token = _recording.set(False)
+    try:
+        yield
+    finally:
+        _recording.reset(token)
+
+
+def count_cache(cache: str, result: str):
+    """Counts a lookup in an in-process cache or the ETag check by result."""
+    if recording():
+        CACHE_REQUESTS.labels(cache, result).inc()
+
+
+class DatabaseConnectionsCollector:
+    """Connections to the database by state (active, idle, ...), read at scrape time."""
+
+    def collect(self):
+        gauge = GaugeMetricFamily(
+            "skillab_db_connections",
+            "Connections to the API's database by state",
+            labels=["state"],
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(state, 'unknown'), COUNT(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() GROUP BY 1"
+            )
+            for state, count in cursor.fetchall():
+                gauge.add_metric([state], count)
+
+        yield gauge
+
+
+# Scraped from the database, so kept out of the (per worker) metric files
+DATABASE_REGISTRY = CollectorRegistry()
+DATABASE_REGISTRY.register(DatabaseConnectionsCollector())
+
+
+def route_name(request) -> str:
+    match = request.resolver_match
+    return match.url_name if match else "unmatched"
+
+
+def track_propagation(func):
+    """Records the duration and result size of a propagation utility view."""
+
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        start = perf_counter()
+        result = func(request, *args, **kwargs)
+        if not recording():
+            return result
+
+        PROPAGATION_DURATION.labels(func.__name__).observe(perf_counter() - start)
+        PROPAGATION_RESULTS.labels(func.__name__).observe(len(result))
+        return result
+
+    return wrapper
+
+
+def metrics(request):
+    if settings.METRICS_TOKEN is None:
+        raise Http404()
+
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), expected
+    ):
+        response = HttpResponse("Invalid metrics token.", status=401)
+        response.headers["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return HttpResponse(
+        generate_latest(registry) + generate_latest(DATABASE_REGISTRY),
+        content_type=CONTENT_TYPE_LATEST,
+    )
@@ -0,0 +1,343 @@
+import json
+import logging
+import re
+from hashlib import sha1
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponseNotModified
+from django.http.request import RawPostDataException
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.regex_helper import _lazy_re_compile
+
+from api import slow_queries
+from api.helpers import get_data_version
+from api.metrics import (
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    count_cache,
+    recording,
+    route_name,
+)
+from api.semantic import SEMANTIC_FIELDS, index_stamp
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+logger = logging.getLogger("api.profiling")
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+# Form fields whose values are redacted from the profiling log
+re_sensitive_field = _lazy_re_compile(r"pass|secret|token|csrf", re.IGNORECASE)
+
+# API paths whose responses don't depend on the data
+UNVERSIONED_PATHS = ("/api/docs", "/api/openapi.json")
+# Semantic search paths, whose responses also depend on the index of their model
+SEMANTIC_PATHS = {
+    f"/api/search/semantic/{model._meta.verbose_name_plural}": model
+    for model in SEMANTIC_FIELDS
+}
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses with brotli when the client accepts it and the
+    brotli package is installed, otherwise with gzip.
+    """
+
+    brotli_quality = 5
+
+    def process_response(self, request, response):
+        if (
+            brotli is None
+            or response.streaming
+            or len(response.content) < 200
+            or response.has_header("Content-Encoding")
+            or not re_accepts_brotli.search(
+                request.META.get("HTTP_ACCEPT_ENCODING", "")
+            )
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        compressed_content = brotli.compress(
+            response.content, quality=self.brotli_quality
+        )
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+
+        return response
+
+
+class DataVersionETagMiddleware:
+    """
+    Tags API responses with an ETag of the request (method, URL and body) and
+    the data version (and the semantic index of the semantic searches), and
+    answers a repeated query with 304 Not Modified, without running it, while
+    the data hasn't changed. POST queries are included since every list
+    endpoint of the API is a POST.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            request.method not in ("GET", "HEAD", "POST")
+            or not request.path.startswith("/api/")
+            or request.path.startswith(UNVERSIONED_PATHS)
+        ):
+            return self.get_response(request)
+
+        version = get_data_version()
+        model = SEMANTIC_PATHS.get(request.path.rstrip("/"))
+        if model is not None:
+            version = f"{version}:{index_stamp(model)}"
+
+        digest = sha1(
+            f"{version}:{request.method}:{request.get_full_path()}:".encode()
+            + request.body
+        ).hexdigest()
+        # Weak, since the same content may be sent with different encodings
+        etag = f'W/"{digest}"'
+
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            count_cache("etag", "hit")
+            response = HttpResponseNotModified()
+            response.headers["ETag"] = etag
+            return response
+
+        count_cache("etag", "miss")
+        response = self.get_response(request)
+        if response.status_code == 200 and not response.has_header("ETag"):
+            response.headers["ETag"] = etag
+
+        return response
+
+
+@receiver(connection_created)
+def reset_statement_timeout(sender, connection, **kwargs):
+    connection.statement_timeout = 0
+
+
+def set_statement_timeout(ms: int):
+    """Sets Postgres' statement_timeout, unless the connection already has it."""
+    if getattr(connection, "statement_timeout", 0) != ms:
+        with connection.cursor() as cursor:
+            cursor.execute("SET statement_timeout = %s", [ms])
+        connection.statement_timeout = ms
+
+
+class StatementTimeoutMiddleware:
+    """
+    Limits the run time of each SQL statement of an API request to the
+    route's STATEMENT_TIMEOUTS, so that a pathological filter combination can't
+    hold a database core for minutes. A cancelled statement is answered with
+    503 (see skillab/urls.py). Other requests (e.g the admin) are not limited.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.path.startswith("/api/"):
+            timeouts = settings.STATEMENT_TIMEOUTS
+            set_statement_timeout(
+                timeouts.get(route_name(request), timeouts["default"])
+            )
+        else:
+            set_statement_timeout(0)
+
+
+class MetricsMiddleware:
+    """Records the duration and the number of queries of API requests by route."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith("/api/") or not recording():
+            return self.get_response(request)
+
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = perf_counter()
+        with connection.execute_wrapper(count):
+            response = self.get_response(request)
+
+        route = route_name(request)
+        REQUEST_DURATION.labels(route, request.method, response.status_code).observe(
+            perf_counter() - start
+        )
+        REQUEST_QUERIES.labels(route).observe(queries)
+
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Collects the API queries slower than SLOW_QUERY_MS and hands them to the
+    slow query log (api/slow_queries.py) with the request's filter combination.
+    Enabled unless SLOW_QUERY_LOG=0.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith("/api/"):
+            return self.get_response(request)
+
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            start = perf_counter()
+            completed = False
+            try:
+                result = execute(sql, params, many, context)
+                completed = True
+                return result
+            finally:
+                ms = (perf_counter() - start) * 1000
+                if ms >= settings.SLOW_QUERY_MS and not many:
+                    queries.append((sql, params, ms, completed))
+
+        with connection.execute_wrapper(record):
+            response = self.get_response(request)
+
+        if queries:
+            slow_queries.record(
+                route_name(request), slow_queries.filter_combination(request), queries
+            )
+
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Times every API request, split into the time spent in the database and
+    the rest (filter parsing, response validation and rendering), and sends it
+    as a Server-Timing header and a JSON log line. Queries slower than
+    SLOW_QUERY_MS are logged with their SQL (not their parameters), and with
+    their plan when the request has an `X-Explain: 1` header, honoured in DEBUG
+    or for staff users only. Enabled with PROFILING=1.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith("/api/"):
+            return self.get_response(request)
+
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            start = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append((sql, params, many, perf_counter() - start))
+
+        start = perf_counter()
+        with connection.execute_wrapper(record):
+            response = self.get_response(request)
+        total_ms = (perf_counter() - start) * 1000
+
+        db_ms = sum(duration for *_, duration in queries) * 1000
+        serialize_ms = total_ms - db_ms
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={db_ms:.1f};desc="{len(queries)} queries"',
+                f"serialize;dur={serialize_ms:.1f}",
+                f"total;dur={total_ms:.1f}",
+            ]
+        )
+
+        user = getattr(request, "user", None)
+        explain = request.headers.get("X-Explain") == "1" and (
+            settings.DEBUG or (user is not None and user.is_staff)
+        )
+        slow_queries = [
+            {
+                "sql": sql,
+                "ms": round(duration * 1000, 1),
+                "plan": explain_query(sql, params) if explain and not many else None,
+            }
+            for sql, params, many, duration in queries
+            if duration * 1000 >= settings.SLOW_QUERY_MS
+        ]
+
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.get_full_path(),
+                    "body": request_body(request)[:2000],
+                    "status": response.status_code,
+                    "total_ms": round(total_ms, 1),
+                    "db_ms": round(db_ms, 1),
+                    "serialize_ms": round(serialize_ms, 1),
+                    "queries": len(queries),
+                    "slow_queries": slow_queries,
+                }
+            )
+        )
+
+        return response
+
+
+def request_body(request) -> str:
+    """The body of a request, form fields (without files) having sensitive values redacted."""
+    if request.content_type in (
+        "application/x-www-form-urlencoded",
+        "multipart/form-data",
+    ):
+        form = request.POST.copy()
+        for key in form:
+            if re_sensitive_field.search(key):
+                form.setlist(key, ["[redacted]"])
+        return form.urlencode(safe="[]")
+
+    try:
+        return request.body.decode(errors="replace")
+    except RawPostDataException:
+        return ""
+
+
+def explain_query(sql: str, params) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {sql}", params)
+        return "\n".join(row[0] for row in cursor.fetchall())
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# A copy of api.helpers.get_closure as of this migration
+def get_closure(map):
+    closure = {}
+
+    for root in map:
+        depths = {root: 0}
+        frontier = [root]
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for child in map.get(node, []):
+                    if child in map and child not in depths:
+                        depths[child] = depths[node] + 1
+                        next_frontier.append(child)
+            frontier = next_frontier
+        closure[root] = depths
+
+    return closure
+
+
+def build_closure(apps, schema_editor):
+    IscoOccupation = apps.get_model("api", "IscoOccupation")
+    IscoOccupationClosure = apps.get_model("api", "IscoOccupationClosure")
+
+    occupation_map = {
+        occupation["id"]: occupation["children"]
+        for occupation in IscoOccupation.objects.values("id", "children")
+    }
+    IscoOccupationClosure.objects.bulk_create(
+        (
+            IscoOccupationClosure(
+                ancestor_id=ancestor, descendant_id=descendant, depth=depth
+            )
+            for ancestor, descendants in get_closure(occupation_map).items()
+            for descendant, depth in descendants.items()
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_alter_course_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IscoOccupationClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField(help_text='Shortest distance between the ancestor and the descendant (0 for the occupation itself)')),
+                ('ancestor', models.ForeignKey(help_text='The ancestor occupation (or the occupation itself).', on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='api.iscooccupation')),
+                ('descendant', models.ForeignKey(help_text='The descendant occupation (or the occupation itself).', on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='api.iscooccupation')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_occupation_closure')],
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
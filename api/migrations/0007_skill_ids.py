@@ -0,0 +1,115 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:46
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import migrations, models
+from django.db.models import OuterRef
+
+ENTITY_LINKS = [
+    ("Project", "ProjectSkill", "project"),
+    ("Organization", "OrganizationSkill", "organization"),
+    ("Article", "ArticleSkill", "article"),
+    ("Course", "CourseSkill", "course"),
+    ("Job", "JobSkill", "job"),
+    ("Profile", "ProfileSkill", "profile"),
+    ("LawPolicy", "LawPolicySkill", "law_policy"),
+    ("LawPublication", "LawPublicationSkill", "law_publication"),
+]
+
+
+def backfill_skill_ids(apps, schema_editor):
+    for entity_name, link_name, link_field in ENTITY_LINKS:
+        entity = apps.get_model("api", entity_name)
+        link = apps.get_model("api", link_name)
+        entity.objects.update(
+            skill_ids=ArraySubquery(
+                link.objects.filter(**{link_field: OuterRef("pk")})
+                .order_by("skill_id")
+                .values("skill_id")
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_iscooccupationclosure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, help_text="IDs of the article's skills, kept in sync with its skill links", size=None),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, help_text="IDs of the course's skills, kept in sync with its skill links", size=None),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, help_text="IDs of the job's skills, kept in sync with its skill links", size=None),
+        ),
+        migrations.AddField(
+            model_name='lawpolicy',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, help_text="IDs of the law/policy's skills, kept in sync with its skill links", size=None),
+        ),
+        migrations.AddField(
+            model_name='lawpublication',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, help_text="IDs of the law publication's skills, kept in sync with its skill links", size=None),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, help_text="IDs of the organization's skills, kept in sync with its skill links", size=None),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, help_text="IDs of the profile's skills, kept in sync with its skill links", size=None),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='skill_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, help_text="IDs of the project's skills, kept in sync with its skill links", size=None),
+        ),
+        # Backfill before building the GIN indexes, it is much faster that way
+        migrations.RunPython(backfill_skill_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='article_skill_ids'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='course_skill_ids'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='job_skill_ids'),
+        ),
+        migrations.AddIndex(
+            model_name='lawpolicy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='law_policy_skill_ids'),
+        ),
+        migrations.AddIndex(
+            model_name='lawpublication',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='law_publication_skill_ids'),
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='organization_skill_ids'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='profile_skill_ids'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name='project_skill_ids'),
+        ),
+    ]
@@ -0,0 +1,248 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:47
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import migrations, models
+from django.db.models import OuterRef
+
+# (taxonomy model, [(link model, link field), ...])
+TAXONOMY_LINKS = [
+    (
+        "EscoSkill",
+        [
+            ("ProjectSkill", "skill"),
+            ("OrganizationSkill", "skill"),
+            ("ArticleSkill", "skill"),
+            ("CourseSkill", "skill"),
+            ("JobSkill", "skill"),
+            ("ProfileSkill", "skill"),
+            ("LawPolicySkill", "skill"),
+            ("LawPublicationSkill", "skill"),
+        ],
+    ),
+    (
+        "IscoOccupation",
+        [
+            ("JobOccupation", "occupation"),
+            ("IscoOccupationClosure", "ancestor"),
+            ("IscoOccupationClosure", "descendant"),
+        ],
+    ),
+]
+
+# (entity model, link model, link field, skill_ids GIN index name)
+ENTITY_LINKS = [
+    ("Project", "ProjectSkill", "project", "project_skill_ids"),
+    ("Organization", "OrganizationSkill", "organization", "organization_skill_ids"),
+    ("Article", "ArticleSkill", "article", "article_skill_ids"),
+    ("Course", "CourseSkill", "course", "course_skill_ids"),
+    ("Job", "JobSkill", "job", "job_skill_ids"),
+    ("Profile", "ProfileSkill", "profile", "profile_skill_ids"),
+    ("LawPolicy", "LawPolicySkill", "law_policy", "law_policy_skill_ids"),
+    (
+        "LawPublication",
+        "LawPublicationSkill",
+        "law_publication",
+        "law_publication_skill_ids",
+    ),
+]
+
+
+def rewrite_keys(apps, schema_editor, key_type, array_type):
+    """
+    Replaces the primary keys of the taxonomy tables with columns of
+    `key_type` and rewrites every referencing column to the new keys: integer
+    identity columns, or back to the URIs. The foreign keys, their indexes and
+    the unique constraints are created again, and the `skill_ids` arrays are
+    emptied as `array_type`.
+    """
+    execute = schema_editor.execute
+    quote = schema_editor.quote_name
+    uri_keys = key_type.startswith("varchar")
+
+    for taxonomy_name, links in TAXONOMY_LINKS:
+        taxonomy = apps.get_model("api", taxonomy_name)
+        table = quote(taxonomy._meta.db_table)
+
+        execute(f"ALTER TABLE {table} ADD COLUMN new_id {key_type}")
+        if uri_keys:
+            execute(f"UPDATE {table} SET new_id = uri")
+
+        for link_name, field_name in links:
+            link = apps.get_model("api", link_name)
+            field = link._meta.get_field(field_name)
+            link_table = quote(link._meta.db_table)
+            column = quote(field.column)
+            new_column = quote(f"new_{field.column}")
+            column_type = "varchar(255)" if uri_keys else "integer"
+
+            execute(f"ALTER TABLE {link_table} ADD COLUMN {new_column} {column_type}")
+            execute(
+                f"UPDATE {link_table} SET {new_column} = t.new_id FROM {table} t "
+                f"WHERE {link_table}.{column} = t.id"
+            )
+            # Drops the old foreign key, its indexes and the unique constraints
+            execute(f"ALTER TABLE {link_table} DROP COLUMN {column}")
+            execute(f"ALTER TABLE {link_table} RENAME COLUMN {new_column} TO {column}")
+            execute(f"ALTER TABLE {link_table} ALTER COLUMN {column} SET NOT NULL")
+
+        execute(f"ALTER TABLE {table} DROP COLUMN id")
+        execute(f"ALTER TABLE {table} RENAME COLUMN new_id TO id")
+        execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        if uri_keys:
+            execute(
+                f"CREATE INDEX {quote(f'{taxonomy._meta.db_table}_id_like')} "
+                f"ON {table} (id varchar_pattern_ops)"
+            )
+
+        for link_name, field_name in links:
+            link = apps.get_model("api", link_name)
+            field = link._meta.get_field(field_name)
+            name = f"{link._meta.db_table}_{field.column}"
+            link_table = quote(link._meta.db_table)
+            column = quote(field.column)
+
+            execute(f"CREATE INDEX {quote(f'{name}_idx')} ON {link_table} ({column})")
+            if uri_keys:
+                execute(
+                    f"CREATE INDEX {quote(f'{name}_like')} "
+                    f"ON {link_table} ({column} varchar_pattern_ops)"
+                )
+            execute(
+                f"ALTER TABLE {link_table} ADD CONSTRAINT {quote(f'{name}_fk')} "
+                f"FOREIGN KEY ({column}) REFERENCES {table} (id) "
+                "DEFERRABLE INITIALLY DEFERRED"
+            )
+
+    for link_name in {name for _, links in TAXONOMY_LINKS for name, _ in links}:
+        link = apps.get_model("api", link_name)
+        for constraint in link._meta.constraints:
+            schema_editor.add_constraint(link, constraint)
+
+    for entity_name, *_ in ENTITY_LINKS:
+        entity = apps.get_model("api", entity_name)
+        execute(
+            f"ALTER TABLE {quote(entity._meta.db_table)} "
+            f"ALTER COLUMN skill_ids TYPE {array_type} USING '{{}}'::{array_type}"
+        )
+
+
+def swap_primary_keys(apps, schema_editor):
+    rewrite_keys(
+        apps, schema_editor, "integer GENERATED BY DEFAULT AS IDENTITY", "integer[]"
+    )
+
+
+def restore_uri_keys(apps, schema_editor):
+    rewrite_keys(apps, schema_editor, "varchar(255)", "varchar(255)[]")
+
+    # The URIs of the skills, as backfilled by 0007_skill_ids
+    quote = schema_editor.quote_name
+    for entity_name, link_name, link_field, _ in ENTITY_LINKS:
+        entity = apps.get_model("api", entity_name)
+        link = apps.get_model("api", link_name)
+        table = quote(entity._meta.db_table)
+        column = quote(link._meta.get_field(link_field).column)
+        schema_editor.execute(
+            f"UPDATE {table} SET skill_ids = ARRAY("
+            f"SELECT skill_id FROM {quote(link._meta.db_table)} l "
+            f"WHERE l.{column} = {table}.id ORDER BY skill_id)"
+        )
+
+
+def backfill_skill_ids(apps, schema_editor):
+    for entity_name, link_name, link_field, _ in ENTITY_LINKS:
+        entity = apps.get_model("api", entity_name)
+        link = apps.get_model("api", link_name)
+        entity.objects.update(
+            skill_ids=ArraySubquery(
+                link.objects.filter(**{link_field: OuterRef("pk")})
+                .order_by("skill_id")
+                .values("skill_id")
+            )
+        )
+
+
+def skill_ids_field(name):
+    return django.contrib.postgres.fields.ArrayField(
+        base_field=models.IntegerField(),
+        blank=True,
+        default=list,
+        help_text=f"IDs of the {name}'s skills, kept in sync with its skill links",
+        size=None,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_skill_ids'),
+    ]
+
+    operations = [
+        # Rewriting rows that are rewritten again would queue deferred foreign key
+        # checks, and Postgres refuses to ALTER a table with pending trigger events
+        migrations.RunSQL("SET CONSTRAINTS ALL IMMEDIATE", "SET CONSTRAINTS ALL DEFERRED"),
+        migrations.AddField(
+            model_name='escoskill',
+            name='uri',
+            field=models.CharField(help_text='The ESCO URI of the skill', max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='iscooccupation',
+            name='uri',
+            field=models.CharField(help_text='The ESCO URI of the occupation', max_length=255, null=True),
+        ),
+        migrations.RunSQL(
+            "UPDATE api_escoskill SET uri = id; UPDATE api_iscooccupation SET uri = id;",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='escoskill',
+            name='uri',
+            field=models.CharField(help_text='The ESCO URI of the skill', max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='iscooccupation',
+            name='uri',
+            field=models.CharField(help_text='The ESCO URI of the occupation', max_length=255, unique=True),
+        ),
+        *[
+            migrations.RemoveIndex(model_name=entity.lower(), name=index_name)
+            for entity, _, _, index_name in ENTITY_LINKS
+        ],
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='escoskill',
+                    name='id',
+                    field=models.AutoField(primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='iscooccupation',
+                    name='id',
+                    field=models.AutoField(primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(model_name='article', name='skill_ids', field=skill_ids_field('article')),
+                migrations.AlterField(model_name='course', name='skill_ids', field=skill_ids_field('course')),
+                migrations.AlterField(model_name='job', name='skill_ids', field=skill_ids_field('job')),
+                migrations.AlterField(model_name='lawpolicy', name='skill_ids', field=skill_ids_field('law/policy')),
+                migrations.AlterField(model_name='lawpublication', name='skill_ids', field=skill_ids_field('law publication')),
+                migrations.AlterField(model_name='organization', name='skill_ids', field=skill_ids_field('organization')),
+                migrations.AlterField(model_name='profile', name='skill_ids', field=skill_ids_field('profile')),
+                migrations.AlterField(model_name='project', name='skill_ids', field=skill_ids_field('project')),
+            ],
+        ),
+        migrations.RunPython(swap_primary_keys, restore_uri_keys),
+        # The URIs are backfilled again by restore_uri_keys
+        migrations.RunPython(backfill_skill_ids, migrations.RunPython.noop),
+        *[
+            migrations.AddIndex(
+                model_name=entity.lower(),
+                index=django.contrib.postgres.indexes.GinIndex(fields=['skill_ids'], name=index_name),
+            )
+            for entity, _, _, index_name in ENTITY_LINKS
+        ],
+        migrations.RunSQL("SET CONSTRAINTS ALL DEFERRED", "SET CONSTRAINTS ALL IMMEDIATE"),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_integer_taxonomy_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        help_text="Hash of the route and the filter combination",
+                        max_length=40,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "route",
+                    models.CharField(
+                        help_text="Route name of the endpoint", max_length=255
+                    ),
+                ),
+                (
+                    "filters",
+                    models.JSONField(
+                        help_text="The filter combination: number of values of each list filter and the value of the others"
+                    ),
+                ),
+                ("sql", models.TextField(help_text="SQL of the latest slow query")),
+                (
+                    "count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of slow queries of the combination"
+                    ),
+                ),
+                (
+                    "total_ms",
+                    models.FloatField(
+                        default=0, help_text="Total duration of the slow queries in ms"
+                    ),
+                ),
+                (
+                    "max_ms",
+                    models.FloatField(
+                        default=0, help_text="Duration of the slowest query in ms"
+                    ),
+                ),
+                (
+                    "plan",
+                    models.TextField(
+                        blank=True,
+                        help_text="EXPLAIN (ANALYZE, BUFFERS) output of the latest sampled query",
+                        null=True,
+                    ),
+                ),
+                ("first_seen", models.DateTimeField(auto_now_add=True)),
+                ("last_seen", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "slow queries",
+            },
+        ),
+    ]
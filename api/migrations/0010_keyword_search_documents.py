@@ -0,0 +1,181 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:14
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_slowquery"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="article",
+            name="article_search",
+        ),
+        migrations.RemoveIndex(
+            model_name="course",
+            name="course_search",
+        ),
+        migrations.RemoveIndex(
+            model_name="job",
+            name="job_search",
+        ),
+        migrations.RemoveIndex(
+            model_name="lawpolicy",
+            name="law_policy_search",
+        ),
+        migrations.RemoveIndex(
+            model_name="lawpublication",
+            name="law_publication_search",
+        ),
+        migrations.RemoveIndex(
+            model_name="organization",
+            name="organization_search",
+        ),
+        migrations.RemoveIndex(
+            model_name="profile",
+            name="profile_search",
+        ),
+        migrations.RemoveIndex(
+            model_name="project",
+            name="project_search",
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("title"),
+                        models.Value("\n"),
+                        models.F("summary"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="article_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("title"),
+                        models.Value("\n"),
+                        models.F("description"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="course_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("title"),
+                        models.Value("\n"),
+                        models.F("description"),
+                        models.Value("\n"),
+                        models.F("location"),
+                        models.Value("\n"),
+                        models.F("type"),
+                        models.Value("\n"),
+                        models.F("experience_level"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="job_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawpolicy",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("title"),
+                        models.Value("\n"),
+                        models.F("summary"),
+                        models.Value("\n"),
+                        models.F("authors"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="law_policy_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawpublication",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("title"),
+                        models.Value("\n"),
+                        models.F("authors"),
+                        models.Value("\n"),
+                        models.F("summary"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="law_publication_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="organization",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("name"),
+                        models.Value("\n"),
+                        models.F("description"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="organization_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("full_name"),
+                        models.Value("\n"),
+                        models.F("location"),
+                        models.Value("\n"),
+                        models.F("content"),
+                        models.Value("\n"),
+                        models.F("occupation"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="profile_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("title"),
+                        models.Value("\n"),
+                        models.F("objective"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="project_search",
+            ),
+        ),
+    ]
@@ -0,0 +1,145 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:17
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_labels(apps, schema_editor):
+    for entity_name, label_name, entity_field in [
+        ("EscoSkill", "EscoSkillLabel", "skill_id"),
+        ("IscoOccupation", "IscoOccupationLabel", "occupation_id"),
+    ]:
+        entity = apps.get_model("api", entity_name)
+        label_model = apps.get_model("api", label_name)
+
+        rows = []
+        for pk, label, alternative_labels in entity.objects.values_list(
+            "pk", "label", "alternative_labels"
+        ).iterator(chunk_size=5000):
+            seen = set()
+            labels = [(True, label)] + [(False, value) for value in alternative_labels]
+            for preferred, value in labels:
+                value = " ".join((value or "").split())
+                if value and value.lower() not in seen:
+                    seen.add(value.lower())
+                    rows.append(
+                        label_model(
+                            **{entity_field: pk}, label=value, preferred=preferred
+                        )
+                    )
+
+        label_model.objects.bulk_create(rows, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_keyword_search_documents"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EscoSkillLabel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="A preferred or alternative label of the skill",
+                        max_length=2048,
+                    ),
+                ),
+                (
+                    "preferred",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Whether the label is the skill's preferred label",
+                    ),
+                ),
+                (
+                    "skill",
+                    models.ForeignKey(
+                        help_text="The skill that has the label.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_labels",
+                        to="api.escoskill",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["label"],
+                        name="skill_label_search",
+                        opclasses=["gin_trgm_ops"],
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("skill", "label"), name="unique_skill_label"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="IscoOccupationLabel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="A preferred or alternative label of the occupation",
+                        max_length=2048,
+                    ),
+                ),
+                (
+                    "preferred",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Whether the label is the occupation's preferred label",
+                    ),
+                ),
+                (
+                    "occupation",
+                    models.ForeignKey(
+                        help_text="The occupation that has the label.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_labels",
+                        to="api.iscooccupation",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["label"],
+                        name="occupation_label_search",
+                        opclasses=["gin_trgm_ops"],
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("occupation", "label"), name="unique_occupation_label"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_labels, migrations.RunPython.noop),
+    ]
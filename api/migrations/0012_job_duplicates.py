@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:26
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_taxonomy_labels"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobSignature",
+            fields=[
+                (
+                    "job",
+                    models.OneToOneField(
+                        help_text="The job that the signature belongs to.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="signature",
+                        serialize=False,
+                        to="api.job",
+                    ),
+                ),
+                (
+                    "signature",
+                    models.BinaryField(
+                        help_text="MinHash signature of the job's title and description (uint32 values)"
+                    ),
+                ),
+                (
+                    "bands",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.BigIntegerField(),
+                        help_text="LSH hashes of the signature's bands, jobs sharing one are duplicate candidates",
+                        size=None,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="duplicate_cluster",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="ID of the first job of its near duplicates (set by the deduplicate_jobs command)",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["duplicate_cluster", "id"], name="job_duplicate_cluster"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobsignature",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["bands"], name="job_signature_bands"
+            ),
+        ),
+    ]
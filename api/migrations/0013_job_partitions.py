@@ -0,0 +1,248 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:53
+
+import re
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Monthly partitions created ahead of the current month
+MONTHS_AHEAD = 3
+
+# Tables of the rows linked to jobs, with foreign keys to api_jobkey
+LINK_TABLES = ["api_jobskill", "api_joboccupation", "api_jobsignature"]
+
+# The keys were unique until now, under the unique_source_job constraint of api_job
+KEYS_SQL = (
+    "INSERT INTO api_jobkey (id, source, source_id) "
+    "SELECT id, source, source_id FROM api_job"
+)
+
+# Keeps the keys in step with the jobs. A job whose key exists is a row moved
+# between partitions (by create_partitions or an update of its upload date),
+# unless another job has its id. A key is only deleted with the last row of its
+# id, since a move deletes the row from its old partition.
+KEY_FUNCTION_SQL = """
+CREATE FUNCTION api_job_key() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM api_jobkey WHERE id = OLD.id
+        AND NOT EXISTS (SELECT 1 FROM api_job WHERE id = OLD.id);
+        RETURN NULL;
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE api_jobkey SET id = NEW.id, source = NEW.source, source_id = NEW.source_id
+        WHERE id = OLD.id;
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO api_jobkey (id, source, source_id)
+    VALUES (NEW.id, NEW.source, NEW.source_id)
+    ON CONFLICT (id) DO NOTHING;
+    IF NOT FOUND AND EXISTS (SELECT 1 FROM api_job WHERE id = NEW.id) THEN
+        RAISE unique_violation USING MESSAGE = format('Key (id)=(%s) already exists.', NEW.id);
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER job_key BEFORE INSERT OR UPDATE OF id, source, source_id ON api_job
+FOR EACH ROW EXECUTE FUNCTION api_job_key();
+CREATE TRIGGER job_key_delete AFTER DELETE ON api_job
+FOR EACH ROW EXECUTE FUNCTION api_job_key();
+"""
+
+CONSTRAINTS_SQL = [
+    "ALTER TABLE api_job ADD CONSTRAINT api_job_key FOREIGN KEY (id) "
+    "REFERENCES api_jobkey (id) DEFERRABLE INITIALLY DEFERRED"
+] + [
+    f"ALTER TABLE {table} ADD CONSTRAINT {table}_job_key FOREIGN KEY (job_id) "
+    "REFERENCES api_jobkey (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED"
+    for table in LINK_TABLES
+]
+
+DROP_CONSTRAINTS_SQL = ["ALTER TABLE api_job DROP CONSTRAINT api_job_key"] + [
+    f"ALTER TABLE {table} DROP CONSTRAINT {table}_job_key" for table in LINK_TABLES
+]
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def rebuild_job_table(schema_editor, partitioned):
+    """
+    Rebuilds api_job as a partitioned (or plain) table with the same columns,
+    identity, indexes, foreign keys and rows. Unique constraints are left to
+    the surrounding operations, since they differ between the two.
+    """
+    execute = schema_editor.execute
+    with schema_editor.connection.cursor() as cursor:
+        execute("ALTER TABLE api_job RENAME TO api_job_old")
+        cursor.execute(
+            "SELECT pg_get_serial_sequence('api_job_old', 'id'), attidentity <> '' "
+            "FROM pg_attribute WHERE attrelid = 'api_job_old'::regclass AND attname = 'id'"
+        )
+        sequence, identity = cursor.fetchone()
+        if not identity:
+            execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+        execute(
+            "CREATE TABLE api_job (LIKE api_job_old INCLUDING DEFAULTS "
+            "INCLUDING IDENTITY INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+            + (" PARTITION BY RANGE (upload_date)" if partitioned else "")
+        )
+
+        if partitioned:
+            cursor.execute(
+                "SELECT DISTINCT date_trunc('month', upload_date)::date FROM api_job_old "
+                "WHERE upload_date IS NOT NULL"
+            )
+            months = {month for month, in cursor.fetchall()}
+            month = date.today().replace(day=1)
+            for _ in range(MONTHS_AHEAD + 1):
+                months.add(month)
+                month = next_month(month)
+
+            for month in sorted(months):
+                execute(
+                    f"CREATE TABLE api_job_{month:%Y_%m} PARTITION OF api_job "
+                    f"FOR VALUES FROM ('{month}') TO ('{next_month(month)}')"
+                )
+            execute("CREATE TABLE api_job_default PARTITION OF api_job DEFAULT")
+            # Ids are unique through their identity, a partitioned table can't enforce it
+            execute("CREATE INDEX job_id ON api_job (id)")
+        else:
+            execute("ALTER TABLE api_job ADD CONSTRAINT api_job_pkey PRIMARY KEY (id)")
+
+        # Indexes that don't back a constraint, under their names
+        cursor.execute(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = 'api_job_old'::regclass AND NOT EXISTS "
+            "(SELECT 1 FROM pg_constraint WHERE conindid = i.indexrelid)"
+        )
+        for name, definition in cursor.fetchall():
+            if name == "job_id":
+                continue
+            execute(f'ALTER INDEX "{name}" RENAME TO "{name[:50]}_old"')
+            execute(
+                re.sub(
+                    r" ON (ONLY )?\S+ USING ", " ON api_job USING ", definition, count=1
+                )
+            )
+
+        execute("INSERT INTO api_job OVERRIDING SYSTEM VALUE SELECT * FROM api_job_old")
+
+        # After the rows, checked at once instead of by deferred per row triggers
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = 'api_job_old'::regclass AND contype = 'f'"
+        )
+        for name, definition in cursor.fetchall():
+            execute(f'ALTER TABLE api_job_old DROP CONSTRAINT "{name}"')
+            execute(f'ALTER TABLE api_job ADD CONSTRAINT "{name}" {definition}')
+        execute("DROP TABLE api_job_old")
+
+        if identity:
+            cursor.execute("SELECT pg_get_serial_sequence('api_job', 'id')")
+            execute(f"ALTER SEQUENCE {cursor.fetchone()[0]} RENAME TO api_job_id_seq")
+        else:
+            execute(f"ALTER SEQUENCE {sequence} OWNED BY api_job.id")
+        execute(
+            "SELECT setval(pg_get_serial_sequence('api_job', 'id'), "
+            "COALESCE(MAX(id), 0) + 1, false) FROM api_job"
+        )
+
+
+def partition_jobs(apps, schema_editor):
+    rebuild_job_table(schema_editor, partitioned=True)
+
+
+def unpartition_jobs(apps, schema_editor):
+    rebuild_job_table(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_job_duplicates"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="job",
+            name="unique_source_job",
+        ),
+        migrations.AlterField(
+            model_name="joboccupation",
+            name="job",
+            field=models.ForeignKey(
+                db_constraint=False,
+                help_text="The job that is matched with an occupation.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="occupations",
+                to="api.job",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobsignature",
+            name="job",
+            field=models.OneToOneField(
+                db_constraint=False,
+                help_text="The job that the signature belongs to.",
+                on_delete=django.db.models.deletion.CASCADE,
+                primary_key=True,
+                related_name="signature",
+                serialize=False,
+                to="api.job",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobskill",
+            name="job",
+            field=models.ForeignKey(
+                db_constraint=False,
+                help_text="The job that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.job",
+            ),
+        ),
+        migrations.CreateModel(
+            name="JobKey",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(
+                        help_text="ID of the job", primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(help_text="Source of the job", max_length=255),
+                ),
+                (
+                    "source_id",
+                    models.CharField(
+                        blank=True,
+                        help_text="ID of the job in the source database",
+                        max_length=255,
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source", "source_id"), name="unique_source_job"
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(KEYS_SQL, migrations.RunSQL.noop),
+        migrations.RunPython(partition_jobs, unpartition_jobs),
+        migrations.RunSQL(CONSTRAINTS_SQL, DROP_CONSTRAINTS_SQL),
+        migrations.RunSQL(
+            KEY_FUNCTION_SQL, "DROP FUNCTION IF EXISTS api_job_key() CASCADE"
+        ),
+    ]
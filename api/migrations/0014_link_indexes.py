@@ -0,0 +1,304 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:58
+
+import django.contrib.postgres.operations
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently, which can't run in a transaction. The reverse
+    # indexes are built before the single column ones are dropped
+    atomic = False
+
+    dependencies = [
+        ("api", "0013_job_partitions"),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="articleskill",
+            index=models.Index(
+                fields=["skill", "article"], name="article_skill_reverse"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="courseskill",
+            index=models.Index(fields=["skill", "course"], name="course_skill_reverse"),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="joboccupation",
+            index=models.Index(
+                fields=["occupation", "job"], name="job_occupation_reverse"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="jobskill",
+            index=models.Index(fields=["skill", "job"], name="job_skill_reverse"),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="lawpolicyskill",
+            index=models.Index(
+                fields=["skill", "law_policy"], name="law_policy_skill_reverse"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="lawpublicationskill",
+            index=models.Index(
+                fields=["skill", "law_publication"],
+                name="law_publication_skill_reverse",
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="organizationskill",
+            index=models.Index(
+                fields=["skill", "organization"], name="organization_skill_reverse"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="profileskill",
+            index=models.Index(
+                fields=["skill", "profile"], name="profile_skill_reverse"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="projectorganization",
+            index=models.Index(
+                fields=["project", "organization"], name="project_organization"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="projectorganization",
+            index=models.Index(
+                fields=["organization", "project"], name="organization_project"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="projectskill",
+            index=models.Index(
+                fields=["skill", "project"], name="project_skill_reverse"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="articleskill",
+            name="article",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The article that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.article",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="articleskill",
+            name="skill",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The skill that is matched with an article.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="articles",
+                to="api.escoskill",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="courseskill",
+            name="course",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The course that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.course",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="courseskill",
+            name="skill",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The skill that is matched with a course.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="courses",
+                to="api.escoskill",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="joboccupation",
+            name="job",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                help_text="The job that is matched with an occupation.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="occupations",
+                to="api.job",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="joboccupation",
+            name="occupation",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The occupation that is matched with a job.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="jobs",
+                to="api.iscooccupation",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobskill",
+            name="job",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                help_text="The job that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.job",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobskill",
+            name="skill",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The skill that is matched with a job.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="jobs",
+                to="api.escoskill",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="lawpolicyskill",
+            name="law_policy",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The law/policy that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.lawpolicy",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="lawpolicyskill",
+            name="skill",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The skill that is matched with a law.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="law_policies",
+                to="api.escoskill",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="lawpublicationskill",
+            name="law_publication",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The law publication that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.lawpublication",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="lawpublicationskill",
+            name="skill",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The skill that is matched with a law publication.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="law_publications",
+                to="api.escoskill",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="organizationskill",
+            name="organization",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The organization that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.organization",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="organizationskill",
+            name="skill",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The skill that is matched with an organization.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="organizations",
+                to="api.escoskill",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="profileskill",
+            name="profile",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The profile that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.profile",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="profileskill",
+            name="skill",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The skill that is matched with a profile.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="profiles",
+                to="api.escoskill",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="projectorganization",
+            name="organization",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Organization that is part of the project.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="projects",
+                to="api.organization",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="projectorganization",
+            name="project",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The project that the organization is part of.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="organizations",
+                to="api.project",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="projectskill",
+            name="project",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The project that is matched with a skill.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skills",
+                to="api.project",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="projectskill",
+            name="skill",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The skill that is matched with a project.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="projects",
+                to="api.escoskill",
+            ),
+        ),
+    ]
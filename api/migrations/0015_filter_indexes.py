@@ -0,0 +1,110 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:58
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently (except on the partitioned job table), which
+    # can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ("api", "0014_link_indexes"),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="article",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["publication_date"], name="article_publication_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="article",
+            index=models.Index(
+                fields=["source", "publication_date"], name="article_source_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="course",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["last_updated"], name="course_last_updated"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="course",
+            index=models.Index(
+                fields=["source", "last_updated"], name="course_source_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="course",
+            index=models.Index(fields=["rating"], name="course_rating"),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="course",
+            index=models.Index(fields=["price"], name="course_price"),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["upload_date"], name="job_upload_date"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["source", "upload_date"], name="job_source_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="lawpolicy",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["publication_date"], name="law_policy_publication_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="lawpolicy",
+            index=models.Index(
+                fields=["source", "publication_date"], name="law_policy_source_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="lawpublication",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["publication_date"], name="law_publication_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="lawpublication",
+            index=models.Index(
+                fields=["source", "publication_date"],
+                name="law_publication_source_date",
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="project",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["start_date"], name="project_start_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="project",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["end_date"], name="project_end_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="project",
+            index=models.Index(
+                fields=["source", "start_date"], name="project_source_date"
+            ),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name="project",
+            index=models.Index(fields=["total_cost"], name="project_total_cost"),
+        ),
+    ]
@@ -0,0 +1,185 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:04
+
+from django.db import migrations, models
+from django.db.models.expressions import RawSQL
+
+LEVEL_FIELDS = [
+    ("EscoSkill", "knowledge_levels", "min_knowledge_level", "max_knowledge_level"),
+    ("EscoSkill", "language_levels", "min_language_level", "max_language_level"),
+    ("EscoSkill", "skill_levels", "min_skill_level", "max_skill_level"),
+    ("EscoSkill", "traversal_levels", "min_traversal_level", "max_traversal_level"),
+    ("IscoOccupation", "levels", "min_level", "max_level"),
+]
+
+
+def backfill_levels(apps, schema_editor):
+    for model_name, field, min_field, max_field in LEVEL_FIELDS:
+        model = apps.get_model("api", model_name)
+        column = f'"{model._meta.db_table}"."{field}"'
+        model.objects.update(
+            **{
+                name: RawSQL(
+                    f"(SELECT {function}(value::int) "
+                    f"FROM jsonb_array_elements_text({column}))",
+                    [],
+                )
+                for name, function in [(min_field, "MIN"), (max_field, "MAX")]
+            }
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="escoskill",
+            name="max_knowledge_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The highest level of the skill in knowledge paths",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="escoskill",
+            name="max_language_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The highest level of the skill in language paths",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="escoskill",
+            name="max_skill_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The highest level of the skill in skill paths",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="escoskill",
+            name="max_traversal_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The highest level of the skill in traversal paths",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="escoskill",
+            name="min_knowledge_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The lowest level of the skill in knowledge paths",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="escoskill",
+            name="min_language_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The lowest level of the skill in language paths",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="escoskill",
+            name="min_skill_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The lowest level of the skill in skill paths",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="escoskill",
+            name="min_traversal_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The lowest level of the skill in traversal paths",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="iscooccupation",
+            name="max_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The highest level of the occupation",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="iscooccupation",
+            name="min_level",
+            field=models.SmallIntegerField(
+                editable=False,
+                help_text="The lowest level of the occupation",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_levels, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="escoskill",
+            index=models.Index(
+                fields=["min_knowledge_level"], name="skill_min_knowledge_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="escoskill",
+            index=models.Index(
+                fields=["max_knowledge_level"], name="skill_max_knowledge_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="escoskill",
+            index=models.Index(
+                fields=["min_language_level"], name="skill_min_language_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="escoskill",
+            index=models.Index(
+                fields=["max_language_level"], name="skill_max_language_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="escoskill",
+            index=models.Index(
+                fields=["min_skill_level"], name="skill_min_skill_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="escoskill",
+            index=models.Index(
+                fields=["max_skill_level"], name="skill_max_skill_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="escoskill",
+            index=models.Index(
+                fields=["min_traversal_level"], name="skill_min_traversal_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="escoskill",
+            index=models.Index(
+                fields=["max_traversal_level"], name="skill_max_traversal_level"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="iscooccupation",
+            index=models.Index(fields=["min_level"], name="occupation_min_level"),
+        ),
+        migrations.AddIndex(
+            model_name="iscooccupation",
+            index=models.Index(fields=["max_level"], name="occupation_max_level"),
+        ),
+    ]
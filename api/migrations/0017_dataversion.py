@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+# Bumps the version of a table from its statement-level trigger, (re)created
+# after every migrate by api.helpers.install_data_version_triggers
+BUMP_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION api_bump_data_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO api_dataversion ("table", version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT ("table") DO UPDATE SET version = api_dataversion.version + 1;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_level_columns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "table",
+                    models.CharField(
+                        help_text="Name of the table", max_length=63, unique=True
+                    ),
+                ),
+                (
+                    "version",
+                    models.BigIntegerField(
+                        default=0, help_text="Number of write statements on the table"
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            BUMP_FUNCTION_SQL,
+            "DROP FUNCTION IF EXISTS api_bump_data_version() CASCADE",
+        ),
+    ]
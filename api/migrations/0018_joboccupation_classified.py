@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0017_dataversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="joboccupation",
+            name="classified",
+            field=models.BooleanField(
+                db_default=False,
+                help_text="Whether the link was made by the job title classifier (classify_jobs) rather than given by the source.",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0018_joboccupation_classified"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="organization",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        models.F("country"),
+                        models.Value("\n"),
+                        models.F("city"),
+                        models.Value("\n"),
+                        models.F("postcode"),
+                        models.Value("\n"),
+                        models.F("street"),
+                        output_field=models.TextField(),
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="organization_address_search",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+from django.db import migrations, models
+
+# Merges the counts of each table into a single row. The rows locked by a
+# concurrent merge are skipped, so that merges never wait on each other
+COMPACT_SQL = """
+WITH deleted AS (
+    DELETE FROM api_dataversion WHERE id IN (
+        SELECT id FROM api_dataversion FOR UPDATE SKIP LOCKED
+    )
+    RETURNING "table", version
+)
+INSERT INTO api_dataversion ("table", version)
+SELECT "table", SUM(version) FROM deleted GROUP BY "table"
+"""
+
+# Appends a count to the table's versions instead of updating a row per table,
+# whose lock would serialize the concurrent writers of the table until they
+# commit. The count becomes visible with the commit of the write, unlike a
+# sequence, so that a version never stands for data that isn't visible yet.
+# Every thousandth row merges the counts, to keep the sums cheap
+BUMP_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION api_bump_data_version() RETURNS trigger AS $$
+DECLARE
+    row_id bigint;
+BEGIN
+    INSERT INTO api_dataversion ("table", version) VALUES (TG_TABLE_NAME, 1)
+    RETURNING id INTO row_id;
+    IF row_id % 1000 = 0 THEN
+        {COMPACT_SQL};
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+UPSERT_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION api_bump_data_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO api_dataversion ("table", version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT ("table") DO UPDATE SET version = api_dataversion.version + 1;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0019_organization_address_search"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dataversion",
+            name="table",
+            field=models.CharField(
+                db_index=True, help_text="Name of the table", max_length=63
+            ),
+        ),
+        migrations.AlterField(
+            model_name="dataversion",
+            name="version",
+            field=models.BigIntegerField(
+                default=0,
+                help_text="Number of write statements on the table counted by the row",
+            ),
+        ),
+        # Reversed after the function, before the unique constraint is restored
+        migrations.RunSQL(migrations.RunSQL.noop, COMPACT_SQL),
+        migrations.RunSQL(BUMP_FUNCTION_SQL, UPSERT_FUNCTION_SQL),
+    ]
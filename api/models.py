@@ -1,11 +1,17 @@
 from django.db import models
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.postgres.fields import ArrayField
-from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
+
+from api.search import search_document
 
 
 class EscoSkill(models.Model):
-    id = models.CharField(max_length=255, primary_key=True)
+    # Compact integer key for link tables, the URI is what the API exposes
+    id = models.AutoField(primary_key=True)
+    uri = models.CharField(
+        max_length=255, unique=True, help_text="The ESCO URI of the skill"
+    )
     label = models.CharField(
         max_length=2048, null=True, blank=True, help_text="The label of the skill"
     )
@@ -43,13 +49,82 @@ class EscoSkill(models.Model):
     children = models.JSONField(
         help_text="The children (direct descendants) of the skill"
     )
+    # Bounds of the levels lists, for the level filters (see sync_levels)
+    min_knowledge_level = models.SmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="The lowest level of the skill in knowledge paths",
+    )
+    max_knowledge_level = models.SmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="The highest level of the skill in knowledge paths",
+    )
+    min_language_level = models.SmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="The lowest level of the skill in language paths",
+    )
+    max_language_level = models.SmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="The highest level of the skill in language paths",
+    )
+    min_skill_level = models.SmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="The lowest level of the skill in skill paths",
+    )
+    max_skill_level = models.SmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="The highest level of the skill in skill paths",
+    )
+    min_traversal_level = models.SmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="The lowest level of the skill in traversal paths",
+    )
+    max_traversal_level = models.SmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="The highest level of the skill in traversal paths",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["min_knowledge_level"], name="skill_min_knowledge_level"
+            ),
+            models.Index(
+                fields=["max_knowledge_level"], name="skill_max_knowledge_level"
+            ),
+            models.Index(
+                fields=["min_language_level"], name="skill_min_language_level"
+            ),
+            models.Index(
+                fields=["max_language_level"], name="skill_max_language_level"
+            ),
+            models.Index(fields=["min_skill_level"], name="skill_min_skill_level"),
+            models.Index(fields=["max_skill_level"], name="skill_max_skill_level"),
+            models.Index(
+                fields=["min_traversal_level"], name="skill_min_traversal_level"
+            ),
+            models.Index(
+                fields=["max_traversal_level"], name="skill_max_traversal_level"
+            ),
+        ]
 
     def __str__(self):
         return self.label
 
 
 class IscoOccupation(models.Model):
-    id = models.CharField(max_length=255, primary_key=True)
+    # Compact integer key for link tables, the URI is what the API exposes
+    id = models.AutoField(primary_key=True)
+    uri = models.CharField(
+        max_length=255, unique=True, help_text="The ESCO URI of the occupation"
+    )
     label = models.CharField(
         max_length=2048, null=True, blank=True, help_text="The label of the occupation"
     )
@@ -68,6 +143,109 @@ class IscoOccupation(models.Model):
     children = models.JSONField(
         help_text="The children (direct descendants) of the occupation"
     )
+    # Bounds of the levels list, for the level filters (see sync_levels)
+    min_level = models.SmallIntegerField(
+        null=True, editable=False, help_text="The lowest level of the occupation"
+    )
+    max_level = models.SmallIntegerField(
+        null=True, editable=False, help_text="The highest level of the occupation"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["min_level"], name="occupation_min_level"),
+            models.Index(fields=["max_level"], name="occupation_max_level"),
+        ]
+
+    def __str__(self):
+        return self.label
+
+
+class IscoOccupationClosure(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"], name="unique_occupation_closure"
+            )
+        ]
+
+    ancestor = models.ForeignKey(
+        IscoOccupation,
+        on_delete=models.CASCADE,
+        related_name="descendant_links",
+        help_text="The ancestor occupation (or the occupation itself).",
+    )
+    descendant = models.ForeignKey(
+        IscoOccupation,
+        on_delete=models.CASCADE,
+        related_name="ancestor_links",
+        help_text="The descendant occupation (or the occupation itself).",
+    )
+    depth = models.PositiveIntegerField(
+        help_text="Shortest distance between the ancestor and the descendant (0 for the occupation itself)"
+    )
+
+    def __str__(self):
+        return f"{self.ancestor.label} > {self.descendant.label}"
+
+
+class EscoSkillLabel(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["skill", "label"], name="unique_skill_label"
+            )
+        ]
+        indexes = [
+            GinIndex(
+                fields=["label"], opclasses=["gin_trgm_ops"], name="skill_label_search"
+            )
+        ]
+
+    skill = models.ForeignKey(
+        EscoSkill,
+        on_delete=models.CASCADE,
+        related_name="search_labels",
+        help_text="The skill that has the label.",
+    )
+    label = models.CharField(
+        max_length=2048, help_text="A preferred or alternative label of the skill"
+    )
+    preferred = models.BooleanField(
+        default=False, help_text="Whether the label is the skill's preferred label"
+    )
+
+    def __str__(self):
+        return self.label
+
+
+class IscoOccupationLabel(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["occupation", "label"], name="unique_occupation_label"
+            )
+        ]
+        indexes = [
+            GinIndex(
+                fields=["label"],
+                opclasses=["gin_trgm_ops"],
+                name="occupation_label_search",
+            )
+        ]
+
+    occupation = models.ForeignKey(
+        IscoOccupation,
+        on_delete=models.CASCADE,
+        related_name="search_labels",
+        help_text="The occupation that has the label.",
+    )
+    label = models.CharField(
+        max_length=2048, help_text="A preferred or alternative label of the occupation"
+    )
+    preferred = models.BooleanField(
+        default=False, help_text="Whether the label is the occupation's preferred label"
+    )
 
     def __str__(self):
         return self.label
@@ -82,10 +260,14 @@ class Project(models.Model):
         ]
         indexes = [
             GinIndex(
-                fields=["title", "objective"],
-                opclasses=["gin_trgm_ops", "gin_trgm_ops"],
+                OpClass(search_document("title", "objective"), name="gin_trgm_ops"),
                 name="project_search",
-            )
+            ),
+            GinIndex(fields=["skill_ids"], name="project_skill_ids"),
+            BrinIndex(fields=["start_date"], name="project_start_date"),
+            BrinIndex(fields=["end_date"], name="project_end_date"),
+            models.Index(fields=["source", "start_date"], name="project_source_date"),
+            models.Index(fields=["total_cost"], name="project_total_cost"),
         ]
 
     title = models.CharField(max_length=16384, help_text="Title of the project")
@@ -107,6 +289,12 @@ class Project(models.Model):
         null=True,
         blank=True,
     )
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        help_text="IDs of the project's skills, kept in sync with its skill links",
+    )
     source = models.CharField(
         max_length=255,
         help_text="Source of the project, from where information was retrieved (e.g H2020, FP7, ...)",
@@ -129,10 +317,14 @@ class ProjectSkill(models.Model):
                 fields=["project", "skill"], name="unique_project_skill"
             )
         ]
+        indexes = [
+            models.Index(fields=["skill", "project"], name="project_skill_reverse"),
+        ]
 
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="skills",
         help_text="The project that is matched with a skill.",
     )
@@ -140,6 +332,7 @@ class ProjectSkill(models.Model):
         EscoSkill,
         related_name="projects",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The skill that is matched with a project.",
     )
 
@@ -157,10 +350,18 @@ class Organization(models.Model):
 
         indexes = [
             GinIndex(
-                fields=["name", "description"],
-                opclasses=["gin_trgm_ops", "gin_trgm_ops"],
+                OpClass(search_document("name", "description"), name="gin_trgm_ops"),
                 name="organization_search",
-            )
+            ),
+            # Searched by the admin only, along with the keyword search document
+            GinIndex(
+                OpClass(
+                    search_document("country", "city", "postcode", "street"),
+                    name="gin_trgm_ops",
+                ),
+                name="organization_address_search",
+            ),
+            GinIndex(fields=["skill_ids"], name="organization_skill_ids"),
         ]
 
     name = models.CharField(max_length=16384, help_text="Name of the organization")
@@ -187,6 +388,12 @@ class Organization(models.Model):
     street = models.CharField(
         max_length=255, null=True, blank=True, help_text="Street of the organization"
     )
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        help_text="IDs of the organization's skills, kept in sync with its skill links",
+    )
     source = models.CharField(
         max_length=255,
         null=True,
@@ -205,9 +412,20 @@ class Organization(models.Model):
 
 
 class ProjectOrganization(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["project", "organization"], name="project_organization"
+            ),
+            models.Index(
+                fields=["organization", "project"], name="organization_project"
+            ),
+        ]
+
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="organizations",
         help_text="The project that the organization is part of.",
     )
@@ -215,6 +433,7 @@ class ProjectOrganization(models.Model):
         Organization,
         related_name="projects",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="Organization that is part of the project.",
     )
     role = models.CharField(
@@ -235,10 +454,16 @@ class OrganizationSkill(models.Model):
                 fields=["organization", "skill"], name="unique_organization_skill"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["skill", "organization"], name="organization_skill_reverse"
+            ),
+        ]
 
     organization = models.ForeignKey(
         Organization,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="skills",
         help_text="The organization that is matched with a skill.",
     )
@@ -246,6 +471,7 @@ class OrganizationSkill(models.Model):
         EscoSkill,
         related_name="organizations",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The skill that is matched with an organization.",
     )
 
@@ -263,10 +489,15 @@ class Article(models.Model):
 
         indexes = [
             GinIndex(
-                fields=["title", "summary"],
-                opclasses=["gin_trgm_ops", "gin_trgm_ops"],
+                OpClass(search_document("title", "summary"), name="gin_trgm_ops"),
                 name="article_search",
-            )
+            ),
+            GinIndex(fields=["skill_ids"], name="article_skill_ids"),
+            BrinIndex(fields=["publication_date"], name="article_publication_date"),
+            models.Index(
+                fields=["source", "publication_date"],
+                name="article_source_date",
+            ),
         ]
 
     title = models.CharField(max_length=16384, help_text="Title of the article")
@@ -315,6 +546,12 @@ class Article(models.Model):
         related_name="publications",
         help_text="The project that the article is related to (if any)",
     )
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        help_text="IDs of the article's skills, kept in sync with its skill links",
+    )
     source = models.CharField(
         max_length=255,
         help_text="Source of the article, from where information was retrieved (e.g H2020, FP7, ...)",
@@ -338,10 +575,14 @@ class ArticleSkill(models.Model):
                 fields=["article", "skill"], name="unique_article_skill"
             )
         ]
+        indexes = [
+            models.Index(fields=["skill", "article"], name="article_skill_reverse"),
+        ]
 
     article = models.ForeignKey(
         Article,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="skills",
         help_text="The article that is matched with a skill.",
     )
@@ -349,6 +590,7 @@ class ArticleSkill(models.Model):
         EscoSkill,
         related_name="articles",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The skill that is matched with an article.",
     )
 
@@ -366,10 +608,14 @@ class Course(models.Model):
 
         indexes = [
             GinIndex(
-                fields=["title", "description"],
-                opclasses=["gin_trgm_ops", "gin_trgm_ops"],
+                OpClass(search_document("title", "description"), name="gin_trgm_ops"),
                 name="course_search",
-            )
+            ),
+            GinIndex(fields=["skill_ids"], name="course_skill_ids"),
+            BrinIndex(fields=["last_updated"], name="course_last_updated"),
+            models.Index(fields=["source", "last_updated"], name="course_source_date"),
+            models.Index(fields=["rating"], name="course_rating"),
+            models.Index(fields=["price"], name="course_price"),
         ]
 
     title = models.CharField(max_length=16384, help_text="Title of the course")
@@ -387,6 +633,12 @@ class Course(models.Model):
     )
     price = models.FloatField(null=True, blank=True, help_text="Price of the course")
     url = models.URLField(max_length=2048, help_text="URL of the course")
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        help_text="IDs of the course's skills, kept in sync with its skill links",
+    )
     source = models.CharField(
         max_length=255,
         help_text="Source of the course, from where information was retrieved (e.g Udemy, ...)",
@@ -409,10 +661,14 @@ class CourseSkill(models.Model):
                 fields=["course", "skill"], name="unique_course_skill"
             )
         ]
+        indexes = [
+            models.Index(fields=["skill", "course"], name="course_skill_reverse"),
+        ]
 
     course = models.ForeignKey(
         Course,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="skills",
         help_text="The course that is matched with a skill.",
     )
@@ -420,6 +676,7 @@ class CourseSkill(models.Model):
         EscoSkill,
         related_name="courses",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The skill that is matched with a course.",
     )
 
@@ -427,7 +684,15 @@ class CourseSkill(models.Model):
         return f"{self.skill.label} - {self.course.title}"
 
 
-class Job(models.Model):
+class JobKey(models.Model):
+    """
+    The key of a job. The job table is partitioned by upload month (see
+    api/partitions.py) and Postgres can't enforce a unique key without the
+    partition key over it, so the keys of the jobs are kept in this plain
+    table, written by triggers on the job table (migration 0013). The jobs and
+    the rows linked to them reference it with foreign key constraints.
+    """
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -435,18 +700,39 @@ class Job(models.Model):
             )
         ]
 
+    id = models.BigIntegerField(primary_key=True, help_text="ID of the job")
+    source = models.CharField(max_length=255, help_text="Source of the job")
+    source_id = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        help_text="ID of the job in the source database",
+    )
+
+    def __str__(self):
+        return f"{self.source} {self.source_id}"
+
+
+class Job(models.Model):
+    # The table is partitioned by upload month (see api/partitions.py), its unique key
+    # and the foreign keys of the rows linked to jobs are on JobKey
+    class Meta:
         indexes = [
             GinIndex(
-                fields=["title", "description", "location", "type", "experience_level"],
-                opclasses=[
-                    "gin_trgm_ops",
-                    "gin_trgm_ops",
-                    "gin_trgm_ops",
-                    "gin_trgm_ops",
-                    "gin_trgm_ops",
-                ],
+                OpClass(
+                    search_document(
+                        "title", "description", "location", "type", "experience_level"
+                    ),
+                    name="gin_trgm_ops",
+                ),
                 name="job_search",
             ),
+            GinIndex(fields=["skill_ids"], name="job_skill_ids"),
+            models.Index(
+                fields=["duplicate_cluster", "id"], name="job_duplicate_cluster"
+            ),
+            BrinIndex(fields=["upload_date"], name="job_upload_date"),
+            models.Index(fields=["source", "upload_date"], name="job_source_date"),
         ]
 
     organization = models.ForeignKey(
@@ -480,6 +766,17 @@ class Job(models.Model):
     upload_date = models.DateField(
         null=True, blank=True, help_text="Date when the job was uploaded."
     )
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        help_text="IDs of the job's skills, kept in sync with its skill links",
+    )
+    duplicate_cluster = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="ID of the first job of its near duplicates (set by the deduplicate_jobs command)",
+    )
     source = models.CharField(
         max_length=255,
         help_text="Source of the job, from where information was retrieved (e.g LinkedIn, ...)",
@@ -500,10 +797,16 @@ class JobSkill(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["job", "skill"], name="unique_job_skill")
         ]
+        indexes = [
+            models.Index(fields=["skill", "job"], name="job_skill_reverse"),
+        ]
 
+    # The foreign key constraint is on JobKey, the job table is partitioned
     job = models.ForeignKey(
         Job,
         on_delete=models.CASCADE,
+        db_index=False,
+        db_constraint=False,
         related_name="skills",
         help_text="The job that is matched with a skill.",
     )
@@ -511,6 +814,7 @@ class JobSkill(models.Model):
         EscoSkill,
         related_name="jobs",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The skill that is matched with a job.",
     )
 
@@ -525,10 +829,16 @@ class JobOccupation(models.Model):
                 fields=["job", "occupation"], name="unique_job_occupation"
             )
         ]
+        indexes = [
+            models.Index(fields=["occupation", "job"], name="job_occupation_reverse"),
+        ]
 
+    # The foreign key constraint is on JobKey, the job table is partitioned
     job = models.ForeignKey(
         Job,
         on_delete=models.CASCADE,
+        db_index=False,
+        db_constraint=False,
         related_name="occupations",
         help_text="The job that is matched with an occupation.",
     )
@@ -536,13 +846,43 @@ class JobOccupation(models.Model):
         IscoOccupation,
         related_name="jobs",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The occupation that is matched with a job.",
     )
+    classified = models.BooleanField(
+        db_default=False,
+        help_text="Whether the link was made by the job title classifier (classify_jobs) rather than given by the source.",
+    )
 
     def __str__(self):
         return f"{self.occupation.label} - {self.job.title}"
 
 
+class JobSignature(models.Model):
+    class Meta:
+        indexes = [GinIndex(fields=["bands"], name="job_signature_bands")]
+
+    # The foreign key constraint is on JobKey, the job table is partitioned
+    job = models.OneToOneField(
+        Job,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        primary_key=True,
+        related_name="signature",
+        help_text="The job that the signature belongs to.",
+    )
+    signature = models.BinaryField(
+        help_text="MinHash signature of the job's title and description (uint32 values)"
+    )
+    bands = ArrayField(
+        models.BigIntegerField(),
+        help_text="LSH hashes of the signature's bands, jobs sharing one are duplicate candidates",
+    )
+
+    def __str__(self):
+        return f"Signature of {self.job_id}"
+
+
 class Profile(models.Model):
     class Meta:
         constraints = [
@@ -553,15 +893,13 @@ class Profile(models.Model):
 
         indexes = [
             GinIndex(
-                fields=["full_name", "location", "content", "occupation"],
-                opclasses=[
-                    "gin_trgm_ops",
-                    "gin_trgm_ops",
-                    "gin_trgm_ops",
-                    "gin_trgm_ops",
-                ],
+                OpClass(
+                    search_document("full_name", "location", "content", "occupation"),
+                    name="gin_trgm_ops",
+                ),
                 name="profile_search",
-            )
+            ),
+            GinIndex(fields=["skill_ids"], name="profile_skill_ids"),
         ]
 
     full_name = models.CharField(
@@ -582,6 +920,12 @@ class Profile(models.Model):
         max_length=1024,
         help_text="The URL of the user's profile.",
     )
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        help_text="IDs of the profile's skills, kept in sync with its skill links",
+    )
     source = models.CharField(
         max_length=255,
         help_text="Source of the profile, from where information was retrieved (e.g LinkedIn, StackOverflow...)",
@@ -604,10 +948,14 @@ class ProfileSkill(models.Model):
                 fields=["profile", "skill"], name="unique_profile_skill"
             )
         ]
+        indexes = [
+            models.Index(fields=["skill", "profile"], name="profile_skill_reverse"),
+        ]
 
     profile = models.ForeignKey(
         Profile,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="skills",
         help_text="The profile that is matched with a skill.",
     )
@@ -615,6 +963,7 @@ class ProfileSkill(models.Model):
         EscoSkill,
         related_name="profiles",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The skill that is matched with a profile.",
     )
 
@@ -632,10 +981,17 @@ class LawPolicy(models.Model):
         ]
         indexes = [
             GinIndex(
-                fields=["title", "summary", "authors"],
-                opclasses=["gin_trgm_ops", "gin_trgm_ops", "gin_trgm_ops"],
+                OpClass(
+                    search_document("title", "summary", "authors"), name="gin_trgm_ops"
+                ),
                 name="law_policy_search",
             ),
+            GinIndex(fields=["skill_ids"], name="law_policy_skill_ids"),
+            BrinIndex(fields=["publication_date"], name="law_policy_publication_date"),
+            models.Index(
+                fields=["source", "publication_date"],
+                name="law_policy_source_date",
+            ),
         ]
 
     title = models.CharField(max_length=16384, help_text="Title of the law/policy")
@@ -663,6 +1019,12 @@ class LawPolicy(models.Model):
         blank=True,
         help_text="URL of the law/policy",
     )
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        help_text="IDs of the law/policy's skills, kept in sync with its skill links",
+    )
     source = models.CharField(
         max_length=255,
         help_text="Source of the law/policy, from where information was retrieved (e.g open-europa, ...)",
@@ -685,10 +1047,16 @@ class LawPolicySkill(models.Model):
                 fields=["law_policy", "skill"], name="unique_law_policy_skill"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["skill", "law_policy"], name="law_policy_skill_reverse"
+            ),
+        ]
 
     law_policy = models.ForeignKey(
         LawPolicy,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="skills",
         help_text="The law/policy that is matched with a skill.",
     )
@@ -696,6 +1064,7 @@ class LawPolicySkill(models.Model):
         EscoSkill,
         related_name="law_policies",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The skill that is matched with a law.",
     )
 
@@ -712,10 +1081,17 @@ class LawPublication(models.Model):
         ]
         indexes = [
             GinIndex(
-                fields=["title", "authors", "summary"],
-                opclasses=["gin_trgm_ops", "gin_trgm_ops", "gin_trgm_ops"],
+                OpClass(
+                    search_document("title", "authors", "summary"), name="gin_trgm_ops"
+                ),
                 name="law_publication_search",
-            )
+            ),
+            GinIndex(fields=["skill_ids"], name="law_publication_skill_ids"),
+            BrinIndex(fields=["publication_date"], name="law_publication_date"),
+            models.Index(
+                fields=["source", "publication_date"],
+                name="law_publication_source_date",
+            ),
         ]
 
     title = models.CharField(max_length=16384, help_text="Title of the law publication")
@@ -737,6 +1113,12 @@ class LawPublication(models.Model):
     isbn = models.CharField(
         max_length=1024, null=True, blank=True, help_text="ISBN of the law publication"
     )
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        help_text="IDs of the law publication's skills, kept in sync with its skill links",
+    )
     source = models.CharField(
         max_length=255,
         help_text="Source of the law publication, from where information was retrieved (e.g open-europa, ...)",
@@ -756,10 +1138,17 @@ class LawPublicationSkill(models.Model):
                 fields=["law_publication", "skill"], name="unique_law_publication_skill"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["skill", "law_publication"],
+                name="law_publication_skill_reverse",
+            ),
+        ]
 
     law_publication = models.ForeignKey(
         LawPublication,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="skills",
         help_text="The law publication that is matched with a skill.",
     )
@@ -767,6 +1156,7 @@ class LawPublicationSkill(models.Model):
         EscoSkill,
         related_name="law_publications",
         on_delete=models.CASCADE,
+        db_index=False,
         help_text="The skill that is matched with a law publication.",
     )
 
@@ -780,3 +1170,60 @@ class KeyValue(models.Model):
 
     def __str__(self):
         return f"{self.key}: {self.value}"
+
+
+class SlowQuery(models.Model):
+    class Meta:
+        verbose_name_plural = "slow queries"
+
+    fingerprint = models.CharField(
+        max_length=40,
+        unique=True,
+        help_text="Hash of the route and the filter combination",
+    )
+    route = models.CharField(max_length=255, help_text="Route name of the endpoint")
+    filters = models.JSONField(
+        help_text="The filter combination: number of values of each list filter and the value of the others",
+    )
+    sql = models.TextField(help_text="SQL of the latest slow query")
+    count = models.PositiveIntegerField(
+        default=0, help_text="Number of slow queries of the combination"
+    )
+    total_ms = models.FloatField(
+        default=0, help_text="Total duration of the slow queries in ms"
+    )
+    max_ms = models.FloatField(
+        default=0, help_text="Duration of the slowest query in ms"
+    )
+    plan = models.TextField(
+        null=True,
+        blank=True,
+        help_text="EXPLAIN (ANALYZE, BUFFERS) output of the latest sampled query",
+    )
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.route} {self.filters}"
+
+
+class DataVersion(models.Model):
+    """
+    Write counts of the api tables, appended by a statement-level trigger on
+    each table (see api.helpers.install_data_version_triggers), so that the
+    version of a table, the sum of its counts, changes with any write, whether
+    through the ORM or straight to the database. Appending, rather than
+    updating a row per table, doesn't serialize concurrent writers; the rows
+    are merged from time to time by the trigger.
+    """
+
+    table = models.CharField(
+        max_length=63, db_index=True, help_text="Name of the table"
+    )
+    version = models.BigIntegerField(
+        default=0,
+        help_text="Number of write statements on the table counted by the row",
+    )
+
+    def __str__(self):
+        return f"{self.table} {self.version}"
@@ -0,0 +1,118 @@
+import json
+from typing import Any, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import QuerySet
+from ninja import Field
+from ninja.errors import HttpError
+from ninja.pagination import PageNumberPagination
+
+from api.metrics import route_name
+
+# Filters matched with (trigram indexed) ILIKEs, whose cost depends on the words
+EXPENSIVE_FILTERS = ("keywords",)
+# Offset of the deepest page run without checking its cost first
+GUARDED_OFFSET = 10000
+
+
+def estimate_query(queryset: QuerySet) -> Tuple[float, float, int]:
+    """
+    The planner's estimates for a page of a queryset: the cost of the page,
+    the cost of the whole (unsliced) query and its number of rows.
+    """
+    plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+    whole = plan["Plans"][0] if plan["Node Type"] == "Limit" else plan
+    return plan["Total Cost"], whole["Total Cost"], int(whole["Plan Rows"])
+
+
+def table_count(model) -> Tuple[int, bool]:
+    """
+    The number of rows of a model's table, partitions included, and whether
+    it is estimated: the statistics' estimate when a COUNT(*) of the table
+    would cost more than COUNT_ESTIMATE_COST (the planner's cost of scanning
+    and counting its rows), or else a COUNT(*) in the same query. Tables that
+    were never analyzed are counted too.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT COALESCE(rows, (SELECT COUNT(*) FROM "{table}")), rows IS NOT NULL '
+            "FROM (SELECT CASE WHEN SUM(c.relpages) "
+            "* current_setting('seq_page_cost')::float8 + SUM(c.reltuples) "
+            "* (current_setting('cpu_tuple_cost')::float8 "
+            "+ current_setting('cpu_operator_cost')::float8) > %s "
+            "THEN SUM(c.reltuples) END AS rows "
+            "FROM pg_partition_tree(%s::regclass) t "
+            "JOIN pg_class c ON c.oid = t.relid "
+            "WHERE t.isleaf AND c.reltuples >= 0) s",
+            [settings.COUNT_ESTIMATE_COST, table],
+        )
+        rows, estimated = cursor.fetchone()
+
+    return int(rows), estimated
+
+
+class GuardedPageNumberPagination(PageNumberPagination):
+    """
+    Checks the planner's estimate of the pages of expensive requests (keyword
+    filters, deep pages) before running them. A page costing more than the
+    route's MAX_QUERY_COSTS is rejected with 400, and when the whole query
+    costs more than COUNT_ESTIMATE_COST the total count is the planner's
+    estimate instead of a COUNT(*) of every matching row. The count of an
+    unfiltered list is the table's estimate, under the same condition (see
+    table_count). Estimated counts are flagged with `count_estimated`.
+    """
+
+    class Output(PageNumberPagination.Output):
+        count_estimated: bool = Field(
+            False,
+            description="Whether the count is the database's estimate rather than an exact count",
+        )
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        pagination: PageNumberPagination.Input,
+        request,
+        **params: Any,
+    ) -> Any:
+        page_size = self._get_page_size(pagination.page_size)
+        offset = (pagination.page - 1) * page_size
+        items = queryset[offset : offset + page_size]
+
+        filters = params.get("filters")
+        if offset < GUARDED_OFFSET and not any(
+            getattr(filters, name, None) for name in EXPENSIVE_FILTERS
+        ):
+            return self.unguarded_page(queryset, items)
+
+        page_cost, cost, rows = estimate_query(items)
+
+        limits = settings.MAX_QUERY_COSTS
+        if page_cost > limits.get(route_name(request), limits["default"]):
+            raise HttpError(
+                400,
+                "This combination of filters is too expensive to run, please narrow it "
+                "down (e.g fewer keywords with AND logic, or a skill or source filter) "
+                "or request an earlier page.",
+            )
+
+        estimated = cost > settings.COUNT_ESTIMATE_COST
+        return {
+            self.items_attribute: items,
+            "count": rows if estimated else self._items_count(queryset),
+            "count_estimated": estimated,
+        }
+
+    def unguarded_page(self, queryset: QuerySet, items: QuerySet) -> Any:
+        if queryset.query.where:
+            count, estimated = self._items_count(queryset), False
+        else:
+            count, estimated = table_count(queryset.model)
+
+        return {
+            self.items_attribute: items,
+            "count": count,
+            "count_estimated": estimated,
+        }
@@ -0,0 +1,172 @@
+"""
+Range partitioning of jobs by upload month. The api_job table is partitioned
+by upload_date, with a partition per month (e.g api_job_2024_01) and a default
+partition for the jobs without an upload date or in a month without a
+partition. Queries bounded by upload dates only scan the partitions of their
+months, and old months are archived or dropped without a DELETE of their jobs.
+
+Postgres can't enforce a unique key without the partition key over a
+partitioned table, so the keys of the jobs (their ids and source ids) are kept
+unique in the plain api_jobkey table (see JobKey), which the jobs and the rows
+linked to them reference.
+"""
+
+import re
+from datetime import date
+from typing import Iterable, List, NamedTuple
+
+from django.db import connection, transaction
+
+from api.models import Job, JobKey, JobOccupation, JobSignature, JobSkill
+
+TABLE = Job._meta.db_table
+KEY_TABLE = JobKey._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+# Rows linked to jobs, removed (or archived) along with the jobs of their month
+LINKED_MODELS = [JobSkill, JobOccupation, JobSignature]
+
+BOUND_RE = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    # None for the default partition
+    start: date | None
+    end: date | None
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+def archive_name(table: str, month: date) -> str:
+    return f"archive_{table.removeprefix('api_')}_{month:%Y_%m}"
+
+
+def partitions() -> List[Partition]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+
+    result = []
+    for name, bound in rows:
+        match = BOUND_RE.search(bound)
+        if match:
+            start, end = map(date.fromisoformat, match.groups())
+            result.append(Partition(name, start, end))
+        else:
+            result.append(Partition(name, None, None))
+
+    return result
+
+
+def create_partitions(months: Iterable[date]) -> List[str]:
+    """
+    Creates the missing partitions of the given months, moving their jobs out
+    of the default partition. Returns the names of the created partitions.
+    """
+    existing = {partition.start for partition in partitions() if partition.start}
+    missing = sorted({month.replace(day=1) for month in months} - existing)
+    if not missing:
+        return []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE date_trunc('month', upload_date)::date = ANY(%s))",
+            [missing],
+        )
+        # A partition can't be created over rows of the default partition, which is
+        # detached meanwhile
+        move = cursor.fetchone()[0]
+        if move:
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+
+        for month in missing:
+            cursor.execute(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF {TABLE} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [month, next_month(month)],
+            )
+
+        if move:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                "WHERE date_trunc('month', upload_date)::date = ANY(%s) RETURNING *) "
+                f"INSERT INTO {TABLE} SELECT * FROM moved",
+                [missing],
+            )
+            cursor.execute(
+                f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+            )
+
+    return [partition_name(month) for month in missing]
+
+
+def default_partition_months() -> List[date]:
+    """The months of the jobs waiting in the default partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', upload_date)::date "
+            f"FROM {DEFAULT_PARTITION} WHERE upload_date IS NOT NULL"
+        )
+        return [month for month, in cursor.fetchall()]
+
+
+def remove_partitions(before: date, archive: bool = False) -> List[str]:
+    """
+    Detaches the partitions of the months before `before` and deletes the keys
+    of their jobs, with the rows linked to them. Archived partitions and link
+    rows are kept in archive_* tables, the others are dropped. Returns the
+    removed partitions.
+    """
+    removed = []
+    for partition in partitions():
+        if partition.end is None or partition.end > before:
+            continue
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {partition.name}")
+            # The detached partition keeps the foreign key to the keys of its jobs
+            cursor.execute(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = %s::regclass AND confrelid = %s::regclass",
+                [partition.name, KEY_TABLE],
+            )
+            for (name,) in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE {partition.name} DROP CONSTRAINT "{name}"')
+
+            if archive:
+                for model in LINKED_MODELS:
+                    table = model._meta.db_table
+                    column = model._meta.get_field("job").column
+                    cursor.execute(
+                        f"CREATE TABLE {archive_name(table, partition.start)} AS "
+                        f"SELECT * FROM {table} "
+                        f"WHERE {column} IN (SELECT id FROM {partition.name})"
+                    )
+            # The link rows are deleted along with the keys (ON DELETE CASCADE)
+            cursor.execute(
+                f"DELETE FROM {KEY_TABLE} WHERE id IN (SELECT id FROM {partition.name})"
+            )
+
+            if archive:
+                cursor.execute(
+                    f"ALTER TABLE {partition.name} "
+                    f"RENAME TO {archive_name(TABLE, partition.start)}"
+                )
+            else:
+                cursor.execute(f"DROP TABLE {partition.name}")
+
+        removed.append(partition.name)
+
+    return removed
@@ -0,0 +1,22 @@
+import orjson
+from ninja.renderers import JSONRenderer
+
+from api.metrics import ROWS_RETURNED, recording, route_name
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Renders responses with orjson, which is several times faster than the
+    standard library on large pages of long texts. Types orjson doesn't know
+    (e.g Decimal) go through Ninja's encoder.
+    """
+
+    def render(self, request, data, *, response_status):
+        if recording() and isinstance(data, dict) and "items" in data:
+            ROWS_RETURNED.labels(route_name(request)).observe(len(data["items"]))
+
+        return orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
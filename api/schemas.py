@@ -1,12 +1,15 @@
 from enum import Enum
-from typing import List, Any
+from typing import ClassVar, Dict, List, Any, Type
 from datetime import date
 
 from ninja import ModelSchema, FilterSchema, Schema
 from ninja.schema import Field
-from django.db.models import Q
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import Exists, OuterRef, Q, QuerySet
 
 from api.models import *
+from api.search import KeywordMatch, by_selectivity, search_document
+from api.taxonomy import skill_uris, occupation_uris
 
 
 class LogicEnum(str, Enum):
@@ -30,15 +33,120 @@ def logic_list(
     return q
 
 
-def logic_list_foreign_key(field: str, values: List[str] | None, logic: LogicEnum) -> Q:
-    # Awesome and hacky solution by: https://stackoverflow.com/a/39595260/11718554
+def logic_search(
+    model, fields: List[str], values: List[str] | None, logic: LogicEnum
+) -> Q:
+    # One ILIKE per keyword on the concatenated fields, answered by the model's
+    # trigram index over the same concatenation (see api/search.py). With AND
+    # logic the most selective keyword comes first, the index intersects the
+    # keywords' trigrams so the scan follows the rarest one
+    if not values:
+        return Q()
+
+    document = search_document(*fields)
     if logic == LogicEnum.or_:
-        return Q(**{f"{field}__in": values})
+        q = Q()
+        for value in dict.fromkeys(values):
+            q |= Q(KeywordMatch(document, value))
+        return q
+
+    q = Q()
+    for value in by_selectivity(model, fields, values):
+        q &= Q(KeywordMatch(document, value))
+    return q
+
+
+def logic_list_foreign_key(
+    related: QuerySet, field: str, values: List[Any] | None, logic: LogicEnum
+) -> Q:
+    # `related` is the link table correlated to the outer row (e.g with OuterRef("pk")).
+    # EXISTS never multiplies the outer rows, so the querysets need no .distinct()
+    if not values:
+        return Q()
+
+    if logic == LogicEnum.or_:
+        return Q(Exists(related.filter(**{f"{field}__in": values})))
 
     q = Q()
     for value in values or []:
-        q |= ~Q(**{f"{field}": value})
-    return ~q
+        q &= Q(Exists(related.filter(**{field: value})))
+    return q
+
+
+def logic_list_array(field: str, values: List[str] | None, logic: LogicEnum) -> Q:
+    # Containment on a GIN-indexed array field, no join and no duplicate rows
+    if not values:
+        return Q()
+
+    if logic == LogicEnum.or_:
+        return Q(**{f"{field}__overlap": values})
+
+    return Q(**{f"{field}__contains": values})
+
+
+def row_value(row: Dict[str, Any], key: str) -> Any:
+    # List endpoints validate .values() rows. A key missing from the row belongs
+    # to a field the client left out, AttributeError makes pydantic leave it unset
+    try:
+        return row[key]
+    except KeyError:
+        raise AttributeError(key)
+
+
+class ProjectionBase(Schema):
+    response_schema: ClassVar[Type[Schema]]
+
+    def selected_fields(self) -> List[str]:
+        fields = [field.value for field in self.fields or []] or list(
+            self.response_schema.model_fields
+        )
+        exclude = {field.value for field in self.exclude or []}
+        return [field for field in fields if field not in exclude]
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        """
+        Loads only the columns (and link id arrays) behind the selected fields,
+        as dicts instead of model instances.
+        """
+        model_fields = self.response_schema.model_fields
+        columns = getattr(self.response_schema, "columns", {})
+        annotations = getattr(self.response_schema, "annotations", {})
+
+        # Foreign keys are read from their `<name>_id` column alias
+        keys = {
+            columns.get(field, model_fields[field].validation_alias or field)
+            for field in self.selected_fields()
+        }
+        return queryset.values(
+            *(key for key in keys if key not in annotations),
+            **{key: annotations[key] for key in keys if key in annotations},
+        )
+
+
+def projection(schema: Type[Schema]) -> Type[ProjectionBase]:
+    """Builds the `fields` / `exclude` query parameters of a list endpoint's schema."""
+    field_enum = Enum(
+        f"{schema.__name__}Field",
+        {name: name for name in schema.model_fields},
+        type=str,
+    )
+
+    return type(
+        f"{schema.__name__}Projection",
+        (ProjectionBase,),
+        {
+            "__module__": __name__,
+            "__annotations__": {
+                "fields": List[field_enum],
+                "exclude": List[field_enum],
+            },
+            "response_schema": schema,
+            "fields": Field(
+                None, description="Only these fields will be returned (all by default)"
+            ),
+            "exclude": Field(None, description="These fields will not be returned"),
+        },
+    )
 
 
 # ---------------------- Skills ----------------------
@@ -47,13 +155,29 @@ def logic_list_foreign_key(field: str, values: List[str] | None, logic: LogicEnu
 class EscoSkillSchema(ModelSchema):
     class Meta:
         model = EscoSkill
-        fields = "__all__"
+        exclude = ["id", "uri"] + [
+            f"{bound}_{pillar}_level"
+            for pillar in ("knowledge", "language", "skill", "traversal")
+            for bound in ("min", "max")
+        ]
+        fields_optional = "__all__"
+
+    columns: ClassVar[Dict[str, str]] = {"id": "uri"}
+
+    id: str = None
+
+    @staticmethod
+    def resolve_id(obj):
+        return row_value(obj, "uri")
+
+
+EscoSkillProjection = projection(EscoSkillSchema)
 
 
 class EscoSkillFilter(FilterSchema):
     ids: List[str] = Field(
         None,
-        q="id__in",
+        q="uri__in",
         description="The skill IDs that will be returned.",
         example=[
             "http://data.europa.eu/esco/skill/ccd0a1d9-afda-43d9-b901-96344886e14d",
@@ -98,52 +222,52 @@ class EscoSkillFilter(FilterSchema):
 
     min_knowledge_level: int = Field(
         None,
-        q="knowledge_levels__0__gte",
+        q="min_knowledge_level__gte",
         description="All knowledge path levels must be greater than or equal to this value",
         example="",
     )
     max_knowledge_level: int = Field(
         None,
-        q="knowledge_levels__-1__lte",
+        q="max_knowledge_level__lte",
         description="All knowledge path levels must be less than or equal to this value",
         example="",
     )
 
     min_language_level: int = Field(
         None,
-        q="language_levels__0__gte",
+        q="min_language_level__gte",
         description="All language path levels must be greater than or equal to this value",
         example="",
     )
     max_language_level: int = Field(
         None,
-        q="language_levels__-1__lte",
+        q="max_language_level__lte",
         description="All language path levels must be less than or equal to this value",
         example="",
     )
 
     min_skill_level: int = Field(
         None,
-        q="skill_levels__0__gte",
+        q="min_skill_level__gte",
         description="All skill path levels must be greater than or equal to this value",
         example=3,
     )
     max_skill_level: int = Field(
         None,
-        q="skill_levels__-1__lte",
+        q="max_skill_level__lte",
         description="All skill path levels must be less than or equal to this value",
         example="",
     )
 
     min_traversal_level: int = Field(
         None,
-        q="traversal_levels__0__gte",
+        q="min_traversal_level__gte",
         description="All traversal path levels must be greater than or equal to this value",
         example="",
     )
     max_traversal_level: int = Field(
         None,
-        q="traversal_levels__-1__lte",
+        q="max_traversal_level__lte",
         description="All traversal path levels must be less than or equal to this value",
         example="",
     )
@@ -183,24 +307,85 @@ class EscoSkillFilter(FilterSchema):
 
 
 class BackPropagationFilter(FilterSchema):
-    ids: List[str] = Field(None, q="id__in")
+    ids: List[str] = Field(None, q="uri__in")
 
 
 class PropagationIn(Schema):
     ids: List[str] = Field()
 
 
+class ExtractionIn(Schema):
+    documents: List[str] = Field(
+        ...,
+        max_length=1000,
+        description="Texts to tag with the skills they mention (up to 1000)",
+        example=["Experience with Python and project management"],
+    )
+
+
+class ClassificationIn(Schema):
+    titles: List[str] = Field(
+        ...,
+        max_length=1000,
+        description="Job titles to classify into occupations (up to 1000)",
+        example=["Senior Python Developer (m/f/d)"],
+    )
+
+
+class LabelSearchQuery(Schema):
+    text: str = Field(
+        ...,
+        min_length=1,
+        max_length=255,
+        description="The typed text, matched against the preferred and alternative labels",
+        example="pyth",
+    )
+    limit: int = Field(10, ge=1, le=50, description="Maximum number of matches")
+
+
+class LabelMatchSchema(Schema):
+    id: str = Field(description="The ID of the skill or occupation")
+    label: str | None = Field(description="The preferred label")
+    matched_label: str = Field(
+        description="The (preferred or alternative) label that matched"
+    )
+    similarity: float = Field(description="Trigram word similarity to the text (0-1)")
+
+
+class SemanticSearchQuery(Schema):
+    text: str = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Free text, matched by meaning against the entities' text",
+        example="machine learning engineer",
+    )
+    limit: int = Field(10, ge=1, le=100, description="Maximum number of results")
+
+
 # ---------------------- Occupations ----------------------
 class IscoOccupationSchema(ModelSchema):
     class Meta:
         model = IscoOccupation
-        fields = "__all__"
+        exclude = ["id", "uri", "min_level", "max_level"]
+        fields_optional = "__all__"
+
+    columns: ClassVar[Dict[str, str]] = {"id": "uri"}
+
+    id: str = None
+
+    @staticmethod
+    def resolve_id(obj):
+        return row_value(obj, "uri")
+
+
+IscoOccupationProjection = projection(IscoOccupationSchema)
 
 
 class IscoOccupationFilter(FilterSchema):
     ids: List[str] = Field(
         None,
-        q="id__in",
+        q="uri__in",
         description="A list of IDs that must included in the returned occupations",
         example=[],
     )
@@ -239,13 +424,13 @@ class IscoOccupationFilter(FilterSchema):
 
     min_level: int = Field(
         None,
-        q="levels__0__gte",
+        q="min_level__gte",
         description="All levels must be greater than or equal to this value",
         example="",
     )
     max_level: int = Field(
         None,
-        q="levels__-1__lte",
+        q="max_level__lte",
         description="All levels must be less than or equal to this value",
         example="",
     )
@@ -283,18 +468,34 @@ class IscoOccupationFilter(FilterSchema):
 class ProjectSchema(ModelSchema):
     class Meta:
         model = Project
-        fields = "__all__"
+        exclude = ["skill_ids"]
+        fields_optional = "__all__"
+
+    columns: ClassVar[Dict[str, str]] = {
+        "skills": "skill_ids",
+        "organizations": "organization_ids",
+    }
+    annotations: ClassVar[Dict[str, Any]] = {
+        "organization_ids": ArraySubquery(
+            ProjectOrganization.objects.filter(project=OuterRef("pk")).values(
+                "organization_id"
+            )
+        )
+    }
 
-    skills: List[str]
-    organizations: List[int]
+    skills: List[str] = None
+    organizations: List[int] = None
 
     @staticmethod
     def resolve_skills(obj):
-        return obj.skills.values_list("skill_id", flat=True)
+        return skill_uris.uris(row_value(obj, "skill_ids"))
 
     @staticmethod
     def resolve_organizations(obj):
-        return obj.organizations.values_list("organization_id", flat=True)
+        return row_value(obj, "organization_ids")
+
+
+ProjectProjection = projection(ProjectSchema)
 
 
 class ProjectFilter(FilterSchema):
@@ -364,31 +565,51 @@ class ProjectFilter(FilterSchema):
         return Q()
 
     def filter_skill_ids(self, values: List[str]) -> Q:
-        return logic_list_foreign_key("skills__skill_id", values, self.skill_ids_logic)
+        return logic_list_array(
+            "skill_ids", skill_uris.ids(values), self.skill_ids_logic
+        )
 
     def filter_keywords_logic(self, _: LogicEnum) -> Q:
         return Q()
 
     def filter_keywords(self, values: List[str]) -> Q:
-        return logic_list(["title", "objective"], values, self.keywords_logic)
+        return logic_search(
+            Project, ["title", "objective"], values, self.keywords_logic
+        )
 
 
 # ---------------------- Organizations ----------------------
 class OrganizationSchema(ModelSchema):
     class Meta:
         model = Organization
-        fields = "__all__"
+        exclude = ["skill_ids"]
+        fields_optional = "__all__"
+
+    columns: ClassVar[Dict[str, str]] = {
+        "skills": "skill_ids",
+        "projects": "project_ids",
+    }
+    annotations: ClassVar[Dict[str, Any]] = {
+        "project_ids": ArraySubquery(
+            ProjectOrganization.objects.filter(organization=OuterRef("pk")).values(
+                "project_id"
+            )
+        )
+    }
 
-    skills: List[str]
-    projects: List[int]
+    skills: List[str] = None
+    projects: List[int] = None
 
     @staticmethod
     def resolve_projects(obj):
-        return obj.projects.values_list("project_id", flat=True)
+        return row_value(obj, "project_ids")
 
     @staticmethod
     def resolve_skills(obj):
-        return obj.skills.values_list("skill_id", flat=True)
+        return skill_uris.uris(row_value(obj, "skill_ids"))
+
+
+OrganizationProjection = projection(OrganizationSchema)
 
 
 class OrganizationFilter(FilterSchema):
@@ -450,7 +671,9 @@ class OrganizationFilter(FilterSchema):
         return Q()
 
     def filter_skill_ids(self, values: List[str]) -> Q:
-        return logic_list_foreign_key("skills__skill_id", values, self.skill_ids_logic)
+        return logic_list_array(
+            "skill_ids", skill_uris.ids(values), self.skill_ids_logic
+        )
 
     def filter_keywords_logic(self, _: LogicEnum) -> Q:
         return Q()
@@ -460,24 +683,39 @@ class OrganizationFilter(FilterSchema):
 
     def filter_projects(self, values: List[int]) -> Q:
         return logic_list_foreign_key(
-            "projects__project_id", values, self.projects_logic
+            ProjectOrganization.objects.filter(organization=OuterRef("pk")),
+            "project_id",
+            values,
+            self.projects_logic,
         )
 
     def filter_keywords(self, values: List[str]) -> Q:
-        return logic_list(["name", "description"], values, self.keywords_logic)
+        return logic_search(
+            Organization, ["name", "description"], values, self.keywords_logic
+        )
 
 
 # ---------------------- Articles ----------------------
 class ArticleSchema(ModelSchema):
     class Meta:
         model = Article
-        fields = "__all__"
+        exclude = ["skill_ids"]
+        fields_optional = "__all__"
 
-    skills: List[str]
+    columns: ClassVar[Dict[str, str]] = {"skills": "skill_ids"}
+
+    skills: List[str] = None
 
     @staticmethod
     def resolve_skills(obj):
-        return obj.skills.values_list("skill_id", flat=True)
+        return skill_uris.uris(row_value(obj, "skill_ids"))
+
+
+ArticleProjection = projection(ArticleSchema)
+
+
+class ArticleMatchSchema(ArticleSchema):
+    similarity: float = Field(None, description="Semantic similarity to the text (0-1)")
 
 
 class ArticleFilter(FilterSchema):
@@ -543,26 +781,38 @@ class ArticleFilter(FilterSchema):
         return Q()
 
     def filter_skill_ids(self, values: List[str]) -> Q:
-        return logic_list_foreign_key("skills__skill_id", values, self.skill_ids_logic)
+        return logic_list_array(
+            "skill_ids", skill_uris.ids(values), self.skill_ids_logic
+        )
 
     def filter_keywords_logic(self, _: LogicEnum) -> Q:
         return Q()
 
     def filter_keywords(self, values: List[str]) -> Q:
-        return logic_list(["title", "summary"], values, self.keywords_logic)
+        return logic_search(Article, ["title", "summary"], values, self.keywords_logic)
 
 
 # ---------------------- Courses ----------------------
 class CourseSchema(ModelSchema):
     class Meta:
         model = Course
-        fields = "__all__"
+        exclude = ["skill_ids"]
+        fields_optional = "__all__"
+
+    columns: ClassVar[Dict[str, str]] = {"skills": "skill_ids"}
 
-    skills: List[str]
+    skills: List[str] = None
 
     @staticmethod
     def resolve_skills(obj):
-        return obj.skills.values_list("skill_id", flat=True)
+        return skill_uris.uris(row_value(obj, "skill_ids"))
+
+
+CourseProjection = projection(CourseSchema)
+
+
+class CourseMatchSchema(CourseSchema):
+    similarity: float = Field(None, description="Semantic similarity to the text (0-1)")
 
 
 class CourseFilter(FilterSchema):
@@ -586,7 +836,6 @@ class CourseFilter(FilterSchema):
 
     skill_ids: List[str] = Field(
         None,
-        q="skills__skill_id__in",
         description="Only courses that have these skills will be returned",
         example=[
             "http://data.europa.eu/esco/skill/ccd0a1d9-afda-43d9-b901-96344886e14d"
@@ -600,14 +849,14 @@ class CourseFilter(FilterSchema):
 
     min_creation_date: date = Field(
         None,
-        q="creation_date__gte",
-        description="The creation date must be greater than or equal to this value",
+        q="last_updated__gte",
+        description="The date the course was created or last updated (last_updated) must be greater than or equal to this value",
         example="",
     )
     max_creation_date: date = Field(
         None,
-        q="creation_date__lte",
-        description="The creation date must be less than or equal to this value",
+        q="last_updated__lte",
+        description="The date the course was created or last updated (last_updated) must be less than or equal to this value",
         example="",
     )
 
@@ -654,31 +903,53 @@ class CourseFilter(FilterSchema):
         return Q()
 
     def filter_skill_ids(self, values: List[str]) -> Q:
-        return logic_list_foreign_key("skills__skill_id", values, self.skill_ids_logic)
+        return logic_list_array(
+            "skill_ids", skill_uris.ids(values), self.skill_ids_logic
+        )
 
     def filter_keywords_logic(self, _: LogicEnum) -> Q:
         return Q()
 
     def filter_keywords(self, values: List[str]) -> Q:
-        return logic_list(["title", "description"], values, self.keywords_logic)
+        return logic_search(
+            Course, ["title", "description"], values, self.keywords_logic
+        )
 
 
 # ---------------------- Jobs ----------------------
 class JobSchema(ModelSchema):
     class Meta:
         model = Job
-        fields = "__all__"
+        exclude = ["skill_ids"]
+        fields_optional = "__all__"
+
+    columns: ClassVar[Dict[str, str]] = {
+        "skills": "skill_ids",
+        "occupations": "occupation_ids",
+    }
+    annotations: ClassVar[Dict[str, Any]] = {
+        "occupation_ids": ArraySubquery(
+            JobOccupation.objects.filter(job=OuterRef("pk")).values("occupation_id")
+        )
+    }
 
-    skills: List[str]
-    occupations: List[str]
+    skills: List[str] = None
+    occupations: List[str] = None
 
     @staticmethod
     def resolve_skills(obj):
-        return obj.skills.values_list("skill_id", flat=True)
+        return skill_uris.uris(row_value(obj, "skill_ids"))
 
     @staticmethod
     def resolve_occupations(obj):
-        return obj.occupations.values_list("occupation_id", flat=True)
+        return occupation_uris.uris(row_value(obj, "occupation_ids"))
+
+
+JobProjection = projection(JobSchema)
+
+
+class JobMatchSchema(JobSchema):
+    similarity: float = Field(None, description="Semantic similarity to the text (0-1)")
 
 
 class JobFilter(FilterSchema):
@@ -711,6 +982,10 @@ class JobFilter(FilterSchema):
         LogicEnum.or_,
         description="The logic to use when filtering by occupations",
     )
+    occupation_ids_descendants: bool = Field(
+        False,
+        description="Also match jobs whose occupations are descendants of the given occupations (e.g an ISCO major group)",
+    )
 
     organization_ids: List[int] = Field(
         None,
@@ -750,17 +1025,44 @@ class JobFilter(FilterSchema):
         example=["linkedin"],
     )
 
+    deduplicate: bool = Field(
+        False,
+        description="Only the first matching job of near duplicates will be returned (see the deduplicate_jobs command)",
+    )
+
+    def filter(self, queryset: QuerySet) -> QuerySet:
+        queryset = super().filter(queryset)
+        if not self.deduplicate:
+            return queryset
+
+        # Anti-join on the matching jobs, so that a duplicate is returned when the
+        # first job of its cluster is filtered out
+        return queryset.filter(
+            ~Exists(
+                queryset.filter(
+                    duplicate_cluster=OuterRef("duplicate_cluster"),
+                    pk__lt=OuterRef("pk"),
+                )
+            )
+        )
+
+    def filter_deduplicate(self, _: bool) -> Q:
+        return Q()
+
     def filter_skill_ids_logic(self, _: LogicEnum) -> Q:
         return Q()
 
     def filter_skill_ids(self, values: List[str]) -> Q:
-        return logic_list_foreign_key("skills__skill_id", values, self.skill_ids_logic)
+        return logic_list_array(
+            "skill_ids", skill_uris.ids(values), self.skill_ids_logic
+        )
 
     def filter_keywords_logic(self, _: LogicEnum) -> Q:
         return Q()
 
     def filter_keywords(self, values: List[str]) -> Q:
-        return logic_list(
+        return logic_search(
+            Job,
             ["title", "description", "location", "type", "experience_level"],
             values,
             self.keywords_logic,
@@ -769,9 +1071,20 @@ class JobFilter(FilterSchema):
     def filter_occupation_ids_logic(self, _: LogicEnum) -> Q:
         return Q()
 
+    def filter_occupation_ids_descendants(self, _: bool) -> Q:
+        return Q()
+
     def filter_occupation_ids(self, values: List[str]) -> Q:
+        field = (
+            "occupation__ancestor_links__ancestor_id"
+            if self.occupation_ids_descendants
+            else "occupation_id"
+        )
         return logic_list_foreign_key(
-            "occupations__occupation_id", values, self.occupation_ids_logic
+            JobOccupation.objects.filter(job=OuterRef("pk")),
+            field,
+            occupation_uris.ids(values),
+            self.occupation_ids_logic,
         )
 
 
@@ -779,13 +1092,19 @@ class JobFilter(FilterSchema):
 class ProfileSchema(ModelSchema):
     class Meta:
         model = Profile
-        fields = "__all__"
+        exclude = ["skill_ids"]
+        fields_optional = "__all__"
+
+    columns: ClassVar[Dict[str, str]] = {"skills": "skill_ids"}
 
-    skills: List[str]
+    skills: List[str] = None
 
     @staticmethod
     def resolve_skills(obj):
-        return obj.skills.values_list("skill_id", flat=True)
+        return skill_uris.uris(row_value(obj, "skill_ids"))
+
+
+ProfileProjection = projection(ProfileSchema)
 
 
 class ProfileFilter(FilterSchema):
@@ -831,13 +1150,16 @@ class ProfileFilter(FilterSchema):
         return Q()
 
     def filter_skill_ids(self, values: List[str]) -> Q:
-        return logic_list_foreign_key("skills__skill_id", values, self.skill_ids_logic)
+        return logic_list_array(
+            "skill_ids", skill_uris.ids(values), self.skill_ids_logic
+        )
 
     def filter_keywords_logic(self, _: LogicEnum) -> Q:
         return Q()
 
     def filter_keywords(self, values: List[str]) -> Q:
-        return logic_list(
+        return logic_search(
+            Profile,
             ["full_name", "location", "content", "occupation"],
             values,
             self.keywords_logic,
@@ -848,13 +1170,19 @@ class ProfileFilter(FilterSchema):
 class LawPolicySchema(ModelSchema):
     class Meta:
         model = LawPolicy
-        fields = "__all__"
+        exclude = ["skill_ids"]
+        fields_optional = "__all__"
 
-    skills: List[str]
+    columns: ClassVar[Dict[str, str]] = {"skills": "skill_ids"}
+
+    skills: List[str] = None
 
     @staticmethod
     def resolve_skills(obj):
-        return obj.skills.values_list("skill_id", flat=True)
+        return skill_uris.uris(row_value(obj, "skill_ids"))
+
+
+LawPolicyProjection = projection(LawPolicySchema)
 
 
 class LawPolicyFilter(FilterSchema):
@@ -932,26 +1260,36 @@ class LawPolicyFilter(FilterSchema):
         return Q()
 
     def filter_skill_ids(self, values: List[str]) -> Q:
-        return logic_list_foreign_key("skills__skill_id", values, self.skill_ids_logic)
+        return logic_list_array(
+            "skill_ids", skill_uris.ids(values), self.skill_ids_logic
+        )
 
     def filter_keywords_logic(self, _: LogicEnum) -> Q:
         return Q()
 
     def filter_keywords(self, values: List[str]) -> Q:
-        return logic_list(["title", "summary", "authors"], values, self.keywords_logic)
+        return logic_search(
+            LawPolicy, ["title", "summary", "authors"], values, self.keywords_logic
+        )
 
 
 # ---------------------- Law Publications ----------------------
 class LawPublicationSchema(ModelSchema):
     class Meta:
         model = LawPublication
-        fields = "__all__"
+        exclude = ["skill_ids"]
+        fields_optional = "__all__"
 
-    skills: List[str]
+    columns: ClassVar[Dict[str, str]] = {"skills": "skill_ids"}
+
+    skills: List[str] = None
 
     @staticmethod
     def resolve_skills(obj):
-        return obj.skills.values_list("skill_id", flat=True)
+        return skill_uris.uris(row_value(obj, "skill_ids"))
+
+
+LawPublicationProjection = projection(LawPublicationSchema)
 
 
 class LawPublicationFilter(FilterSchema):
@@ -1016,10 +1354,14 @@ class LawPublicationFilter(FilterSchema):
         return Q()
 
     def filter_skill_ids(self, values: List[str]) -> Q:
-        return logic_list_foreign_key("skills__skill_id", values, self.skill_ids_logic)
+        return logic_list_array(
+            "skill_ids", skill_uris.ids(values), self.skill_ids_logic
+        )
 
     def filter_keywords_logic(self, _: LogicEnum) -> Q:
         return Q()
 
     def filter_keywords(self, values: List[str]) -> Q:
-        return logic_list(["title", "authors", "summary"], values, self.keywords_logic)
+        return logic_search(
+            LawPublication, ["title", "authors", "summary"], values, self.keywords_logic
+        )
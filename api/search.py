@@ -0,0 +1,104 @@
+"""
+Keyword search of the entities. The searchable text fields of a model are
+concatenated into one expression with a trigram index over it (the model's
+`<name>_search` index), so that a keyword is a single ILIKE on that index
+instead of an ILIKE per field.
+
+Label search of the taxonomy: ranks skills or occupations by the trigram
+similarity of their flattened labels (see EscoSkillLabel) to a typed text.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import F, Lookup, QuerySet, TextField, Value
+from django.db.models.functions import Concat, Length
+
+# Label rows read per returned match, an entity can match with several of its labels
+CANDIDATES_PER_MATCH = 4
+
+# Between the fields, so that a keyword never matches across two of them
+SEPARATOR = "\n"
+
+
+def search_document(*fields: str) -> Concat:
+    """The fields joined by SEPARATOR, NULL fields as empty strings."""
+    expressions = [F(fields[0])]
+    for field in fields[1:]:
+        expressions += [Value(SEPARATOR), F(field)]
+
+    return Concat(*expressions, output_field=TextField())
+
+
+class KeywordMatch(Lookup):
+    """
+    Case insensitive substring match written as ILIKE, which trigram indexes
+    support (icontains is UPPER(...) LIKE UPPER(...), which they don't).
+    """
+
+    lookup_name = "keyword"
+
+    def get_db_prep_lookup(self, value, connection):
+        return "%s", [f"%{connection.ops.prep_for_like_query(value)}%"]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", (*lhs_params, *rhs_params)
+
+
+@lru_cache(maxsize=4096)
+def estimated_rows(model, fields: Tuple[str, ...], keyword: str) -> float:
+    """The planner's estimate of the rows matching a keyword (no rows are read)."""
+    queryset = model._default_manager.filter(
+        KeywordMatch(search_document(*fields), keyword)
+    )
+    return json.loads(queryset.explain(format="json"))[0]["Plan"]["Plan Rows"]
+
+
+def by_selectivity(model, fields: Sequence[str], keywords: List[str]) -> List[str]:
+    """The keywords, most selective (fewest estimated rows) first."""
+    keywords = list(dict.fromkeys(keywords))
+    if len(keywords) < 2:
+        return keywords
+
+    return sorted(
+        keywords, key=lambda keyword: estimated_rows(model, tuple(fields), keyword)
+    )
+
+
+def best_label_matches(
+    labels: QuerySet, entity: str, text: str, limit: int
+) -> List[Dict[str, Any]]:
+    """
+    The `limit` entities whose labels are most similar to `text`, each with
+    its best matching label. `labels` is a flattened label table and `entity`
+    its foreign key to the taxonomy model.
+
+    The word similarity operator (%>) is answered by the label's trigram index
+    and matches prefixes and typos of any word of a label, as typed in an
+    autocomplete field.
+    """
+    text = " ".join(text.split())
+    candidates = (
+        labels.filter(TrigramWordSimilar(F("label"), text))
+        .annotate(similarity=TrigramWordSimilarity(text, "label"))
+        .order_by("-similarity", "-preferred", Length("label"))
+        .values(f"{entity}__uri", f"{entity}__label", "label", "similarity")
+    )[: limit * CANDIDATES_PER_MATCH]
+
+    matches: Dict[str, Dict[str, Any]] = {}
+    for row in candidates:
+        uri = row[f"{entity}__uri"]
+        if uri not in matches:
+            matches[uri] = {
+                "id": uri,
+                "label": row[f"{entity}__label"],
+                "matched_label": row["label"],
+                "similarity": row["similarity"],
+            }
+
+    return list(matches.values())[:limit]
@@ -0,0 +1,366 @@
+"""
+Semantic search of entity texts, without a model server or a GPU. Texts are
+embedded with hashed TF-IDF: their words (and word prefixes) are hashed into
+signed buckets of a small dense vector, which is a sparse random projection
+of the TF-IDF vector, so that the cosine similarity of two texts is the dot
+product of their normalized vectors. The vectors of an entity are stored in
+a float32 matrix memory-mapped from disk, grouped into the lists of an
+inverted file (IVF) built with k-means, and a query only scores the lists
+whose centroids are the closest to it.
+"""
+
+import os
+import re
+import shutil
+import zlib
+from itertools import islice
+from math import sqrt
+from pathlib import Path
+from time import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db.models import QuerySet
+
+from api.metrics import count_cache
+from api.models import *
+
+# Text fields embedded by the build_semantic_index command, by entity
+SEMANTIC_FIELDS = {
+    Article: ["title", "summary"],
+    Course: ["title", "description"],
+    Job: ["title", "description"],
+}
+
+# Size of the vectors, a power of two
+DIMENSIONS = 256
+DIMENSION_BITS = DIMENSIONS.bit_length() - 1
+# Buckets of the document frequencies of the features
+IDF_BUCKETS = 2**20
+# Words longer than this also count by their prefix, a crude stemming that
+# brings e.g "developer" and "development" closer
+PREFIX_LENGTH = 6
+PREFIX_WEIGHT = 0.5
+
+# Fixed, the queries must be hashed as the indexed texts. Each feature is added
+# to one signed bucket per multiplier, which lowers the variance of the projection
+MULTIPLIERS = np.array([0x9E3779B1, 0x85EBCA77], dtype=np.uint64)
+
+KMEANS_SAMPLE = 50_000
+KMEANS_ITERATIONS = 10
+# Lists scored per query at least, more when they hold fewer rows than the limit
+MIN_PROBES = 64
+
+# Filters matching at most this many rows are applied before the search, the
+# others after it, over a growing number of neighbours
+PREFILTER_ROWS = 20_000
+MAX_NEIGHBOURS = 10_000
+
+TOKEN_RE = re.compile(r"[^\W\d_]{2,}")
+
+
+def features(text: str | None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The (crc32) hashes of the words (without plural endings) and word prefixes
+    of a text, and their sublinear term frequencies.
+    """
+    counts: Dict[str, float] = {}
+    for word in TOKEN_RE.findall((text or "").lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        counts[word] = counts.get(word, 0.0) + 1.0
+        if len(word) > PREFIX_LENGTH:
+            prefix = word[:PREFIX_LENGTH] + "*"
+            counts[prefix] = counts.get(prefix, 0.0) + PREFIX_WEIGHT
+
+    hashes = np.fromiter(
+        (zlib.crc32(feature.encode()) for feature in counts),
+        dtype=np.uint64,
+        count=len(counts),
+    )
+    frequencies = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return hashes, 1 + np.log(frequencies)
+
+
+def embed(
+    documents: List[Tuple[np.ndarray, np.ndarray]], idf: np.ndarray
+) -> np.ndarray:
+    """The normalized float32 vectors of featurized documents, one row per document."""
+    vectors = np.zeros((len(documents), DIMENSIONS), dtype=np.float32)
+    if not documents:
+        return vectors
+
+    rows = np.repeat(np.arange(len(documents)), [len(h) for h, _ in documents])
+    hashes = np.concatenate([h for h, _ in documents])
+    weights = np.concatenate([w for _, w in documents]) * idf[hashes % IDF_BUCKETS]
+
+    for multiplier in MULTIPLIERS:
+        mixed = (hashes * multiplier) & np.uint64(0xFFFFFFFF)
+        buckets = (mixed >> np.uint64(32 - DIMENSION_BITS)).astype(np.intp)
+        signs = np.where(mixed & np.uint64(1 << 16), 1.0, -1.0)
+        vectors += np.bincount(
+            rows * DIMENSIONS + buckets,
+            weights=signs * weights,
+            minlength=vectors.size,
+        ).reshape(vectors.shape)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def kmeans(sample: np.ndarray, lists: int, rng: np.random.Generator) -> np.ndarray:
+    """Spherical k-means centroids of normalized vectors."""
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Lists left without vectors keep their centroid
+        centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+    return centroids
+
+
+def batches(rows: Iterable, size: int) -> Iterable[List]:
+    rows = iter(rows)
+    return iter(lambda: list(islice(rows, size)), [])
+
+
+def build_index(
+    path: Path,
+    documents: Callable[[], Iterable[Tuple[int, str]]],
+    batch_size: int = 5000,
+    log: Callable[[str], None] = print,
+) -> int:
+    """
+    Builds the index of the (pk, text) documents into a new directory. The
+    documents are read twice, once for their frequencies and once for their
+    vectors. Returns the number of indexed documents.
+    """
+    path.mkdir(parents=True)
+
+    document_counts = np.zeros(IDF_BUCKETS, dtype=np.int64)
+    total = 0
+    for batch in batches(documents(), batch_size):
+        buckets = [np.unique(features(text)[0] % IDF_BUCKETS) for _, text in batch]
+        document_counts += np.bincount(
+            np.concatenate(buckets).astype(np.intp), minlength=IDF_BUCKETS
+        )
+        total += len(batch)
+
+    idf = (np.log((1 + total) / (1 + document_counts)) + 1).astype(np.float32)
+    np.save(path / "idf.npy", idf)
+    log(f"Counted the features of {total} documents.")
+
+    # Rows added between the two passes wait for the next build
+    unsorted = np.lib.format.open_memmap(
+        path / "unsorted.npy", mode="w+", dtype=np.float32, shape=(total, DIMENSIONS)
+    )
+    ids = np.zeros(total, dtype=np.int64)
+    count = 0
+    for batch in batches(documents(), batch_size):
+        batch = batch[: total - count]
+        unsorted[count : count + len(batch)] = embed(
+            [features(text) for _, text in batch], idf
+        )
+        ids[count : count + len(batch)] = [pk for pk, _ in batch]
+        count += len(batch)
+        if count == total:
+            break
+    log(f"Embedded {count} documents.")
+
+    rng = np.random.default_rng(0)
+    lists = max(1, int(sqrt(count)))
+    sample = unsorted[
+        np.sort(rng.choice(count, min(count, KMEANS_SAMPLE), replace=False))
+    ]
+    centroids = (
+        kmeans(sample, lists, rng) if count else np.zeros((1, DIMENSIONS), np.float32)
+    )
+
+    assignment = np.concatenate(
+        [
+            np.argmax(unsorted[start : start + batch_size] @ centroids.T, axis=1)
+            for start in range(0, count, batch_size)
+        ]
+        or [np.zeros(0, dtype=np.intp)]
+    )
+    order = np.argsort(assignment, kind="stable")
+
+    vectors = np.lib.format.open_memmap(
+        path / "vectors.npy", mode="w+", dtype=np.float32, shape=(count, DIMENSIONS)
+    )
+    for start in range(0, count, batch_size):
+        rows = order[start : start + batch_size]
+        vectors[start : start + len(rows)] = unsorted[np.sort(rows)][
+            np.argsort(np.argsort(rows))
+        ]
+    vectors.flush()
+    del unsorted
+    os.remove(path / "unsorted.npy")
+
+    np.save(path / "ids.npy", ids[:count][order])
+    np.save(path / "centroids.npy", centroids.astype(np.float32))
+    np.save(
+        path / "offsets.npy",
+        np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=lists))]),
+    )
+    log(f"Grouped the vectors into {lists} lists.")
+
+    return count
+
+
+class SemanticIndex:
+    def __init__(self, path: Path):
+        self.path = path
+        self.idf = np.load(path / "idf.npy")
+        self.vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        self.ids = np.load(path / "ids.npy")
+        self.centroids = np.load(path / "centroids.npy")
+        self.offsets = np.load(path / "offsets.npy")
+        self.order = np.argsort(self.ids)
+        self.sorted_ids = self.ids[self.order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def embed(self, text: str) -> np.ndarray:
+        return embed([features(text)], self.idf)[0]
+
+    def search(
+        self,
+        vector: np.ndarray,
+        limit: int,
+        pks: Iterable[int] | None = None,
+        probes: int = MIN_PROBES,
+    ) -> List[Tuple[int, float]]:
+        """
+        The (pk, similarity) of the nearest indexed documents, scoring exactly
+        the given pks if any, and the closest IVF lists otherwise.
+        """
+        if pks is not None:
+            pks = np.fromiter(pks, dtype=np.int64)
+            positions = np.minimum(np.searchsorted(self.sorted_ids, pks), len(self) - 1)
+            found = positions[self.sorted_ids[positions] == pks] if len(self) else []
+            rows = np.sort(self.order[found])
+            scores = self.vectors[rows] @ vector
+        else:
+            lists = np.argsort(-(self.centroids @ vector))
+            sizes = np.cumsum(np.diff(self.offsets)[lists])
+            probed = lists[: max(probes, int(np.searchsorted(sizes, limit)) + 1)]
+            rows = np.concatenate(
+                [np.arange(self.offsets[i], self.offsets[i + 1]) for i in probed]
+            )
+            # Every list is a contiguous slice of the memory-mapped matrix
+            scores = np.concatenate(
+                [
+                    self.vectors[self.offsets[i] : self.offsets[i + 1]] @ vector
+                    for i in probed
+                ]
+            )
+
+        best = (
+            np.argpartition(-scores, limit - 1)[:limit]
+            if len(scores) > limit
+            else np.arange(len(scores))
+        )
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(self.ids[rows[i]]), float(scores[i])) for i in best]
+
+
+def index_path(model) -> Path:
+    """The link to the current index directory of a model."""
+    return Path(settings.SEMANTIC_INDEX_DIR) / model.__name__.lower()
+
+
+def index_stamp(model) -> str:
+    """The directory of the current index of a model, a new one with every rebuild."""
+    try:
+        return str(index_path(model).resolve(strict=True))
+    except FileNotFoundError:
+        return ""
+
+
+def rebuild_index(
+    model, batch_size: int = 5000, log: Callable[[str], None] = print
+) -> int:
+    """
+    Builds a new index of a model next to the current one and swaps the link to
+    it atomically. Processes holding the previous index keep reading their
+    mapped files until they reload.
+    """
+    link = index_path(model)
+    target = link.with_name(f"{link.name}.{time():.0f}")
+    fields = SEMANTIC_FIELDS[model]
+
+    def documents():
+        rows = model.objects.order_by("pk").values_list("pk", *fields)
+        return (
+            (pk, "\n".join(text or "" for text in texts))
+            for pk, *texts in rows.iterator(chunk_size=batch_size)
+        )
+
+    count = build_index(target, documents, batch_size, log)
+
+    previous = link.resolve() if link.is_symlink() else None
+    temporary = link.with_name(f"{link.name}.link")
+    if temporary.is_symlink():
+        temporary.unlink()
+    temporary.symlink_to(target.name)
+    os.replace(temporary, link)
+    if previous is not None and previous != target.resolve():
+        shutil.rmtree(previous, ignore_errors=True)
+
+    return count
+
+
+_indexes: Dict[type, SemanticIndex] = {}
+
+
+def semantic_index(model) -> SemanticIndex | None:
+    """The current index of a model, reloaded in this process when the link was swapped."""
+    try:
+        target = index_path(model).resolve(strict=True)
+    except FileNotFoundError:
+        return None
+
+    index = _indexes.get(model)
+    if index is None or index.path != target:
+        count_cache(f"{model.__name__}_semantic_index", "miss")
+        index = _indexes[model] = SemanticIndex(target)
+    else:
+        count_cache(f"{model.__name__}_semantic_index", "hit")
+
+    return index
+
+
+def semantic_search(
+    index: SemanticIndex, queryset: QuerySet, text: str, limit: int
+) -> List[Tuple[int, float]]:
+    """The (pk, similarity) of the rows of a (filtered) queryset nearest to the text."""
+    vector = index.embed(text)
+
+    if queryset.query.has_filters():
+        pks = list(queryset.values_list("pk", flat=True)[: PREFILTER_ROWS + 1])
+        if len(pks) <= PREFILTER_ROWS:
+            return index.search(vector, limit, pks=pks)
+
+    # Also drops the rows deleted since the index was built
+    neighbours = limit
+    while True:
+        neighbours = min(neighbours * 4, MAX_NEIGHBOURS)
+        matches = index.search(vector, neighbours)
+        kept = set(
+            queryset.filter(pk__in=[pk for pk, _ in matches]).values_list(
+                "pk", flat=True
+            )
+        )
+        results = [match for match in matches if match[0] in kept]
+        if (
+            len(results) >= limit
+            or len(matches) < neighbours
+            or neighbours == MAX_NEIGHBOURS
+        ):
+            return results[:limit]
@@ -0,0 +1,95 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+from api.models import EscoSkill, IscoOccupation
+from api.helpers import (
+    SKILL_ENTITY_MODELS,
+    install_data_version_triggers,
+    rebuild_occupation_closure,
+    sync_labels,
+    sync_levels,
+    sync_skill_ids,
+)
+from api.taxonomy import skill_uris, occupation_uris
+
+
+def connect_skill_ids_sync():
+    """
+    Keeps the `skill_ids` arrays in sync when skill links are saved or deleted
+    through the ORM. Bulk ingestion bypasses signals and must run the
+    `sync_skill_ids` command afterwards.
+    """
+    for model in SKILL_ENTITY_MODELS:
+        link_field = model.skills.field
+
+        def handler(sender, instance, model=model, link_field=link_field, **kwargs):
+            sync_skill_ids(model, [getattr(instance, link_field.attname)])
+
+        post_save.connect(handler, sender=link_field.model, weak=False)
+        post_delete.connect(handler, sender=link_field.model, weak=False)
+
+
+def connect_uri_map_reset():
+    """Marks this process' URI maps stale when taxonomy rows change through the ORM."""
+    for model, uri_map in [(EscoSkill, skill_uris), (IscoOccupation, occupation_uris)]:
+
+        def handler(sender, uri_map=uri_map, **kwargs):
+            uri_map.reset()
+
+        post_save.connect(handler, sender=model, weak=False)
+        post_delete.connect(handler, sender=model, weak=False)
+
+
+def connect_label_sync():
+    """
+    Keeps the flattened labels of the label search in sync when taxonomy rows
+    are saved through the ORM (the skill extraction automaton and occupation
+    classifier of every process are built again from the written labels).
+    Bulk ingestion must run `sync_labels` afterwards.
+    """
+    for model in [EscoSkill, IscoOccupation]:
+
+        def handler(sender, instance, model=model, **kwargs):
+            sync_labels(model, [instance.pk])
+
+        post_save.connect(handler, sender=model, weak=False)
+
+
+def connect_level_sync():
+    """
+    Keeps the min/max level columns in sync when taxonomy rows are saved
+    through the ORM. Bulk ingestion must run `sync_levels` afterwards.
+    """
+    for model in [EscoSkill, IscoOccupation]:
+
+        def handler(sender, instance, model=model, **kwargs):
+            sync_levels(model, [instance.pk])
+
+        post_save.connect(handler, sender=model, weak=False)
+
+
+def connect_closure_sync():
+    """
+    Rebuilds the occupation closure table when occupations are saved or deleted
+    through the ORM, once per transaction after it commits. Bulk ingestion must
+    run `build_occupation_closure` afterwards.
+    """
+
+    def handler(sender, using, **kwargs):
+        # The callbacks of rolled back savepoints are discarded by Django, so a
+        # rebuild is pending exactly when it is among the commit callbacks
+        pending = connections[using].run_on_commit
+        if not any(func is rebuild_occupation_closure for _, func, _ in pending):
+            transaction.on_commit(rebuild_occupation_closure, using=using)
+
+    post_save.connect(handler, sender=IscoOccupation, weak=False)
+    post_delete.connect(handler, sender=IscoOccupation, weak=False)
+
+
+def connect_data_version_triggers(app_config):
+    """Installs the data version triggers on the api tables after every migrate."""
+
+    def handler(sender, using, **kwargs):
+        install_data_version_triggers(using)
+
+    post_migrate.connect(handler, sender=app_config, weak=False)
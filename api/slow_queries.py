@@ -0,0 +1,113 @@
+"""
+Slow query log of the API. Queries slower than SLOW_QUERY_MS are aggregated in
+the SlowQuery table by route and filter combination, and a sample of them is
+run again with EXPLAIN (ANALYZE, BUFFERS), within the route's
+STATEMENT_TIMEOUTS. All database work happens in a background thread, outside
+the request.
+"""
+
+import json
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from threading import BoundedSemaphore
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from api.models import SlowQuery
+
+logger = logging.getLogger("api.profiling")
+
+# A single worker, so that the EXPLAIN ANALYZE runs never pile up on the database
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-queries")
+# Requests waiting for the worker, slow queries of further requests are dropped
+pending = BoundedSemaphore(100)
+
+
+def filter_combination(request) -> Dict[str, Any]:
+    """
+    The filters of a request without their values: the number of values of
+    each filter, except for logic and flags whose value is kept.
+    """
+    combination = {}
+    for key, values in request.POST.lists():
+        if key.endswith(("_logic", "_descendants")):
+            combination[key] = values[-1]
+        else:
+            combination[key] = len(values)
+
+    return combination
+
+
+def fingerprint(route: str, combination: Dict[str, Any]) -> str:
+    return sha1(json.dumps([route, combination], sort_keys=True).encode()).hexdigest()
+
+
+def record(route: str, combination: Dict[str, Any], queries: List[Tuple]):
+    """
+    Hands the (sql, params, ms, completed) of a request's slow queries to the
+    worker, completed being false for failed or cancelled statements.
+    """
+    if not pending.acquire(blocking=False):
+        return
+
+    executor.submit(store, route, combination, queries)
+
+
+def store(route: str, combination: Dict[str, Any], queries: List[Tuple]):
+    try:
+        key = fingerprint(route, combination)
+        sql, params, ms, completed = max(queries, key=lambda query: query[2])
+
+        plan = None
+        # A failed or cancelled statement would only fail or be cancelled again
+        if (
+            completed
+            and sql.lstrip().upper().startswith("SELECT")
+            and random.random() < settings.EXPLAIN_SAMPLE_RATE
+        ):
+            try:
+                plan = explain_analyze(sql, params, statement_timeout(route))
+            except Exception:
+                logger.exception("Couldn't explain the slow query of %s", route)
+
+        SlowQuery.objects.get_or_create(
+            fingerprint=key,
+            defaults={"route": route, "filters": combination, "sql": sql},
+        )
+        SlowQuery.objects.filter(fingerprint=key).update(
+            sql=sql,
+            count=F("count") + len(queries),
+            total_ms=F("total_ms") + sum(query[2] for query in queries),
+            max_ms=Greatest("max_ms", ms),
+            last_seen=timezone.now(),
+            **({"plan": plan} if plan else {}),
+        )
+    except Exception:
+        logger.exception("Couldn't store the slow queries of %s", route)
+    finally:
+        connection.close()
+        pending.release()
+
+
+def statement_timeout(route: str) -> int:
+    """The route's STATEMENT_TIMEOUTS, which also limits its EXPLAIN ANALYZE runs."""
+    timeouts = settings.STATEMENT_TIMEOUTS
+    return timeouts.get(route, timeouts["default"])
+
+
+def explain_analyze(sql: str, params, timeout_ms: int) -> str:
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL statement_timeout = %s", [timeout_ms])
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        # EXPLAIN ANALYZE executes the statement, nothing of it is kept
+        transaction.set_rollback(True)
+
+    return plan
@@ -0,0 +1,226 @@
+"""
+Binary snapshot of the taxonomies shared by the API processes. The skills and
+occupations are stored as arrays: their ids, URIs and labels (string tables of
+UTF-8 bytes and offsets) and their children as adjacency lists in CSR form
+(offsets into a flat array of positions). The URIs of children without a row of
+their own follow the rows, without id, label or children, so that they are
+found as descendants like the tables' get_descendants finds them.
+
+The snapshot is a single file, a header listing the arrays followed by the
+arrays themselves, 64-byte aligned. The header also holds the data version of
+the taxonomy tables the snapshot was built from, a snapshot is only used while
+the tables are still at that version. Processes map the file read-only and read
+the arrays as NumPy views of the mapping without copying them, so every worker
+shares the same physical pages (the OS page cache). The build_taxonomy_snapshot
+command writes a new file next to the current one and renames it over it,
+processes see the new inode on their next use and map it in turn.
+"""
+
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from api.helpers import table_version
+from api.metrics import count_cache
+from api.models import *
+
+MAGIC = b"SKLBTAX3"
+ALIGNMENT = 64
+
+# Prefix of the arrays of each taxonomy in the snapshot
+TAXONOMIES = {"skill": EscoSkill, "occupation": IscoOccupation}
+
+
+def string_table(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """The UTF-8 bytes of the strings, concatenated, and the offsets of every string."""
+    encoded = [string.encode() for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def adjacency(lists: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """The offsets and the flat values of lists of positions (CSR)."""
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(values) for values in lists], out=offsets[1:])
+    values = np.fromiter(
+        (value for values in lists for value in values),
+        dtype=np.int32,
+        count=int(offsets[-1]),
+    )
+    return offsets, values
+
+
+def taxonomy_arrays(
+    prefix: str, rows: Iterable[Tuple[int, str, str | None, List[str]]]
+) -> Dict[str, np.ndarray]:
+    """The arrays of a taxonomy from its (id, uri, label, children URIs) rows."""
+    rows = sorted(rows)
+    uris = [uri for _, uri, _, _ in rows]
+    positions = {uri: position for position, uri in enumerate(uris)}
+    for _, _, _, children in rows:
+        for child in children:
+            if child not in positions:
+                positions[child] = len(uris)
+                uris.append(child)
+
+    arrays = {f"{prefix}_ids": np.array([id for id, *_ in rows], dtype=np.int32)}
+    arrays[f"{prefix}_uris"], arrays[f"{prefix}_uri_offsets"] = string_table(uris)
+    arrays[f"{prefix}_labels"], arrays[f"{prefix}_label_offsets"] = string_table(
+        [label or "" for _, _, label, _ in rows] + [""] * (len(uris) - len(rows))
+    )
+    # Positions of the URIs in alphabetical order, for binary searches
+    arrays[f"{prefix}_uri_order"] = np.array(
+        sorted(range(len(uris)), key=uris.__getitem__), dtype=np.int32
+    )
+    arrays[f"{prefix}_children_offsets"], arrays[f"{prefix}_children"] = adjacency(
+        [[positions[child] for child in children] for _, _, _, children in rows]
+        + [[]] * (len(uris) - len(rows))
+    )
+
+    return arrays
+
+
+def taxonomy_version() -> int:
+    """The data version of the taxonomy tables, changed by any write to them."""
+    return table_version(*TAXONOMIES.values())
+
+
+def build_arrays(log: Callable[[str], None] = print) -> Dict[str, np.ndarray]:
+    arrays = {}
+    for prefix, model in TAXONOMIES.items():
+        arrays.update(
+            taxonomy_arrays(
+                prefix, model.objects.values_list("id", "uri", "label", "children")
+            )
+        )
+        log(f"Read {len(arrays[f'{prefix}_ids'])} {model.__name__} rows.")
+
+    return arrays
+
+
+def write_snapshot(path: Path, arrays: Dict[str, np.ndarray], version: int):
+    """
+    Writes the arrays, built from the taxonomy tables at `version`, to a new
+    file and renames it over `path` atomically.
+    """
+    contents, offset = {}, 0
+    for name, array in arrays.items():
+        contents[name] = [array.dtype.str, list(array.shape), offset]
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({"version": version, "arrays": contents}).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temporary, "wb") as file:
+        file.write(MAGIC + len(header).to_bytes(8, "little") + header)
+        for name, array in arrays.items():
+            file.seek(start + contents[name][2])
+            file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate(start + offset)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temporary, path)
+
+
+class TaxonomySnapshot:
+    def __init__(self, path: Path):
+        with open(path, "rb") as file:
+            self.inode = os.fstat(file.fileno()).st_ino
+            # The mapping outlives the file descriptor, and the file once replaced
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} isn't a taxonomy snapshot.")
+        size = int.from_bytes(self.mmap[len(MAGIC) : len(MAGIC) + 8], "little")
+        header = json.loads(self.mmap[len(MAGIC) + 8 : len(MAGIC) + 8 + size])
+        self.version: int = header["version"]
+        start = -(-(len(MAGIC) + 8 + size) // ALIGNMENT) * ALIGNMENT
+
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (dtype, shape, offset) in header["arrays"].items():
+            dtype = np.dtype(dtype)
+            self.arrays[name] = np.frombuffer(
+                self.mmap,
+                dtype=dtype,
+                count=int(np.prod(shape)),
+                offset=start + offset,
+            ).reshape(shape)
+
+    def string(self, prefix: str, table: str, position: int) -> str:
+        values = self.arrays[f"{prefix}_{table}s"]
+        offsets = self.arrays[f"{prefix}_{table}_offsets"]
+        return values[offsets[position] : offsets[position + 1]].tobytes().decode()
+
+    def position(self, prefix: str, uri: str) -> int | None:
+        """The position of a URI (binary search of the alphabetical order), None if unknown."""
+        order = self.arrays[f"{prefix}_uri_order"]
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(prefix, "uri", order[middle]) < uri:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(order) and self.string(prefix, "uri", order[low]) == uri:
+            return int(order[low])
+        return None
+
+    def descendants(self, prefix: str, uris: Iterable[str]) -> List[str]:
+        """The URIs of the descendants of the given URIs, as get_descendants finds them."""
+        offsets = self.arrays[f"{prefix}_children_offsets"]
+        children = self.arrays[f"{prefix}_children"]
+        visited = np.zeros(len(offsets) - 1, dtype=bool)
+
+        frontier = [self.position(prefix, uri) for uri in uris]
+        frontier = [position for position in frontier if position is not None]
+        while frontier:
+            found = np.concatenate(
+                [children[offsets[p] : offsets[p + 1]] for p in frontier]
+            )
+            found = np.unique(found[~visited[found]])
+            visited[found] = True
+            frontier = found.tolist()
+
+        return [self.string(prefix, "uri", p) for p in np.flatnonzero(visited)]
+
+
+_snapshot: TaxonomySnapshot | None = None
+
+
+def taxonomy_snapshot() -> TaxonomySnapshot | None:
+    """
+    The current snapshot, mapped again in this process when the file was
+    replaced. None without a snapshot, or when the taxonomy tables were written
+    since it was built (the callers read the tables instead).
+    """
+    global _snapshot
+    path = Path(settings.TAXONOMY_SNAPSHOT)
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+    if _snapshot is None or _snapshot.inode != inode:
+        count_cache("taxonomy_snapshot", "miss")
+        try:
+            _snapshot = TaxonomySnapshot(path)
+        except ValueError:
+            # A snapshot of an older format, until the command writes a new one
+            return None
+    else:
+        count_cache("taxonomy_snapshot", "hit")
+
+    if _snapshot.version != taxonomy_version():
+        count_cache("taxonomy_snapshot", "stale")
+        return None
+    return _snapshot
@@ -0,0 +1,107 @@
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Generic, Iterable, List, TypeVar
+
+from api.helpers import table_version
+from api.metrics import count_cache
+from api.models import EscoSkill, IscoOccupation
+
+T = TypeVar("T")
+
+# Minimum number of seconds between two reloads caused by unknown URIs or ids
+RELOAD_INTERVAL = 60
+
+
+class UriMap:
+    """
+    Translates the public URIs of a taxonomy model to its internal integer
+    ids and back. The whole map is loaded once per process and reloaded when
+    an unknown URI or id is requested, since the taxonomy only grows on
+    ingestion.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.cache_name = f"{model.__name__}_uris"
+        self._ids: Dict[str, int] | None = None
+        self._uris: Dict[int, str] | None = None
+        self._loaded_at = 0.0
+        self._stale = False
+        self._lock = Lock()
+
+    def load(self):
+        with self._lock:
+            rows = list(self.model.objects.values_list("id", "uri"))
+            self._ids = {uri: id for id, uri in rows}
+            self._uris = {id: uri for id, uri in rows}
+            self._loaded_at = monotonic()
+            self._stale = False
+
+    def reset(self):
+        self._stale = True
+
+    def _ensure(self, missing: bool):
+        if (
+            self._ids is None
+            or self._stale
+            or (missing and monotonic() - self._loaded_at > RELOAD_INTERVAL)
+        ):
+            count_cache(self.cache_name, "miss")
+            self.load()
+        else:
+            count_cache(self.cache_name, "hit")
+
+    def ids(self, uris: Iterable[str] | None) -> List[int]:
+        """
+        Unknown URIs are translated to 0, an id that never exists, so that
+        they match nothing instead of being silently dropped from AND filters.
+        """
+        uris = list(uris or [])
+        self._ensure(self._ids is None or not all(uri in self._ids for uri in uris))
+        ids = self._ids
+        return [ids.get(uri, 0) for uri in uris]
+
+    def uris(self, ids: Iterable[int] | None) -> List[str]:
+        ids = list(ids or [])
+        self._ensure(self._uris is None or not all(id in self._uris for id in ids))
+        uris = self._uris
+        return [uris[id] for id in ids if id in uris]
+
+
+skill_uris = UriMap(EscoSkill)
+occupation_uris = UriMap(IscoOccupation)
+
+
+class ProcessCache(Generic[T]):
+    """
+    A value built from the tables of `models` (e.g the skill extraction
+    automaton from the skill labels) once per process, and built again on the
+    next use after any process or command writes to them (see table_version),
+    or after `reset`.
+    """
+
+    def __init__(self, cache_name: str, build: Callable[[], T], models: List = ()):
+        self.cache_name = cache_name
+        self.build = build
+        self.models = models
+        self._value: T | None = None
+        self._version: int | None = None
+        self._stale = False
+        self._lock = Lock()
+
+    def reset(self):
+        self._stale = True
+
+    def get(self) -> T:
+        version = table_version(*self.models) if self.models else None
+        if self._value is None or self._stale or version != self._version:
+            count_cache(self.cache_name, "miss")
+            with self._lock:
+                self._stale = False
+                # Taken before the build, so that writes during it cause another one
+                self._version = version
+                self._value = self.build()
+        else:
+            count_cache(self.cache_name, "hit")
+
+        return self._value
@@ -1,5 +1,80 @@
-from unittest import TestCase
-from django.test import Client
+import asyncio
+import json
+import re
+from datetime import date
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import monotonic
+from unittest import TestCase, mock
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from prometheus_client import REGISTRY
+
+from api.admin import FILTER_CHOICES_TTL
+from api.classification import OccupationClassifier
+from api.deduplication import (
+    band_hashes,
+    deduplicate,
+    shingles,
+    signatures,
+    similarity,
+)
+from api.extraction import SkillAutomaton
+from api.helpers import get_closure, rebuild_occupation_closure, table_version
+from api.middleware import DataVersionETagMiddleware, set_statement_timeout
+from api.models import (
+    Course,
+    EscoSkill,
+    EscoSkillLabel,
+    IscoOccupation,
+    Job,
+    JobKey,
+    Organization,
+    SlowQuery,
+)
+from api.partitions import partition_name, partitions
+from api.schemas import CourseFilter, JobFilter, LogicEnum, logic_list, logic_search
+from api.semantic import SemanticIndex, build_index
+from api.slow_queries import filter_combination, fingerprint, pending, store
+from api.snapshot import (
+    TaxonomySnapshot,
+    build_arrays,
+    taxonomy_arrays,
+    taxonomy_snapshot,
+    taxonomy_version,
+    write_snapshot,
+)
+from api.taxonomy import ProcessCache
+from api import warmup
+
+# Maximum number of SQL queries and total SQL time (in ms) of a request to each endpoint.
+# A list request takes three queries: the data version of the ETag, the count (or the
+# table's estimate, see api/pagination.py) and the page.
+QUERY_BUDGETS = {
+    ("post", "/api/skills"): (3, 500),
+    ("post", "/api/occupations"): (3, 500),
+    ("post", "/api/projects"): (3, 500),
+    ("post", "/api/organizations"): (3, 500),
+    ("post", "/api/articles"): (3, 500),
+    ("post", "/api/courses"): (3, 500),
+    ("post", "/api/jobs"): (3, 1000),
+    ("post", "/api/profiles"): (3, 1000),
+    ("post", "/api/law-policies"): (3, 500),
+    ("post", "/api/law-publications"): (3, 500),
+    ("get", "/api/skills/search?text=data"): (2, 20),
+    ("get", "/api/occupations/search?text=data"): (2, 20),
+    ("get", "/api/projects/sources"): (2, 1000),
+    ("get", "/api/organizations/sources"): (2, 1000),
+    ("get", "/api/articles/sources"): (2, 1000),
+    ("get", "/api/courses/sources"): (2, 1000),
+    ("get", "/api/jobs/sources"): (2, 1000),
+    ("get", "/api/profiles/sources"): (2, 1000),
+    ("get", "/api/law-policies/sources"): (2, 1000),
+    ("get", "/api/law-publications/sources"): (2, 1000),
+}
 
 
 class JobsTest(TestCase):
@@ -24,6 +99,128 @@ class JobsTest(TestCase):
                 f"Some job didn't include the filtered keyword in its title or description. Job ID: {job['id']}",
             )
 
+    def test_job_partition_pruning(self):
+        # This test checks that a query bounded by upload dates only scans the job
+        # partitions of its months (or the default one for months without partition).
+
+        month = date(2024, 3, 1)
+        names = {partition.name for partition in partitions()}
+        plan = Job.objects.filter(
+            upload_date__gte=month, upload_date__lt=date(2024, 4, 1)
+        ).explain()
+
+        scanned = set(re.findall(r" on (api_job_\w+)", plan))
+        expected = partition_name(month)
+        self.assertEqual(
+            scanned, {expected if expected in names else "api_job_default"}
+        )
+
+    def test_job_key(self):
+        # This test checks that a job can't be inserted twice with the same source id,
+        # even in another month's partition, and that the key of a job follows it
+        # across partitions and is deleted with it.
+
+        job = Job.objects.create(
+            title="Backend engineer",
+            upload_date=date(2024, 3, 1),
+            source="test",
+            source_id="key",
+        )
+
+        try:
+            with self.assertRaises(IntegrityError):
+                Job.objects.create(
+                    title="Backend engineer",
+                    upload_date=date(2024, 5, 1),
+                    source="test",
+                    source_id="key",
+                )
+
+            Job.objects.filter(pk=job.pk).update(upload_date=date(2024, 5, 1))
+            self.assertTrue(JobKey.objects.filter(pk=job.pk, source_id="key").exists())
+        finally:
+            Job.objects.filter(pk=job.pk).delete()
+
+        self.assertFalse(JobKey.objects.filter(pk=job.pk).exists())
+
+    def test_job_duplicates(self):
+        # This test checks that near identical jobs are clustered together by the
+        # deduplication, and that the deduplicate filter returns the first of them, or
+        # the other one when the first is filtered out.
+
+        text = (
+            "We are looking for an experienced backend engineer to build scalable data "
+            "pipelines in Python and Django, working with PostgreSQL and Redis in an "
+            "agile team located in Athens"
+        )
+        jobs = [
+            Job.objects.create(
+                title="Backend engineer",
+                description=description,
+                location="Athens",
+                upload_date=date(2024, 3, 1),
+                source="test",
+                source_id=f"duplicate-{n}",
+            )
+            for n, description in enumerate(
+                [text, text + ". Apply now!", "Chef wanted for a seaside restaurant"]
+            )
+        ]
+        pks = [job.pk for job in jobs]
+
+        try:
+            deduplicate(log=lambda _: None)
+            clusters = dict(
+                Job.objects.filter(pk__in=pks).values_list("pk", "duplicate_cluster")
+            )
+            self.assertEqual(clusters[pks[0]], clusters[pks[1]])
+            self.assertNotEqual(clusters[pks[0]], clusters[pks[2]])
+
+            queryset = Job.objects.filter(pk__in=pks).order_by("pk")
+            found = JobFilter(deduplicate=True).filter(queryset)
+            self.assertEqual([job.pk for job in found], [pks[0], pks[2]])
+
+            found = JobFilter(deduplicate=True, keywords=["apply"]).filter(queryset)
+            self.assertEqual([job.pk for job in found], [pks[1]])
+        finally:
+            Job.objects.filter(pk__in=pks).delete()
+
+    def test_query_guards(self):
+        # This test checks that a keyword query whose page costs too much is rejected
+        # with 400, that an estimated count is flagged, that a cheap unfiltered count is
+        # exact, and that a statement cancelled by the statement timeout is answered with 503.
+
+        data = {"keywords": ["software"]}
+        with override_settings(MAX_QUERY_COSTS={"default": 0.001}):
+            response = self.client.post("/api/jobs", data=data)
+        self.assertEqual(response.status_code, 400, "Expensive page wasn't rejected.")
+
+        with override_settings(COUNT_ESTIMATE_COST=0):
+            response = self.client.post("/api/jobs", data=data)
+        self.assertTrue(response.json()["count_estimated"])
+
+        response = self.client.post("/api/jobs", data=data)
+        self.assertFalse(response.json()["count_estimated"])
+
+        response = self.client.post("/api/jobs")
+        self.assertFalse(response.json()["count_estimated"])
+        self.assertEqual(response.json()["count"], Job.objects.count())
+
+        def sleep(paginator, queryset):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_sleep(1)")
+
+        try:
+            with override_settings(STATEMENT_TIMEOUTS={"default": 1}), mock.patch(
+                "api.pagination.GuardedPageNumberPagination._items_count", sleep
+            ):
+                response = self.client.post("/api/jobs", data={"keywords": ["data"]})
+        finally:
+            set_statement_timeout(0)
+
+        self.assertEqual(response.status_code, 503, "Slow query wasn't cancelled.")
+        self.assertIn("Retry-After", response)
+
     def test_courses_unique_ids(self):
         # This test verifies that the `/api/courses` endpoint returns a list of courses 
         # where each course has a unique ID (i.e., no duplicate courses are present).
@@ -47,6 +244,601 @@ class JobsTest(TestCase):
 
             page += 1
 
+    def test_courses_creation_date(self):
+        # This test checks that the creation date filters of courses bound their
+        # last_updated dates.
+
+        filters = CourseFilter(
+            min_creation_date=date(2024, 1, 1), max_creation_date=date(2024, 12, 31)
+        )
+        sql = str(filters.filter(Course.objects.all()).query)
+        self.assertIn('"api_course"."last_updated" >= 2024-01-01', sql)
+        self.assertIn('"api_course"."last_updated" <= 2024-12-31', sql)
+
+    def test_jobs_not_modified(self):
+        # This test checks that repeating a query with the ETag of its response
+        # gives 304 Not Modified, while a different query or a write in between doesn't.
+
+        response = self.client.post("/api/jobs", data={"keywords": ["software"]})
+        self.assertEqual(response.status_code, 200, "Response wasn't ok.")
+        etag = response["ETag"]
+
+        response = self.client.post("/api/jobs", data={"keywords": ["software"]}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304, "Repeated query wasn't answered with 304.")
+
+        response = self.client.post("/api/jobs", data={"keywords": ["data"]}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200, "Different query was answered with 304.")
+
+        # A write statement, even one changing no row, changes the version
+        Job.objects.filter(pk=0).update(title="")
+        response = self.client.post("/api/jobs", data={"keywords": ["software"]}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200, "Query was answered with 304 after a write.")
+
 
 
         
+
+
+class MetricsTest(TestCase):
+    def test_metrics_token(self):
+        # This test checks that the metrics are only served to requests with the
+        # configured token, and not at all without one.
+
+        client = Client()
+        self.assertEqual(client.get("/metrics").status_code, 404)
+
+        with override_settings(METRICS_TOKEN="secret"):
+            self.assertEqual(client.get("/metrics").status_code, 401)
+            response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+            self.assertEqual(response.status_code, 401)
+
+            response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b"skillab_request_duration_seconds", response.content)
+
+
+class WarmUpTest(TestCase):
+    def tearDown(self):
+        warmup._ready.clear()
+        warmup._seconds = None
+        super().tearDown()
+
+    def test_ready_after_warm_up(self):
+        # This test checks that the readiness probe only answers 200 once the process
+        # has been warmed up.
+
+        step = mock.Mock()
+        client = Client()
+        self.assertEqual(client.get("/ready").status_code, 503)
+
+        with mock.patch.object(
+            warmup, "warm_up_steps", return_value=[("test", step)]
+        ), mock.patch.object(warmup.gc, "freeze") as freeze, mock.patch.object(
+            warmup.connections, "close_all"
+        ) as close_all:
+            warmup.warm_up()
+
+        step.assert_called_once()
+        freeze.assert_called_once()
+        close_all.assert_called_once()
+        response = client.get("/ready")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["ready"])
+
+    def test_warm_up_unrecorded(self):
+        # This test checks that the requests of the warm-up are not recorded in the
+        # metrics, unlike the same requests served afterwards.
+
+        labels = {"route": "get_skills", "method": "POST", "status": "200"}
+
+        def served():
+            sample = "skillab_request_duration_seconds_count"
+            return REGISTRY.get_sample_value(sample, labels) or 0
+
+        before = served()
+        with mock.patch.object(
+            warmup, "warm_up_steps", return_value=[("requests", warmup.run_requests)]
+        ), mock.patch.object(
+            warmup, "WARMUP_REQUESTS", [("post", "/api/skills", {})]
+        ), mock.patch.object(
+            warmup.gc, "freeze"
+        ):
+            warmup.warm_up()
+        self.assertEqual(served(), before)
+
+        Client().post("/api/skills")
+        self.assertEqual(served(), before + 1)
+
+    def test_warm_up_application(self):
+        # This test checks that the application warms up at once when loaded outside
+        # of an event loop, in a thread when loaded in one, and not without WARMUP.
+
+        async def load():
+            warmup.warm_up_application()
+
+        with mock.patch.object(warmup, "warm_up") as warm_up:
+            warmup.warm_up_application()
+            self.assertEqual(warm_up.call_count, 1)
+
+            with mock.patch.object(warmup, "Thread") as thread:
+                asyncio.run(load())
+            thread.assert_called_once_with(
+                target=warm_up, name="warm-up", daemon=True
+            )
+            thread.return_value.start.assert_called_once()
+
+            with override_settings(WARMUP=False):
+                warmup.warm_up_application()
+            self.assertEqual(warm_up.call_count, 1)
+
+
+class HelpersTest(TestCase):
+    def test_closure_depths(self):
+        # This test checks that the closure contains every node itself, its children and
+        # grandchildren with the shortest distance, even when a node is reachable by two paths.
+
+        closure = get_closure({"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []})
+
+        self.assertEqual(closure["a"], {"a": 0, "b": 1, "c": 1, "d": 2})
+        self.assertEqual(closure["d"], {"d": 0})
+
+    def test_closure_rebuild_on_commit(self):
+        # This test checks that saving occupations schedules a single closure rebuild,
+        # run when the transaction commits.
+
+        with transaction.atomic():
+            for uri in ["test://occupation/1", "test://occupation/2"]:
+                IscoOccupation.objects.create(uri=uri, ancestors=[], levels=[], children=[])
+
+            rebuilds = [
+                func
+                for _, func, _ in connection.run_on_commit
+                if func is rebuild_occupation_closure
+            ]
+            self.assertEqual(len(rebuilds), 1)
+            transaction.set_rollback(True)
+
+    def test_keyword_search(self):
+        # This test checks that searching the concatenated fields finds the same jobs as
+        # searching every field separately, with both logics and in any keyword order.
+
+        fields = ["title", "description", "location", "type", "experience_level"]
+        keywords = ["data", "engineer", "a", "%"]
+
+        for logic in LogicEnum:
+            expected = set(Job.objects.filter(logic_list(fields, keywords, logic)))
+            for values in (keywords, keywords[::-1]):
+                self.assertEqual(
+                    expected,
+                    set(Job.objects.filter(logic_search(Job, fields, values, logic))),
+                )
+
+    def test_table_version(self):
+        # This test checks that every write statement bumps the version of the table.
+
+        version = table_version(Organization)
+        try:
+            Organization.objects.create(name="Version", source="test")
+            Organization.objects.filter(source="test").update(city="Athens")
+            self.assertEqual(table_version(Organization), version + 2)
+        finally:
+            Organization.objects.filter(source="test").delete()
+
+
+class ProfilingTest(TestCase):
+    def test_profiling_log(self):
+        # This test checks that the profiling log covers API requests only, without the
+        # values of sensitive form fields, and doesn't explain queries for anonymous users.
+
+        with override_settings(PROFILING=True, SLOW_QUERY_MS=0, DEBUG=False):
+            client = Client()
+            with self.assertLogs("api.profiling", "INFO") as logs:
+                client.post(
+                    "/admin/login/", {"username": "admin", "password": "secret-password"}
+                )
+                client.post(
+                    "/api/jobs",
+                    {"keywords": ["software"], "token": "secret-token"},
+                    HTTP_X_EXPLAIN="1",
+                )
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertNotIn("secret", logs.output[0])
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["path"], "/api/jobs")
+        self.assertTrue(line["slow_queries"])
+        self.assertEqual({query["plan"] for query in line["slow_queries"]}, {None})
+
+
+class SlowQueryTest(TestCase):
+    def test_filter_fingerprint(self):
+        # This test checks that the slow query log groups requests by their filters and
+        # logic, regardless of the filtered values.
+
+        factory = RequestFactory()
+
+        def key(data):
+            return fingerprint("get_jobs", filter_combination(factory.post("/api/jobs", data)))
+
+        first = key({"keywords": ["data", "science"], "keywords_logic": "and"})
+        self.assertEqual(first, key({"keywords": ["web", "design"], "keywords_logic": "and"}))
+        self.assertNotEqual(first, key({"keywords": ["web", "design"], "keywords_logic": "or"}))
+        self.assertNotEqual(first, key({"keywords": ["web"], "keywords_logic": "and"}))
+
+    @override_settings(EXPLAIN_SAMPLE_RATE=1)
+    def test_store_without_plan(self):
+        # This test checks that a cancelled statement is not explained again, and that a
+        # failing EXPLAIN doesn't prevent the slow query from being stored.
+
+        sql = "SELECT 1"
+        try:
+            with mock.patch("api.slow_queries.explain_analyze") as explain:
+                pending.acquire()
+                store("test_cancelled", {}, [(sql, [], 20000.0, False)])
+                explain.assert_not_called()
+
+                explain.side_effect = RuntimeError("canceling statement")
+                pending.acquire()
+                store("test_failed_explain", {}, [(sql, [], 20000.0, True)])
+                explain.assert_called_once_with(sql, [], 15000)
+
+            for route in ["test_cancelled", "test_failed_explain"]:
+                query = SlowQuery.objects.get(route=route)
+                self.assertEqual(query.count, 1)
+                self.assertIsNone(query.plan)
+        finally:
+            SlowQuery.objects.filter(route__startswith="test_").delete()
+
+
+class SkillExtractionTest(TestCase):
+    def test_skill_automaton(self):
+        # This test checks that the extraction automaton finds labels spanning several words
+        # on word boundaries only, and keeps the longest of overlapping mentions.
+
+        automaton = SkillAutomaton(
+            [(1, "Machine learning"), (2, "learning"), (3, "C++"), (4, "he"), (5, "ML")]
+        )
+
+        self.assertEqual(
+            automaton.extract("She knows machine-learning, C++ and the learning of ml."),
+            [1, 3, 2, 5],
+        )
+        self.assertEqual(automaton.extract("Nothing here"), [])
+
+    def test_process_cache_version(self):
+        # This test checks that a taxonomy cache is built again once its table is written
+        # by any process, and only then.
+
+        builds = []
+        cache = ProcessCache(
+            "test", lambda: builds.append(1) or len(builds), [EscoSkillLabel]
+        )
+
+        self.assertEqual(cache.get(), 1)
+        self.assertEqual(cache.get(), 1)
+        EscoSkillLabel.objects.filter(pk=0).update(label="")
+        self.assertEqual(cache.get(), 2)
+
+
+class OccupationClassificationTest(TestCase):
+    def test_occupation_classifier(self):
+        # This test checks that job titles are classified by their most similar occupation
+        # label, ignoring seniority, gender markers and plurals, and that unrelated titles
+        # are left unclassified.
+
+        classifier = OccupationClassifier(
+            [
+                (1, "software developer", True),
+                (2, "software engineer", False),
+                (3, "data scientist", True),
+                (4, "data engineer", False),
+            ]
+        )
+
+        results = classifier.classify_many(
+            ["Senior Software Developers (m/f/d)", "Data Engineer", "Chef", None]
+        )
+        self.assertEqual([r and r.occupation_id for r in results], [1, 4, None, None])
+        self.assertEqual(results[0].similarity, 1.0)
+
+
+class DeduplicationTest(TestCase):
+    def test_job_signatures(self):
+        # This test checks that near identical job texts have similar MinHash signatures
+        # sharing an LSH band, while unrelated texts don't.
+
+        text = (
+            "We are looking for an experienced backend engineer to build scalable data "
+            "pipelines in Python and Django, working with PostgreSQL and Redis in an "
+            "agile team located in Athens"
+        )
+        rows = signatures(
+            [
+                shingles(text),
+                shingles(text + ". Apply now!"),
+                shingles("Chef wanted for a busy seaside restaurant in Crete"),
+                shingles(""),
+            ]
+        )
+        bands = band_hashes(rows)
+
+        self.assertGreaterEqual(similarity(rows[0], rows[1]), 0.8)
+        self.assertTrue(set(bands[0]) & set(bands[1]))
+        self.assertLess(similarity(rows[0], rows[2]), 0.2)
+        self.assertFalse(set(bands[0]) & set(bands[2]))
+
+
+class SemanticSearchTest(TestCase):
+    def test_semantic_index(self):
+        # This test checks that the semantic index ranks the documents sharing words
+        # (or their stems) with the query first, over the IVF lists and over given ids.
+
+        documents = [
+            (1, "Senior Python developer for Django web applications"),
+            (2, "Chef wanted in a seaside restaurant"),
+            (3, "Data scientist with machine learning and statistics"),
+            (4, ""),
+            (5, "Restaurant manager, cooking experience required"),
+        ]
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "index"
+            build_index(path, lambda: iter(documents), batch_size=2, log=lambda _: None)
+            index = SemanticIndex(path)
+
+            vector = index.embed("Python developers")
+            self.assertEqual(index.search(vector, 1)[0][0], 1)
+
+            matches = index.search(index.embed("restaurants"), 5)
+            self.assertEqual({pk for pk, _ in matches[:2]}, {2, 5})
+            self.assertEqual(len(matches), 5)
+
+            matches = index.search(vector, 5, pks=[2, 3, 99])
+            self.assertEqual({pk for pk, _ in matches}, {2, 3})
+
+    def test_semantic_search_etag(self):
+        # This test checks that the ETag of a semantic search changes when its index is
+        # rebuilt, so that clients don't get 304 with the results of the previous index.
+
+        middleware = DataVersionETagMiddleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+
+        with TemporaryDirectory() as directory, override_settings(
+            SEMANTIC_INDEX_DIR=directory
+        ):
+            link = Path(directory) / "article"
+            for name in ("first", "second"):
+                (Path(directory) / name).mkdir()
+
+            link.symlink_to(Path(directory) / "first")
+            path = "/api/search/semantic/articles?text=data"
+            etag = middleware(factory.get(path))["ETag"]
+            response = middleware(factory.get(path, HTTP_IF_NONE_MATCH=etag))
+            self.assertEqual(response.status_code, 304)
+
+            link.unlink()
+            link.symlink_to(Path(directory) / "second")
+            response = middleware(factory.get(path, HTTP_IF_NONE_MATCH=etag))
+            self.assertEqual(response.status_code, 200)
+
+
+class TaxonomySnapshotTest(TestCase):
+    def test_taxonomy_snapshot(self):
+        # This test checks that the mapped snapshot finds the URIs and descendants of
+        # the taxonomy with views of the file, unknown children included as the tables'
+        # propagation finds them, and that a new snapshot replaces it.
+
+        rows = [
+            (3, "c", "C", ["d"]),
+            (1, "a", "Ä", ["b", "c", "unknown"]),
+            (2, "b", None, []),
+            (4, "d", "D", ["b"]),
+        ]
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "taxonomy.snapshot"
+            write_snapshot(path, taxonomy_arrays("skill", rows), 1)
+            snapshot = TaxonomySnapshot(path)
+
+            self.assertFalse(snapshot.arrays["skill_children"].flags.owndata)
+            self.assertEqual(snapshot.position("skill", "d"), 3)
+            self.assertIsNone(snapshot.position("skill", "e"))
+            self.assertEqual(snapshot.string("skill", "label", 0), "Ä")
+            self.assertEqual(
+                snapshot.descendants("skill", ["a"]), ["b", "c", "d", "unknown"]
+            )
+            self.assertEqual(snapshot.descendants("skill", ["c", "e"]), ["b", "d"])
+
+            write_snapshot(path, taxonomy_arrays("skill", rows[:2]), 1)
+            self.assertNotEqual(TaxonomySnapshot(path).inode, snapshot.inode)
+            self.assertEqual(snapshot.descendants("skill", ["c"]), ["b", "d"])
+
+    def test_taxonomy_snapshot_version(self):
+        # This test checks that the snapshot is only used until the taxonomy tables
+        # are written, the propagation then reads the tables.
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "taxonomy.snapshot"
+            write_snapshot(path, build_arrays(log=lambda _: None), taxonomy_version())
+
+            with override_settings(TAXONOMY_SNAPSHOT=path):
+                self.assertIsNotNone(taxonomy_snapshot())
+                EscoSkill.objects.filter(pk=-1).update(label="")
+                self.assertIsNone(taxonomy_snapshot())
+
+                with mock.patch.object(TaxonomySnapshot, "descendants") as descendants:
+                    response = Client().post(
+                        "/api/utility/skills-propagation", {"ids": ["unknown"]}
+                    )
+                self.assertEqual(response.status_code, 200)
+                descendants.assert_not_called()
+
+
+class SkillsTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+    def test_skill_id_round_trip(self):
+        # This test checks that skill IDs are still exposed as ESCO URIs and that
+        # filtering by a returned ID gives back exactly that skill.
+
+        response = self.client.post("/api/skills")
+        self.assertEqual(response.status_code, 200, "Response wasn't ok.")
+
+        skills = response.json()["items"]
+        if not skills:
+            self.skipTest("No skills in the database.")
+
+        skill_id = skills[0]["id"]
+        self.assertTrue(skill_id.startswith("http"), f"Skill ID isn't a URI: {skill_id}")
+
+        response = self.client.post("/api/skills", data={"ids": [skill_id]})
+        self.assertEqual([s["id"] for s in response.json()["items"]], [skill_id])
+
+    def test_skill_label_search(self):
+        # This test checks that the label search finds a skill by a word of its label
+        # typed partially, with the similarity of its best matching label.
+
+        skill = EscoSkill.objects.exclude(label="").exclude(label=None).first()
+        if skill is None:
+            self.skipTest("No skills in the database.")
+
+        text = max(skill.label.split(), key=len)[:6]
+        response = self.client.get("/api/skills/search", {"text": text, "limit": 50})
+        self.assertEqual(response.status_code, 200, "Response wasn't ok.")
+
+        matches = response.json()
+        self.assertIn(skill.uri, [match["id"] for match in matches])
+        similarities = [match["similarity"] for match in matches]
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+
+    def test_skill_level_filters(self):
+        # This test checks that the level columns hold the bounds of the levels lists
+        # and that a skill is found by filters on its lowest and highest levels.
+
+        skill = EscoSkill.objects.exclude(skill_levels=[]).first()
+        if skill is None:
+            self.skipTest("No skills with skill levels in the database.")
+
+        self.assertEqual(
+            (skill.min_skill_level, skill.max_skill_level),
+            (min(skill.skill_levels), max(skill.skill_levels)),
+        )
+
+        response = self.client.post(
+            "/api/skills",
+            data={
+                "ids": [skill.uri],
+                "min_skill_level": min(skill.skill_levels),
+                "max_skill_level": max(skill.skill_levels),
+            },
+        )
+        self.assertEqual([s["id"] for s in response.json()["items"]], [skill.uri])
+
+        response = self.client.post(
+            "/api/skills",
+            data={"ids": [skill.uri], "min_skill_level": max(skill.skill_levels) + 1},
+        )
+        self.assertEqual(response.json()["items"], [])
+
+
+class AdminTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser("admin-test", "admin@example.com")
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.organization = Organization.objects.create(
+            name="Test organization", country="GR", city="Athens", source="test"
+        )
+
+    def tearDown(self):
+        Job.objects.filter(organization=self.organization).delete()
+        Organization.objects.filter(source="test").delete()
+        self.user.delete()
+        super().tearDown()
+
+    def test_organization_changelist(self):
+        # This test checks that the organization changelist finds organizations by
+        # their address, counts the unfiltered table with its estimate, and reads the
+        # country filter choices again only once they expire.
+
+        response = self.client.get("/admin/api/organization/?q=athens")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Test organization", response.content.decode())
+
+        with mock.patch("api.admin.table_rows", return_value=12345):
+            response = self.client.get("/admin/api/organization/")
+        self.assertEqual(response.context["cl"].result_count, 12345)
+
+        distinct = 'SELECT DISTINCT "api_organization"."country"'
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/admin/api/organization/")
+        self.assertFalse(any(distinct in q["sql"] for q in context.captured_queries))
+
+        Organization.objects.create(name="Other", country="CY", source="test")
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/admin/api/organization/")
+        self.assertFalse(any(distinct in q["sql"] for q in context.captured_queries))
+
+        expired = monotonic() + FILTER_CHOICES_TTL + 1
+        with CaptureQueriesContext(connection) as context, mock.patch(
+            "api.admin.monotonic", return_value=expired
+        ):
+            response = self.client.get("/admin/api/organization/")
+        self.assertTrue(any(distinct in q["sql"] for q in context.captured_queries))
+        self.assertIn("?country=CY", response.content.decode())
+
+    def test_organization_change_page(self):
+        # This test checks that the inlines of a change page show their first 50 rows.
+
+        Job.objects.bulk_create(
+            Job(
+                title=f"Job {n}",
+                organization=self.organization,
+                source="test",
+                source_id=f"admin-{n}",
+            )
+            for n in range(60)
+        )
+
+        response = self.client.get(
+            f"/admin/api/organization/{self.organization.pk}/change/"
+        )
+        self.assertEqual(response.status_code, 200)
+        formsets = {
+            inline.formset.model: inline.formset
+            for inline in response.context["inline_admin_formsets"]
+        }
+        self.assertEqual(len(formsets[Job].forms), 50)
+
+
+class QueryBudgetTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+    def assertWithinQueryBudget(self, method, path, max_queries, max_sql_ms):
+        # The first request loads the per process caches (e.g the skill URI map)
+        getattr(self.client, method)(path)
+
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(path)
+
+        self.assertEqual(response.status_code, 200, f"Response wasn't ok for {path}.")
+
+        queries = context.captured_queries
+        sql_ms = sum(float(query["time"]) for query in queries) * 1000
+        self.assertLessEqual(
+            len(queries),
+            max_queries,
+            f"{path} ran {len(queries)} queries:\n" + "\n".join(q["sql"] for q in queries),
+        )
+        self.assertLessEqual(sql_ms, max_sql_ms, f"{path} spent {sql_ms:.0f} ms in SQL.")
+
+    def test_query_budgets(self):
+        # This test checks that a request to each endpoint stays within the number of
+        # queries and the SQL time declared for it in QUERY_BUDGETS.
+
+        for (method, path), (max_queries, max_sql_ms) in QUERY_BUDGETS.items():
+            with self.subTest(path=path):
+                self.assertWithinQueryBudget(method, path, max_queries, max_sql_ms)
@@ -1,32 +1,74 @@
 from typing import List, Dict, Set
 
-from ninja import Router, Form
+from django.db.models import Case, FloatField, Value, When
+from ninja import Router, Form, Query
+from ninja.errors import HttpError
 from ninja.pagination import paginate
 
 from api.schemas import *
 from api.models import *
+from api.classification import occupation_classifier
+from api.extraction import skill_automaton
 from api.helpers import get_descendants
+from api.metrics import track_propagation
+from api.search import best_label_matches
+from api.semantic import semantic_index, semantic_search
+from api.snapshot import taxonomy_snapshot
+from api.taxonomy import skill_uris
 
 
 router = Router()
 
 
 # ---------------------- Skills ----------------------
-@router.post("skills", tags=["Skill"], response=List[EscoSkillSchema])
+@router.post(
+    "skills",
+    tags=["Skill"],
+    response=List[EscoSkillSchema],
+    exclude_unset=True,
+)
 @paginate
-def get_skills(request, filters: EscoSkillFilter = Form(...)):
-    return filters.filter(EscoSkill.objects.all())
+def get_skills(
+    request,
+    filters: EscoSkillFilter = Form(...),
+    projection: EscoSkillProjection = Query(...),
+):
+    return projection.apply(filters.filter(EscoSkill.objects.all()))
+
+
+@router.get("skills/search", tags=["Skill"], response=List[LabelMatchSchema])
+def search_skills(request, query: LabelSearchQuery = Query(...)):
+    return best_label_matches(
+        EscoSkillLabel.objects.all(), "skill", query.text, query.limit
+    )
 
 
 # ---------------------- Occupations ----------------------
-@router.post("occupations", tags=["Occupation"], response=List[IscoOccupationSchema])
+@router.post(
+    "occupations",
+    tags=["Occupation"],
+    response=List[IscoOccupationSchema],
+    exclude_unset=True,
+)
 @paginate
-def get_occupations(request, filters: IscoOccupationFilter = Form(...)):
-    return filters.filter(IscoOccupation.objects.all())
+def get_occupations(
+    request,
+    filters: IscoOccupationFilter = Form(...),
+    projection: IscoOccupationProjection = Query(...),
+):
+    return projection.apply(filters.filter(IscoOccupation.objects.all()))
+
+
+@router.get("occupations/search", tags=["Occupation"], response=List[LabelMatchSchema])
+def search_occupations(request, query: LabelSearchQuery = Query(...)):
+    return best_label_matches(
+        IscoOccupationLabel.objects.all(), "occupation", query.text, query.limit
+    )
 
 
 # ---------------------- Utility ----------------------
 @router.post("utility/skill-back-propagation", tags=["Utility"], response=List[str])
+@track_propagation
 def skill_back_propagation(request, filters: BackPropagationFilter = Form(...)):
     skills = filters.filter(EscoSkill.objects.all())
     backpropagation_set = set()
@@ -43,6 +85,7 @@ def skill_back_propagation(request, filters: BackPropagationFilter = Form(...)):
 @router.post(
     "utility/occupations-back-propagation", tags=["Utility"], response=List[str]
 )
+@track_propagation
 def occupation_back_propagation(request, filters: BackPropagationFilter = Form(...)):
     occupations = filters.filter(IscoOccupation.objects.all())
     backpropagation_set = set()
@@ -53,11 +96,58 @@ def occupation_back_propagation(request, filters: BackPropagationFilter = Form(.
     return list(backpropagation_set)
 
 
+@router.post("utility/skill-extraction", tags=["Utility"], response=List[List[str]])
+def skill_extraction(request, extraction_in: ExtractionIn = Form(...)):
+    # One list of skill IDs per document, in order of appearance
+    automaton = skill_automaton.get()
+    return [
+        skill_uris.uris(automaton.extract(document))
+        for document in extraction_in.documents
+    ]
+
+
+@router.post(
+    "utility/occupation-classification",
+    tags=["Utility"],
+    response=List[LabelMatchSchema | None],
+)
+def occupation_classification(request, classification_in: ClassificationIn = Form(...)):
+    # The best matching occupation of each title, null when none is similar enough
+    classifications = occupation_classifier.get().classify_many(
+        classification_in.titles
+    )
+    occupations = {
+        id: (uri, label)
+        for id, uri, label in IscoOccupation.objects.filter(
+            id__in={c.occupation_id for c in classifications if c}
+        ).values_list("id", "uri", "label")
+    }
+
+    return [
+        (
+            {
+                "id": occupations[c.occupation_id][0],
+                "label": occupations[c.occupation_id][1],
+                "matched_label": c.label,
+                "similarity": c.similarity,
+            }
+            if c and c.occupation_id in occupations
+            else None
+        )
+        for c in classifications
+    ]
+
+
 @router.post("utility/skills-propagation", tags=["Utility"], response=List[str])
+@track_propagation
 def skills_propagation(request, propagation_in: PropagationIn = Form(...)):
-    skills = EscoSkill.objects.all().values("id", "children")
+    snapshot = taxonomy_snapshot()
+    if snapshot is not None:
+        return snapshot.descendants("skill", propagation_in.ids)
+
+    skills = EscoSkill.objects.all().values("uri", "children")
     skill_map: Dict[str, List[str]] = {
-        skill["id"]: skill["children"] for skill in skills
+        skill["uri"]: skill["children"] for skill in skills
     }
     descendant_set: Set[str] = set()
 
@@ -68,10 +158,15 @@ def skills_propagation(request, propagation_in: PropagationIn = Form(...)):
 
 
 @router.post("utility/occupations-propagation", tags=["Utility"], response=List[str])
+@track_propagation
 def occupations_propagation(request, propagation_in: PropagationIn = Form(...)):
-    occupations = IscoOccupation.objects.all().values("id", "children")
+    snapshot = taxonomy_snapshot()
+    if snapshot is not None:
+        return snapshot.descendants("occupation", propagation_in.ids)
+
+    occupations = IscoOccupation.objects.all().values("uri", "children")
     occupation_map: Dict[str, List[str]] = {
-        occupation["id"]: occupation["children"] for occupation in occupations
+        occupation["uri"]: occupation["children"] for occupation in occupations
     }
     descendant_set: Set[str] = set()
 
@@ -82,14 +177,19 @@ def occupations_propagation(request, propagation_in: PropagationIn = Form(...)):
 
 
 # ---------------------- Projects ----------------------
-@router.post("projects", tags=["Project"], response=List[ProjectSchema])
+@router.post(
+    "projects",
+    tags=["Project"],
+    response=List[ProjectSchema],
+    exclude_unset=True,
+)
 @paginate
-def get_projects(request, filters: ProjectFilter = Form(...)):
-    return (
-        filters.filter(Project.objects.all())
-        .prefetch_related("skills", "organizations")
-        .distinct()
-    )
+def get_projects(
+    request,
+    filters: ProjectFilter = Form(...),
+    projection: ProjectProjection = Query(...),
+):
+    return projection.apply(filters.filter(Project.objects.all()))
 
 
 @router.get("projects/sources", tags=["Project"], response=List[str])
@@ -98,14 +198,19 @@ def get_project_sources(request):
 
 
 # ---------------------- Organizations ----------------------
-@router.post("organizations", tags=["Organization"], response=List[OrganizationSchema])
+@router.post(
+    "organizations",
+    tags=["Organization"],
+    response=List[OrganizationSchema],
+    exclude_unset=True,
+)
 @paginate
-def get_organizations(request, filters: OrganizationFilter = Form(...)):
-    return (
-        filters.filter(Organization.objects.all())
-        .prefetch_related("skills", "projects")
-        .distinct()
-    )
+def get_organizations(
+    request,
+    filters: OrganizationFilter = Form(...),
+    projection: OrganizationProjection = Query(...),
+):
+    return projection.apply(filters.filter(Organization.objects.all()))
 
 
 @router.get("organizations/sources", tags=["Organization"], response=List[str])
@@ -114,10 +219,19 @@ def get_organization_sources(request):
 
 
 # ---------------------- Articles ----------------------
-@router.post("articles", tags=["Article"], response=List[ArticleSchema])
+@router.post(
+    "articles",
+    tags=["Article"],
+    response=List[ArticleSchema],
+    exclude_unset=True,
+)
 @paginate
-def get_articles(request, filters: ArticleFilter = Form(...)):
-    return filters.filter(Article.objects.all()).prefetch_related("skills").distinct()
+def get_articles(
+    request,
+    filters: ArticleFilter = Form(...),
+    projection: ArticleProjection = Query(...),
+):
+    return projection.apply(filters.filter(Article.objects.all()))
 
 
 @router.get("articles/sources", tags=["Article"], response=List[str])
@@ -126,10 +240,19 @@ def get_article_sources(request):
 
 
 # ---------------------- Courses ----------------------
-@router.post("courses", tags=["Course"], response=List[CourseSchema])
+@router.post(
+    "courses",
+    tags=["Course"],
+    response=List[CourseSchema],
+    exclude_unset=True,
+)
 @paginate
-def get_courses(request, filters: CourseFilter = Form(...)):
-    return filters.filter(Course.objects.all()).prefetch_related("skills").distinct()
+def get_courses(
+    request,
+    filters: CourseFilter = Form(...),
+    projection: CourseProjection = Query(...),
+):
+    return projection.apply(filters.filter(Course.objects.all()))
 
 
 @router.get("courses/sources", tags=["Course"], response=List[str])
@@ -138,14 +261,19 @@ def get_course_sources(request):
 
 
 # ---------------------- Jobs ----------------------
-@router.post("jobs", tags=["Job"], response=List[JobSchema])
+@router.post(
+    "jobs",
+    tags=["Job"],
+    response=List[JobSchema],
+    exclude_unset=True,
+)
 @paginate
-def get_jobs(request, filters: JobFilter = Form(...)):
-    return (
-        filters.filter(Job.objects.all())
-        .prefetch_related("skills", "occupations")
-        .distinct()
-    )
+def get_jobs(
+    request,
+    filters: JobFilter = Form(...),
+    projection: JobProjection = Query(...),
+):
+    return projection.apply(filters.filter(Job.objects.all()))
 
 
 @router.get("jobs/sources", tags=["Job"], response=List[str])
@@ -154,10 +282,19 @@ def get_job_sources(request):
 
 
 # ---------------------- Profiles ----------------------
-@router.post("profiles", tags=["Profile"], response=List[ProfileSchema])
+@router.post(
+    "profiles",
+    tags=["Profile"],
+    response=List[ProfileSchema],
+    exclude_unset=True,
+)
 @paginate
-def get_profiles(request, filters: ProfileFilter = Form(...)):
-    return filters.filter(Profile.objects.all()).prefetch_related("skills").distinct()
+def get_profiles(
+    request,
+    filters: ProfileFilter = Form(...),
+    projection: ProfileProjection = Query(...),
+):
+    return projection.apply(filters.filter(Profile.objects.all()))
 
 
 @router.get("profiles/sources", tags=["Profile"], response=List[str])
@@ -166,10 +303,19 @@ def get_profile_sources(request):
 
 
 # ---------------------- Law Policies ----------------------
-@router.post("law-policies", tags=["LawPolicy"], response=List[LawPolicySchema])
+@router.post(
+    "law-policies",
+    tags=["LawPolicy"],
+    response=List[LawPolicySchema],
+    exclude_unset=True,
+)
 @paginate
-def get_law_policies(request, filters: LawPolicyFilter = Form(...)):
-    return filters.filter(LawPolicy.objects.all()).prefetch_related("skills").distinct()
+def get_law_policies(
+    request,
+    filters: LawPolicyFilter = Form(...),
+    projection: LawPolicyProjection = Query(...),
+):
+    return projection.apply(filters.filter(LawPolicy.objects.all()))
 
 
 @router.get("law-policies/sources", tags=["LawPolicy"], response=List[str])
@@ -179,17 +325,91 @@ def get_law_policy_sources(request):
 
 # ---------------------- Law Publications ----------------------
 @router.post(
-    "law-publications", tags=["LawPublication"], response=List[LawPublicationSchema]
+    "law-publications",
+    tags=["LawPublication"],
+    response=List[LawPublicationSchema],
+    exclude_unset=True,
 )
 @paginate
-def get_law_publications(request, filters: LawPublicationFilter = Form(...)):
-    return (
-        filters.filter(LawPublication.objects.all())
-        .prefetch_related("skills")
-        .distinct()
-    )
+def get_law_publications(
+    request,
+    filters: LawPublicationFilter = Form(...),
+    projection: LawPublicationProjection = Query(...),
+):
+    return projection.apply(filters.filter(LawPublication.objects.all()))
 
 
 @router.get("law-publications/sources", tags=["LawPublication"], response=List[str])
 def get_law_publication_sources(request):
     return LawPublication.objects.values_list("source", flat=True).distinct()
+
+
+# ---------------------- Semantic search ----------------------
+def semantic_results(model, filters, projection, query: SemanticSearchQuery):
+    index = semantic_index(model)
+    if index is None:
+        raise HttpError(
+            503,
+            f"The semantic index of {model._meta.verbose_name_plural} isn't built yet.",
+        )
+
+    matches = semantic_search(
+        index, filters.filter(model.objects.all()), query.text, query.limit
+    )
+    if not matches:
+        return []
+
+    similarity = Case(
+        *[When(pk=pk, then=Value(score)) for pk, score in matches],
+        output_field=FloatField(),
+    )
+    return (
+        projection.apply(model.objects.filter(pk__in=[pk for pk, _ in matches]))
+        .annotate(similarity=similarity)
+        .order_by("-similarity")
+    )
+
+
+@router.post(
+    "search/semantic/articles",
+    tags=["Article"],
+    response=List[ArticleMatchSchema],
+    exclude_unset=True,
+)
+def semantic_search_articles(
+    request,
+    query: SemanticSearchQuery = Query(...),
+    filters: ArticleFilter = Form(...),
+    projection: ArticleProjection = Query(...),
+):
+    return semantic_results(Article, filters, projection, query)
+
+
+@router.post(
+    "search/semantic/courses",
+    tags=["Course"],
+    response=List[CourseMatchSchema],
+    exclude_unset=True,
+)
+def semantic_search_courses(
+    request,
+    query: SemanticSearchQuery = Query(...),
+    filters: CourseFilter = Form(...),
+    projection: CourseProjection = Query(...),
+):
+    return semantic_results(Course, filters, projection, query)
+
+
+@router.post(
+    "search/semantic/jobs",
+    tags=["Job"],
+    response=List[JobMatchSchema],
+    exclude_unset=True,
+)
+def semantic_search_jobs(
+    request,
+    query: SemanticSearchQuery = Query(...),
+    filters: JobFilter = Form(...),
+    projection: JobProjection = Query(...),
+):
+    return semantic_results(Job, filters, projection, query)
@@ -0,0 +1,148 @@
+"""
+Warm-up of a worker before it takes traffic. The in-process taxonomy caches
+(URI maps, skill automaton, occupation classifier, taxonomy snapshot, semantic
+indexes) are built and a representative request of every list and search
+endpoint is run, so that the first real requests find the caches built and
+Postgres' buffers and catalog caches filled. None of it is recorded in the
+metrics, which are about the traffic.
+
+Started by warm_up_application, from skillab/wsgi.py and skillab/asgi.py, when
+the WARMUP setting is on. Run gunicorn with --preload (e.g `gunicorn --preload
+skillab.wsgi`) so that it's in the master process before the workers are
+forked: the caches are then built once and shared copy-on-write by every
+worker, and gc.freeze() keeps the garbage collector of the workers from writing
+to (and so copying) their pages. Without --preload every worker warms up on its
+own before it serves. An ASGI server that loads the application in its event
+loop (e.g uvicorn) serves meanwhile, the warm-up runs in a thread and /ready
+answers 503 until it's done.
+"""
+
+import asyncio
+import gc
+import logging
+from threading import Event, Thread
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, connection, connections
+from django.http import JsonResponse
+from django.test import Client
+from django.test.utils import override_settings
+
+from api.classification import occupation_classifier
+from api.extraction import skill_automaton
+from api.metrics import unrecorded
+from api.semantic import SEMANTIC_FIELDS, semantic_index
+from api.snapshot import taxonomy_snapshot
+from api.taxonomy import occupation_uris, skill_uris
+
+logger = logging.getLogger("api.tasks")
+
+# (method, path, data) of the requests run by the warm-up, the first page of every
+# list endpoint and the label searches. Not the sources endpoints, whose DISTINCT
+# scans of the largest tables take minutes
+WARMUP_REQUESTS: List[Tuple[str, str, Dict[str, Any]]] = [
+    ("post", "/api/skills", {}),
+    ("post", "/api/occupations", {}),
+    ("post", "/api/projects", {}),
+    ("post", "/api/organizations", {}),
+    ("post", "/api/articles", {}),
+    ("post", "/api/courses", {}),
+    ("post", "/api/jobs", {}),
+    ("post", "/api/profiles", {}),
+    ("post", "/api/law-policies", {}),
+    ("post", "/api/law-publications", {}),
+    ("get", "/api/skills/search", {"text": "data"}),
+    ("get", "/api/occupations/search", {"text": "data"}),
+]
+
+_ready = Event()
+_seconds: float | None = None
+
+
+def warm_up_steps() -> List[Tuple[str, Callable[[], Any]]]:
+    """The (name, function) of every step of the warm-up, in order."""
+    return [
+        ("skill URIs", skill_uris.load),
+        ("occupation URIs", occupation_uris.load),
+        ("skill automaton", skill_automaton.get),
+        ("occupation classifier", occupation_classifier.get),
+        ("taxonomy snapshot", taxonomy_snapshot),
+        *(
+            (
+                f"{model.__name__} semantic index",
+                lambda model=model: semantic_index(model),
+            )
+            for model in SEMANTIC_FIELDS
+        ),
+        ("requests", run_requests),
+    ]
+
+
+def warm_up():
+    global _seconds
+    start = perf_counter()
+
+    with unrecorded():
+        for name, step in warm_up_steps():
+            step_start = perf_counter()
+            try:
+                step()
+            except Exception:
+                # A worker that failed to warm up still serves, cold
+                logger.exception(f"Warm-up of the {name} failed.")
+            else:
+                logger.info(
+                    f"Warmed up the {name} in {perf_counter() - step_start:.1f}s."
+                )
+
+    # Objects created so far are never collected, so forked workers don't touch them
+    gc.freeze()
+    # A connection opened before a fork must not be shared by the workers
+    connections.close_all()
+
+    _seconds = perf_counter() - start
+    _ready.set()
+    logger.info(f"Warm-up done in {_seconds:.1f}s.")
+
+
+def warm_up_application():
+    """Warms up the process loading the WSGI or ASGI application, if WARMUP is on."""
+    if not settings.WARMUP:
+        return
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        warm_up()
+    else:
+        # The ORM can't run in the event loop, which must not be blocked either
+        Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+# The slow query log and the profiling would record the queries of the cold start
+@override_settings(SLOW_QUERY_LOG=False, PROFILING=False)
+def run_requests():
+    # A failed request is logged and the next ones still run
+    client = Client(raise_request_exception=False)
+    for method, path, data in WARMUP_REQUESTS:
+        response = getattr(client, method)(path, data=data)
+        if response.status_code != 200:
+            logger.warning(f"Warm-up request {path} returned {response.status_code}.")
+
+
+def ready(request):
+    """Readiness probe: 200 once this process is warmed up and the database answers."""
+    if settings.WARMUP and not _ready.is_set():
+        return JsonResponse({"ready": False, "detail": "Warming up."}, status=503)
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError:
+        return JsonResponse(
+            {"ready": False, "detail": "The database is unavailable."}, status=503
+        )
+
+    return JsonResponse({"ready": True, "warm_up_seconds": _seconds})
@@ -0,0 +1,9 @@
+"""
+Performance benchmarks of the API.
+
+`data` generates a deterministic synthetic dataset (taxonomies and entities),
+`cases` describes the benchmarked requests of every endpoint and `runner`
+times them. They are used through the `generate_benchmark_data` and
+`run_benchmarks` management commands. `plans` compares the query plans of the
+filters with and without the workload indexes (`explain_filters` command).
+"""
@@ -0,0 +1,134 @@
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple
+
+from django.db.models import Q
+
+from api.models import *
+
+
+class Case(NamedTuple):
+    name: str
+    method: str
+    path: str
+    data: Dict[str, Any] = {}
+
+
+def common_skills(count: int) -> List[str]:
+    """URIs of the skills most common among a sample of jobs."""
+    counter = Counter(
+        skill_id
+        for skill_ids in Job.objects.exclude(skill_ids=[]).values_list(
+            "skill_ids", flat=True
+        )[:1000]
+        for skill_id in skill_ids
+    )
+    ids = [skill_id for skill_id, _ in counter.most_common(count)]
+    uris = dict(EscoSkill.objects.filter(id__in=ids).values_list("id", "uri"))
+    return [uris[id] for id in ids]
+
+
+def common_occupation() -> str | None:
+    return JobOccupation.objects.values_list("occupation__uri", flat=True).first()
+
+
+def root_uri(model) -> str | None:
+    """A taxonomy entry without ancestors, the most expensive to propagate."""
+    field = "skill_ancestors" if model is EscoSkill else "ancestors"
+    return (
+        model.objects.filter(Q(**{field: []}) | Q(**{field: [[]]}))
+        .order_by("id")
+        .values_list("uri", flat=True)
+        .first()
+    )
+
+
+def build_cases() -> List[Case]:
+    """
+    The benchmarked requests, at least one per endpoint. Filter values are
+    picked from the database, so that every filter matches rows.
+    """
+    skills = common_skills(2)
+    occupation = common_occupation()
+    root_skill = root_uri(EscoSkill)
+    root_occupation = root_uri(IscoOccupation)
+
+    cases = [
+        Case("skills", "post", "/api/skills"),
+        Case("skills_keyword", "post", "/api/skills", {"keywords": ["data"]}),
+        Case("skills_ids", "post", "/api/skills", {"ids": skills}),
+        Case("occupations", "post", "/api/occupations"),
+        Case("occupations_keyword", "post", "/api/occupations", {"keywords": ["data"]}),
+        Case(
+            "skill_back_propagation",
+            "post",
+            "/api/utility/skill-back-propagation",
+            {"ids": skills},
+        ),
+        Case(
+            "occupation_back_propagation",
+            "post",
+            "/api/utility/occupations-back-propagation",
+            {"ids": [occupation]},
+        ),
+        Case(
+            "skills_propagation",
+            "post",
+            "/api/utility/skills-propagation",
+            {"ids": [root_skill]},
+        ),
+        Case(
+            "occupations_propagation",
+            "post",
+            "/api/utility/occupations-propagation",
+            {"ids": [root_occupation]},
+        ),
+    ]
+
+    for path in [
+        "projects",
+        "organizations",
+        "articles",
+        "courses",
+        "jobs",
+        "profiles",
+        "law-policies",
+        "law-publications",
+    ]:
+        name = path.replace("-", "_")
+        cases += [
+            Case(name, "post", f"/api/{path}"),
+            Case(f"{name}_keyword", "post", f"/api/{path}", {"keywords": ["data"]}),
+            Case(f"{name}_skills_or", "post", f"/api/{path}", {"skill_ids": skills}),
+            Case(
+                f"{name}_skills_and",
+                "post",
+                f"/api/{path}",
+                {"skill_ids": skills, "skill_ids_logic": "and"},
+            ),
+            Case(f"{name}_sources", "get", f"/api/{path}/sources"),
+        ]
+
+    cases += [
+        Case("jobs_page_10", "post", "/api/jobs?page=10"),
+        Case("jobs_fields", "post", "/api/jobs?fields=id&fields=title&fields=skills"),
+        Case("jobs_occupation", "post", "/api/jobs", {"occupation_ids": [occupation]}),
+        Case(
+            "jobs_occupation_descendants",
+            "post",
+            "/api/jobs",
+            {"occupation_ids": [root_occupation], "occupation_ids_descendants": True},
+        ),
+        Case(
+            "organizations_projects",
+            "post",
+            "/api/organizations",
+            {"projects": list(Project.objects.values_list("id", flat=True)[:3])},
+        ),
+    ]
+
+    # Without data to pick filter values from, the filtered cases are skipped
+    return [
+        case
+        for case in cases
+        if all(value not in (None, [], [None]) for value in case.data.values())
+    ]
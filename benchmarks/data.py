@@ -0,0 +1,474 @@
+from datetime import date, timedelta
+from itertools import accumulate
+from random import Random
+from typing import Callable, Dict, List
+
+from django.db import transaction
+
+from api.helpers import (
+    SKILL_ENTITY_MODELS,
+    rebuild_occupation_closure,
+    sync_labels,
+    sync_levels,
+    sync_skill_ids,
+)
+from api.models import *
+from api.partitions import create_partitions, default_partition_months
+
+# Value of `source` for every synthetic entity, so that they can be told apart and removed
+SOURCE = "synthetic"
+SKILL_URI = "http://synthetic.skillab/skill/"
+OCCUPATION_URI = "http://synthetic.skillab/occupation/"
+
+# Row counts at scale 1
+SIZES = {
+    "skills": 4000,
+    "occupations": 3000,
+    "organizations": 5000,
+    "projects": 5000,
+    "articles": 10000,
+    "courses": 10000,
+    "jobs": 100000,
+    "profiles": 50000,
+    "law_policies": 2000,
+    "law_publications": 2000,
+}
+
+# Mean number of skills linked to a row of each entity
+SKILLS_PER_ROW = {
+    Project: 8,
+    Organization: 15,
+    Article: 6,
+    Course: 10,
+    Job: 12,
+    Profile: 20,
+    LawPolicy: 5,
+    LawPublication: 5,
+}
+
+# Share of the skills of each ESCO pillar
+PILLARS = [("skill", 0.6), ("knowledge", 0.3), ("language", 0.1)]
+
+# Children per group on the four ISCO levels (major, sub-major, minor and unit groups)
+ISCO_BRANCHING = [10, 4, 3, 4]
+
+BATCH_SIZE = 5000
+
+WORDS = (
+    "software data engineer developer analyst manager project research system "
+    "network cloud security design product quality test service customer sales "
+    "marketing finance account health care nurse teacher education training "
+    "science machine learning model web mobile application database support "
+    "operations logistics supply chain construction electrical mechanical civil "
+    "energy environment policy law legal public administration communication "
+    "language english french german greek spanish team leadership planning "
+    "budget risk compliance audit process improvement digital transformation "
+    "platform infrastructure integration automation robotics manufacturing "
+    "production maintenance repair technician assistant consultant specialist"
+).split()
+
+CITIES = [
+    "Athens",
+    "Thessaloniki",
+    "Berlin",
+    "Paris",
+    "Madrid",
+    "Rome",
+    "Vienna",
+    "Brussels",
+    "Amsterdam",
+    "Lisbon",
+]
+
+EXPERIENCE_LEVELS = ["Entry level", "Mid-Senior level", "Director", "Internship"]
+JOB_TYPES = ["Full-time", "Part-time", "Contract", "Temporary"]
+
+
+def clear():
+    """
+    Removes every synthetic entity and taxonomy entry. The rows are deleted
+    with raw DELETEs, children first, since a regular delete would send the
+    skill link signals (and resync skill_ids) once per link row.
+    """
+    entities = [
+        Article,
+        Job,
+        Course,
+        Profile,
+        LawPolicy,
+        LawPublication,
+        Project,
+        Organization,
+    ]
+    links = [model.skills.field for model in entities] + [
+        JobOccupation._meta.get_field("job"),
+        JobSignature._meta.get_field("job"),
+        ProjectOrganization._meta.get_field("project"),
+        ProjectOrganization._meta.get_field("organization"),
+    ]
+
+    with transaction.atomic():
+        for field in links:
+            queryset = field.model.objects.filter(**{f"{field.name}__source": SOURCE})
+            queryset._raw_delete(queryset.db)
+
+        for model in entities:
+            queryset = model.objects.filter(source=SOURCE)
+            queryset._raw_delete(queryset.db)
+
+        IscoOccupationClosure.objects.all()._raw_delete("default")
+        for model, prefix in [(EscoSkill, SKILL_URI), (IscoOccupation, OCCUPATION_URI)]:
+            field = model.search_labels.field
+            queryset = field.model.objects.filter(
+                **{f"{field.name}__uri__startswith": prefix}
+            )
+            queryset._raw_delete(queryset.db)
+
+            queryset = model.objects.filter(uri__startswith=prefix)
+            queryset._raw_delete(queryset.db)
+
+    rebuild_occupation_closure()
+
+
+def exists() -> bool:
+    return EscoSkill.objects.filter(uri__startswith=SKILL_URI).exists()
+
+
+class Generator:
+    """
+    Generates a deterministic synthetic dataset: a skill hierarchy with the
+    ESCO pillars, an ISCO occupation hierarchy and entities whose skills follow
+    a Zipf distribution (few very common skills, a long tail of rare ones).
+    Every row count is multiplied by `scale`.
+    """
+
+    def __init__(self, scale: float = 1.0, seed: int = 0, log: Callable = print):
+        self.scale = scale
+        self.random = Random(seed)
+        self.log = log
+
+        self.skill_ids: List[int] = []
+        self.skill_weights: List[float] = []
+        self.occupation_ids: List[int] = []
+        self.occupation_weights: List[float] = []
+        self.organization_ids: List[int] = []
+        self.project_ids: List[int] = []
+
+    def size(self, name: str) -> int:
+        return max(1, int(SIZES[name] * self.scale))
+
+    def words(self, mean: int) -> str:
+        count = max(1, int(self.random.gauss(mean, mean / 3)))
+        return " ".join(self.random.choices(WORDS, k=count))
+
+    def day(self) -> date:
+        return date(2025, 1, 1) - timedelta(days=self.random.randrange(3 * 365))
+
+    def zipf(self, ids: List[int], weights: List[float], mean: int) -> List[int]:
+        count = min(len(ids), 1 + int(self.random.expovariate(1 / mean)))
+        return sorted(set(self.random.choices(ids, cum_weights=weights, k=count)))
+
+    def generate(self):
+        self.generate_skills()
+        self.generate_occupations()
+
+        self.organization_ids = self.generate_entities(
+            Organization,
+            self.size("organizations"),
+            lambda i: Organization(
+                name=f"{self.words(2).title()} {self.random.choice(['S.A.', 'Ltd', 'GmbH'])}",
+                description=self.words(80),
+                country="GR",
+                city=self.random.choice(CITIES),
+                source=SOURCE,
+                source_id=str(i),
+            ),
+        )
+        self.project_ids = self.generate_entities(
+            Project,
+            self.size("projects"),
+            lambda i: Project(
+                title=self.words(8).capitalize(),
+                objective=self.words(150),
+                start_date=self.day(),
+                total_cost=self.random.randrange(10_000, 5_000_000),
+                source=SOURCE,
+                source_id=str(i),
+            ),
+        )
+        self.generate_project_organizations()
+        self.generate_entities(
+            Article,
+            self.size("articles"),
+            lambda i: Article(
+                title=self.words(10).capitalize(),
+                summary=self.words(200),
+                authors=self.words(4).title(),
+                publication_date=self.day(),
+                project_id=self.random.choice(self.project_ids),
+                source=SOURCE,
+                source_id=str(i),
+            ),
+        )
+        self.generate_entities(
+            Course,
+            self.size("courses"),
+            lambda i: Course(
+                title=self.words(6).capitalize(),
+                description=self.words(150),
+                rating=round(self.random.uniform(1, 5), 1),
+                price=self.random.choice([None, 9.99, 49.99, 199.0]),
+                last_updated=self.day(),
+                url=f"https://courses.synthetic.skillab/{i}",
+                source=SOURCE,
+                source_id=str(i),
+            ),
+        )
+        self.generate_entities(
+            Job,
+            self.size("jobs"),
+            lambda i: Job(
+                title=self.words(4).capitalize(),
+                description=self.words(300),
+                experience_level=self.random.choice(EXPERIENCE_LEVELS),
+                type=self.random.choice(JOB_TYPES),
+                location=self.random.choice(CITIES),
+                upload_date=self.day(),
+                organization_id=(
+                    self.random.choice(self.organization_ids)
+                    if self.random.random() < 0.7
+                    else None
+                ),
+                source=SOURCE,
+                source_id=str(i),
+            ),
+            self.link_job_occupations,
+        )
+        # Months without a partition yet were stored in the default one
+        create_partitions(default_partition_months())
+        self.generate_entities(
+            Profile,
+            self.size("profiles"),
+            lambda i: Profile(
+                full_name=self.words(2).title(),
+                location=self.random.choice(CITIES),
+                content=self.words(250),
+                occupation=self.words(3),
+                source=SOURCE,
+                source_id=str(i),
+            ),
+        )
+        self.generate_entities(
+            LawPolicy,
+            self.size("law_policies"),
+            lambda i: LawPolicy(
+                title=self.words(10).capitalize(),
+                summary=self.words(200),
+                publication_date=self.day(),
+                page_count=self.random.randrange(5, 300),
+                source=SOURCE,
+                source_id=str(i),
+            ),
+        )
+        self.generate_entities(
+            LawPublication,
+            self.size("law_publications"),
+            lambda i: LawPublication(
+                title=self.words(10).capitalize(),
+                summary=self.words(200),
+                publication_date=self.day(),
+                source=SOURCE,
+                source_id=str(i),
+            ),
+        )
+
+        for model in SKILL_ENTITY_MODELS:
+            sync_skill_ids(model, model.objects.filter(source=SOURCE).values("pk"))
+        self.log("Synced skill_ids.")
+
+        self.log(f"Built {rebuild_occupation_closure()} occupation closure rows.")
+
+        for model, prefix in [(EscoSkill, SKILL_URI), (IscoOccupation, OCCUPATION_URI)]:
+            pks = model.objects.filter(uri__startswith=prefix).values("pk")
+            self.log(f"Stored {sync_labels(model, pks)} {model.__name__} labels.")
+            self.log(
+                f"Synced the levels of {sync_levels(model, pks)} {model.__name__} rows."
+            )
+
+    def generate_skills(self):
+        skills: List[EscoSkill] = []
+
+        for pillar, share in PILLARS:
+            count = max(1, int(self.size("skills") * share))
+            # (uri, paths) of the pillar's skills, a path is the list of ancestors from the root
+            nodes = []
+
+            for i in range(count):
+                uri = f"{SKILL_URI}{pillar}/{i}"
+                paths = [[]]
+                # The first skills of each pillar are its roots, the rest hang under
+                # an earlier skill, a few of them under two (ESCO is a polyhierarchy)
+                if i >= 10:
+                    parents = {self.random.randrange(i)}
+                    if self.random.random() < 0.1:
+                        parents.add(self.random.randrange(i))
+                    paths = [
+                        nodes[p][1][0] + [nodes[p][0]]
+                        for p in parents
+                        if len(nodes[p][1][0]) < 5
+                    ] or paths
+                nodes.append((uri, paths))
+
+            children: Dict[str, List[str]] = {uri: [] for uri, _ in nodes}
+            for uri, paths in nodes:
+                for path in paths:
+                    if path:
+                        children[path[-1]].append(uri)
+
+            for uri, paths in nodes:
+                levels = sorted(len(path) for path in paths)
+                pillar_fields = {
+                    f"{name}_{kind}": []
+                    for name in ("knowledge", "language", "skill")
+                    for kind in ("ancestors", "levels")
+                }
+                pillar_fields[f"{pillar}_ancestors"] = paths
+                pillar_fields[f"{pillar}_levels"] = levels
+
+                skills.append(
+                    EscoSkill(
+                        uri=uri,
+                        label=self.words(3),
+                        alternative_labels=[self.words(3) for _ in range(2)],
+                        description=self.words(30),
+                        traversal_ancestors=paths,
+                        traversal_levels=levels,
+                        children=children[uri],
+                        **pillar_fields,
+                    )
+                )
+
+        self.random.shuffle(skills)
+        EscoSkill.objects.bulk_create(skills, batch_size=BATCH_SIZE)
+
+        self.skill_ids = [skill.id for skill in skills]
+        self.skill_weights = list(
+            accumulate(1 / rank for rank in range(1, len(skills) + 1))
+        )
+        self.log(f"Created {len(skills)} skills.")
+
+    def generate_occupations(self):
+        # (uri, path) of the ISCO groups and ESCO occupations
+        nodes = []
+        level = [(None, [])]
+
+        for branching in ISCO_BRANCHING:
+            next_level = []
+            for parent, path in level:
+                for _ in range(branching):
+                    uri = f"{OCCUPATION_URI}{len(nodes)}"
+                    node_path = path + [parent] if parent else []
+                    nodes.append((uri, node_path))
+                    next_level.append((uri, node_path))
+            level = next_level
+
+        # ESCO occupations go under the unit groups, a fifth of them under another occupation
+        esco_uris = []
+        paths = dict(nodes)
+        for _ in range(max(0, self.size("occupations") - len(nodes))):
+            if esco_uris and self.random.random() < 0.2:
+                parent = self.random.choice(esco_uris)
+            else:
+                parent = self.random.choice(level)[0]
+            uri = f"{OCCUPATION_URI}{len(nodes)}"
+            paths[uri] = paths[parent] + [parent]
+            nodes.append((uri, paths[uri]))
+            esco_uris.append(uri)
+
+        children: Dict[str, List[str]] = {uri: [] for uri, _ in nodes}
+        for uri, path in nodes:
+            if path:
+                children[path[-1]].append(uri)
+
+        occupations = [
+            IscoOccupation(
+                uri=uri,
+                label=self.words(3),
+                alternative_labels=[self.words(3)],
+                description=self.words(30),
+                ancestors=[path],
+                levels=[len(path) + 1],
+                children=children[uri],
+            )
+            for uri, path in nodes
+        ]
+        IscoOccupation.objects.bulk_create(occupations, batch_size=BATCH_SIZE)
+
+        # Jobs are classified to ESCO occupations, or to unit groups when there are none
+        esco_uris = set(esco_uris or (uri for uri, _ in level))
+        self.occupation_ids = [
+            occupation.id for occupation in occupations if occupation.uri in esco_uris
+        ]
+        self.random.shuffle(self.occupation_ids)
+        self.occupation_weights = list(
+            accumulate(1 / rank for rank in range(1, len(self.occupation_ids) + 1))
+        )
+        self.log(f"Created {len(occupations)} occupations.")
+
+    def generate_entities(self, model, count: int, build: Callable, link=None):
+        """Creates `count` rows of `model` and their skill links in batches."""
+        link_field = model.skills.field
+        ids = []
+
+        for start in range(0, count, BATCH_SIZE):
+            with transaction.atomic():
+                rows = model.objects.bulk_create(
+                    [build(i) for i in range(start, min(count, start + BATCH_SIZE))]
+                )
+                link_field.model.objects.bulk_create(
+                    [
+                        link_field.model(**{link_field.name: row}, skill_id=skill_id)
+                        for row in rows
+                        for skill_id in self.zipf(
+                            self.skill_ids, self.skill_weights, SKILLS_PER_ROW[model]
+                        )
+                    ],
+                    batch_size=BATCH_SIZE,
+                )
+                if link:
+                    link(rows)
+
+            ids.extend(row.id for row in rows)
+
+        self.log(f"Created {count} {model.__name__} rows.")
+        return ids
+
+    def generate_project_organizations(self):
+        ProjectOrganization.objects.bulk_create(
+            [
+                ProjectOrganization(
+                    project_id=project_id,
+                    organization_id=organization_id,
+                    role="participant",
+                )
+                for project_id in self.project_ids
+                for organization_id in set(
+                    self.random.choices(
+                        self.organization_ids, k=self.random.randint(1, 5)
+                    )
+                )
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    def link_job_occupations(self, jobs: List[Job]):
+        JobOccupation.objects.bulk_create(
+            [
+                JobOccupation(job=job, occupation_id=occupation_id)
+                for job in jobs
+                for occupation_id in self.zipf(
+                    self.occupation_ids, self.occupation_weights, 1
+                )
+            ],
+            batch_size=BATCH_SIZE,
+        )
@@ -0,0 +1,199 @@
+"""
+Query plans of the list filters and link table lookups, with and without the
+indexes of the workload migrations. The "before" plans are taken in a rolled
+back transaction where those indexes are dropped and the foreign key indexes
+they replaced are rebuilt, so it holds exclusive locks on the tables: run it
+against a benchmark database only.
+"""
+
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.operations import AddIndex, AlterField
+from django.db.models import QuerySet
+
+from api import schemas
+from api.helpers import SKILL_ENTITY_MODELS
+from api.models import *
+from benchmarks.runner import git_commit
+
+# Migrations whose indexes are compared
+WORKLOAD_MIGRATIONS = [("api", "0014_link_indexes"), ("api", "0015_filter_indexes")]
+
+
+class PlanCase(NamedTuple):
+    name: str
+    queryset: QuerySet
+
+
+def filter_value(model, column: str, lookup: str) -> Any:
+    """A selective value of a filter: the 90th (10th) percentile of a range, the rarest value of a list."""
+    table = model._meta.db_table
+    column = model._meta.get_field(column).column
+    with connection.cursor() as cursor:
+        if lookup in ("gte", "lte"):
+            cursor.execute(
+                f'SELECT percentile_disc(%s) WITHIN GROUP (ORDER BY "{column}") '
+                f'FROM "{table}"',
+                [0.9 if lookup == "gte" else 0.1],
+            )
+            value = cursor.fetchone()[0]
+        else:
+            cursor.execute(
+                f'SELECT "{column}" FROM "{table}" WHERE "{column}" IS NOT NULL '
+                "GROUP BY 1 ORDER BY COUNT(*), 1 LIMIT 1"
+            )
+            row = cursor.fetchone()
+            value = row and [row[0]]
+
+    return value
+
+
+def build_plan_cases() -> List[PlanCase]:
+    """
+    A case per column filter of every list endpoint, one per source and date
+    filter pair, and the lookup of the rows linked to a skill (or an
+    occupation, an organization) in every link table.
+    """
+    cases = []
+    for model in SKILL_ENTITY_MODELS:
+        filter_schema = getattr(schemas, f"{model.__name__}Filter")
+        values = {}
+        for name, field in filter_schema.model_fields.items():
+            q = (field.json_schema_extra or {}).get("q")
+            if not isinstance(q, str) or q.startswith("id__"):
+                continue
+
+            column, lookup = q.rsplit("__", 1)
+            value = filter_value(model, column, lookup)
+            if value is not None:
+                values[name] = value
+
+        entity = model._meta.verbose_name.replace(" ", "_")
+        for name, value in values.items():
+            filters = filter_schema(**{name: value})
+            cases.append(
+                PlanCase(f"{entity}.{name}", filters.filter(model.objects.all()))
+            )
+
+        dates = [name for name in values if name.startswith("min_") and "date" in name]
+        if "sources" in values and dates:
+            filters = filter_schema(
+                sources=values["sources"], **{dates[0]: values[dates[0]]}
+            )
+            cases.append(
+                PlanCase(
+                    f"{entity}.sources+{dates[0]}", filters.filter(model.objects.all())
+                )
+            )
+
+    links = [model.skills.field for model in SKILL_ENTITY_MODELS] + [
+        JobOccupation._meta.get_field("job"),
+        ProjectOrganization._meta.get_field("project"),
+    ]
+    for field in links:
+        link = field.model
+        other = next(
+            f for f in link._meta.get_fields() if f.many_to_one and f is not field
+        )
+        value = link.objects.values_list(other.attname, flat=True).first()
+        if value is not None:
+            cases.append(
+                PlanCase(
+                    f"{link._meta.model_name}.by_{other.name}",
+                    link.objects.filter(**{other.attname: value}).values(field.attname),
+                )
+            )
+
+    return cases
+
+
+def workload_indexes() -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    The names of the indexes added by the workload migrations and the (table,
+    column) of the foreign key indexes they dropped.
+    """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    added, dropped = [], []
+    for key in WORKLOAD_MIGRATIONS:
+        for operation in loader.disk_migrations[key].operations:
+            if isinstance(operation, AddIndex):
+                added.append(operation.index.name)
+            elif isinstance(operation, AlterField) and not operation.field.db_index:
+                model = apps.get_model(key[0], operation.model_name)
+                field = model._meta.get_field(operation.name)
+                dropped.append((model._meta.db_table, field.column))
+
+    return added, dropped
+
+
+def scans(node: Dict[str, Any]) -> List[str]:
+    """The scan nodes of a JSON plan, e.g "Bitmap Index Scan on job_source_date"."""
+    found = []
+    if "Relation Name" in node or "Index Name" in node:
+        found.append(
+            f"{node['Node Type']} on {node.get('Index Name') or node['Relation Name']}"
+        )
+    for child in node.get("Plans", []):
+        found += scans(child)
+    return found
+
+
+def summary(scans: List[str]) -> str:
+    """The distinct scans of a plan, counting the alike scans of partitions."""
+    counts = Counter(re.sub(r"_\d{4}_\d{2}(?=\b|_)", "_*", scan) for scan in scans)
+    return ", ".join(
+        scan if count == 1 else f"{scan} (x{count})" for scan, count in counts.items()
+    )
+
+
+def explain(queryset: QuerySet) -> Dict[str, Any]:
+    plan = json.loads(queryset.explain(format="json", analyze=True, buffers=True))[0]
+    return {
+        "ms": plan["Execution Time"],
+        "buffers": plan["Plan"].get("Shared Hit Blocks", 0)
+        + plan["Plan"].get("Shared Read Blocks", 0),
+        "scans": scans(plan["Plan"]),
+    }
+
+
+def run(cases: List[PlanCase], log=print) -> Dict[str, Any]:
+    added, dropped = workload_indexes()
+    tables = {case.queryset.model._meta.db_table for case in cases}
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f'ANALYZE "{table}"')
+
+    before = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name in added:
+                cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+            for table, column in dropped:
+                cursor.execute(f'CREATE INDEX ON "{table}" ("{column}")')
+        for case in cases:
+            before[case.name] = explain(case.queryset)
+        transaction.set_rollback(True)
+
+    results = []
+    for case in cases:
+        after = explain(case.queryset)
+        log(
+            f"{case.name:<44} {before[case.name]['ms']:9.1f} ms -> {after['ms']:9.1f} ms  "
+            f"{summary(after['scans'])}"
+        )
+        results.append({"name": case.name, "before": before[case.name], "after": after})
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "added_indexes": added,
+        "dropped_indexes": [f"{table}.{column}" for table, column in dropped],
+        "results": results,
+    }
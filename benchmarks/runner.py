@@ -0,0 +1,117 @@
+import json
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from api.helpers import SKILL_ENTITY_MODELS
+from benchmarks.cases import Case
+
+RESULTS_DIR = settings.BASE_DIR / "benchmarks" / "results"
+
+
+def count_rows(body: Any) -> int:
+    if isinstance(body, dict) and "items" in body:
+        return len(body["items"])
+    if isinstance(body, list):
+        return len(body)
+    return 1
+
+
+def percentile(timings: List[float], percent: int) -> float:
+    if len(timings) == 1:
+        return timings[0]
+    return quantiles(timings, n=100, method="inclusive")[percent - 1]
+
+
+def run_case(client: Client, case: Case, repeat: int, warmup: int) -> Dict[str, Any]:
+    """Times `repeat` requests of the case, after `warmup` untimed ones."""
+    request = getattr(client, case.method)
+
+    for _ in range(warmup):
+        request(case.path, data=case.data)
+
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = perf_counter()
+            response = request(case.path, data=case.data)
+            timings.append(perf_counter() - start)
+
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"{case.name} returned {response.status_code}: {response.content[:500]}"
+            )
+
+    rows = count_rows(response.json())
+    mean_seconds = mean(timings)
+
+    return {
+        "name": case.name,
+        "method": case.method.upper(),
+        "path": case.path,
+        "data": case.data,
+        "mean_ms": mean_seconds * 1000,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "max_ms": max(timings) * 1000,
+        "queries": len(context.captured_queries),
+        "rows": rows,
+        "rows_per_sec": rows / mean_seconds,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(cases: List[Case], repeat: int, warmup: int, log=print) -> Dict[str, Any]:
+    client = Client()
+    results = []
+
+    for case in cases:
+        result = run_case(client, case, repeat, warmup)
+        log(
+            f"{case.name:<36} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms"
+            f"  {result['queries']:3} queries  {result['rows_per_sec']:10.0f} rows/s"
+        )
+        results.append(result)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "repeat": repeat,
+        "warmup": warmup,
+        "rows": {
+            model.__name__: model.objects.count() for model in SKILL_ENTITY_MODELS
+        },
+        "results": results,
+    }
+
+
+def save(report: Dict[str, Any], path: Path | None = None) -> Path:
+    if path is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+
+    return path
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillab.settings')
 
 application = get_asgi_application()
+
+# Before the workers are forked with gunicorn's --preload, in a thread when the
+# server loads the application in its event loop (see api/warmup.py)
+from api.warmup import warm_up_application  # noqa: E402
+
+warm_up_application()
@@ -10,6 +10,14 @@ SECRET_KEY = CONFIG["SECRET"]
 
 DEBUG = CONFIG["DEBUG"] == "1"
 
+# Request timings as Server-Timing headers and in the api.profiling log
+PROFILING = CONFIG.get("PROFILING") == "1"
+# Queries slower than this (in ms) are logged when profiling and kept in the slow query log
+SLOW_QUERY_MS = float(CONFIG.get("SLOW_QUERY_MS") or 200)
+SLOW_QUERY_LOG = CONFIG.get("SLOW_QUERY_LOG", "1") == "1"
+# Share of the slow queries that are run again with EXPLAIN ANALYZE
+EXPLAIN_SAMPLE_RATE = float(CONFIG.get("EXPLAIN_SAMPLE_RATE") or 0.1)
+
 ALLOWED_HOSTS = ["*"]  # It's after a reverse proxy so it's safe to have it as *
 CORS_ALLOW_ALL_ORIGINS = True
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -22,15 +30,20 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "corsheaders"
+    "corsheaders",
 ]
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.common.CommonMiddleware",
+    "api.middleware.MetricsMiddleware",
+    "api.middleware.ProfilingMiddleware",
+    "api.middleware.SlowQueryMiddleware",
+    "api.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "api.middleware.DataVersionETagMiddleware",
+    "api.middleware.StatementTimeoutMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -147,6 +160,11 @@ LOGGING = {
             "level": "INFO",
             "propagate": False,
         },
+        "api.profiling": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
         "django": {
             "handlers": ["console"],
             "level": "INFO",
@@ -155,5 +173,33 @@ LOGGING = {
     },
 }
 
-NINJA_PAGINATION_CLASS = "ninja.pagination.PageNumberPagination"
+NINJA_PAGINATION_CLASS = "api.pagination.GuardedPageNumberPagination"
 NINJA_PAGINATION_PER_PAGE = 300
+
+# Limits of the API by route name (e.g get_jobs), with a default for the other routes.
+# Run time of each SQL statement in ms, a cancelled statement is answered with 503
+STATEMENT_TIMEOUTS = {
+    "default": int(CONFIG.get("STATEMENT_TIMEOUT_MS") or 15000),
+    # DISTINCT over every row of the largest tables
+    "get_job_sources": 60000,
+    "get_profile_sources": 60000,
+}
+# Planner cost of a page above which the request is rejected with 400
+MAX_QUERY_COSTS = {
+    "default": float(CONFIG.get("MAX_QUERY_COST") or 1e6),
+}
+# Planner cost of a whole query above which the total count is estimated
+COUNT_ESTIMATE_COST = float(CONFIG.get("COUNT_ESTIMATE_COST") or 1e5)
+
+# Memory-mapped vectors of the semantic search (see the build_semantic_index command)
+SEMANTIC_INDEX_DIR = Path(CONFIG.get("SEMANTIC_INDEX_DIR") or BASE_DIR / "indexes")
+# Memory-mapped taxonomy snapshot (see the build_taxonomy_snapshot command)
+TAXONOMY_SNAPSHOT = Path(
+    CONFIG.get("TAXONOMY_SNAPSHOT") or SEMANTIC_INDEX_DIR / "taxonomy.snapshot"
+)
+
+# Warm-up of the workers before they take traffic (see api/warmup.py)
+WARMUP = CONFIG.get("WARMUP", "1") == "1"
+
+# Bearer token of the Prometheus scrapes of /metrics, which is disabled without one
+METRICS_TOKEN = CONFIG.get("METRICS_TOKEN") or None
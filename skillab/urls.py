@@ -1,12 +1,17 @@
 from django.conf import settings
 from django.contrib import admin
 from django.conf.urls.static import static
+from django.db import OperationalError
 from django.urls import path
 from ninja import NinjaAPI
 from django.shortcuts import render
 from ninja.openapi.docs import DocsBase
+from psycopg2.errors import QueryCanceled
 
+from api.metrics import metrics
+from api.renderers import FastJSONRenderer
 from api.views import router
+from api.warmup import ready
 
 
 class CustomSwagger(DocsBase):
@@ -20,10 +25,30 @@ media_urls = (
     else []
 )
 
-api = NinjaAPI(title="Skillab Tracker API", docs=CustomSwagger())
+api = NinjaAPI(
+    title="Skillab Tracker API", docs=CustomSwagger(), renderer=FastJSONRenderer()
+)
 api.add_router("", router)
 
+
+@api.exception_handler(OperationalError)
+def statement_timeout(request, exc):
+    # Statements cancelled by the route's statement timeout (see STATEMENT_TIMEOUTS)
+    if not isinstance(exc.__cause__, QueryCanceled):
+        raise exc
+
+    response = api.create_response(
+        request,
+        {"detail": "The query took too long, please narrow down the filters."},
+        status=503,
+    )
+    response.headers["Retry-After"] = "60"
+    return response
+
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", api.urls),
+    path("metrics", metrics),
+    path("ready", ready),
 ] + media_urls
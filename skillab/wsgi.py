@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillab.settings')
 
 application = get_wsgi_application()
+
+# Before the workers are forked with gunicorn's --preload (see api/warmup.py)
+from api.warmup import warm_up_application  # noqa: E402
+
+warm_up_application()